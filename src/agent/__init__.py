@@ -1,10 +1,40 @@
 # src/agent/__init__.py
-"""Top‑level package: exposes :class:`AgentConfig` and :class:`AgentSystem`."""
+"""Top‑level package: exposes :class:`AgentConfig` and :class:`AgentSystem`.
 
-from importlib.metadata import version as _v
+Both (and ``__version__``) are resolved on first attribute access so that
+``import agent`` — and ``agent --help`` — does not load pydantic, the
+provider SDKs or any pipeline.
+"""
 
-from .config import AgentConfig
-from .core.system import AgentSystem
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import AgentConfig
+    from .core.system import AgentSystem
 
 __all__: list[str] = ["AgentConfig", "AgentSystem", "__version__"]
-__version__: str = _v(__name__)
+
+_LAZY = {
+    "AgentConfig": ".config",
+    "AgentSystem": ".core.system",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value: Any = version(__name__)
+    elif name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
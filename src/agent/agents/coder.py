@@ -3,43 +3,235 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
 import re
-from typing import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence
 
 from ..config import AgentConfig
-from ..core.agent_base import AgentBase, Message
+from ..core.agent_base import AgentBase, Message, token_callback
+from ..core.changes import ChangeTracker, PathLocks
+from ..core.context import ContextAssembler
+from ..core.tracing import span
 from ..core.executor import Executor
-from ..models.llm_base import LLMBase
-from ..util.files import apply_diff
+from ..models.llm_base import ChatMessage, Completion, LLMBase, Usage
+from ..util.files import (
+    FilePatch,
+    FileResult,
+    PatchError,
+    commit,
+    group_patches,
+    parse_patch,
+    plan_file,
+    read,
+)
 from ..util.prompts import CODER as SYSTEM
 
+log = logging.getLogger(__name__)
+
+_DIFF_RE = re.compile(r"```diff\n([\s\S]+?)```", re.MULTILINE)
+
+
+@dataclass
+class _Prepared:
+    """Diff fences of one streamed draft, parsed and dry‑run as each one closed."""
+
+    patches: List[FilePatch] = field(default_factory=list)
+    error: PatchError | None = None
+    plans: Dict[Path, "asyncio.Task[FileResult]"] = field(default_factory=dict)
+
+    def discard(self) -> None:
+        for task in self.plans.values():
+            task.add_done_callback(_retrieve)
+
+
+def _retrieve(task: "asyncio.Task[FileResult]") -> None:
+    if not task.cancelled():
+        task.exception()  # a stale dry run's failure is not worth a warning
+
+
+async def _planned(task: "asyncio.Task[FileResult] | None") -> FileResult | None:
+    """The streamed dry run for a file, if it finished cleanly."""
+    if task is None:
+        return None
+    try:
+        return await task
+    except Exception:
+        return None
+
+
+def _fresh(path: Path, patches: Sequence[FilePatch], planned: FileResult | None) -> FileResult:
+    """Reuse *planned* if *path* is unchanged since the dry run, else plan again."""
+    if planned is not None and planned.original == (read(path) if path.exists() else None):
+        return planned
+    return plan_file(path, patches)
+
 
 class CoderAgent(AgentBase):
     """LLM‑powered code writer."""
 
-    _DIFF_RE = re.compile(r"```diff\n([\s\S]+?)```", re.MULTILINE)
+    _DIFF_RE = _DIFF_RE
 
-    def __init__(self, llm: LLMBase, cfg: AgentConfig, executor: Executor) -> None:
+    def __init__(
+        self,
+        llm: LLMBase,
+        cfg: AgentConfig,
+        executor: Executor,
+        assembler: ContextAssembler | None = None,
+        changes: ChangeTracker | None = None,
+        locks: PathLocks | None = None,
+    ) -> None:
         super().__init__("Coder")
         self._llm = llm
         self._root = cfg.project_path
         self._executor = executor
+        self._assembler = assembler
+        self._changes = changes
+        self._locks = locks or PathLocks()
+        self.last_usage: Dict[str, int] = {}
+        self.last_completion_usage = Usage()
+        self._prepared: Dict[str, _Prepared] = {}  # completion text → streamed work
 
     # ------------------------------------------------------------------ #
     async def _apply_patches(self, text: str) -> str:
-        """Find diff fences, write changes, return summary."""
-        summaries: list[str] = []
-        for diff in self._DIFF_RE.findall(text):
-            # first line of diff contains --- a/file +++ b/file
-            header = diff.splitlines()[0]
-            _, filepath = header.split(" ", 1)
-            path = self._root / filepath.strip()
-            summary = apply_diff(path, diff)
-            summaries.append(summary)
-        return "\n".join(summaries)
+        """Apply every diff fence in *text* as one all‑or‑nothing change set.
+
+        Fences are parsed and grouped by target file; each file is planned in
+        a worker thread under its path lock, and nothing is written unless
+        every hunk of every fence applies. Dry runs made while the draft was
+        streaming are reused for files that have not changed since.
+        """
+        prepared = self._prepared.pop(text, None)
+        for stale in self._prepared.values():
+            stale.discard()
+        self._prepared.clear()
+        try:
+            if prepared is None:
+                prepared = _Prepared([fp for diff in _DIFF_RE.findall(text) for fp in parse_patch(diff)])
+            elif prepared.error is not None:
+                raise prepared.error
+            groups = group_patches(self._root, prepared.patches)
+        except PatchError as exc:
+            log.warning("patch rejected: %s", exc)
+            if prepared is not None:
+                prepared.discard()
+            return f"patch rejected: {exc}"
+        if not groups:
+            return ""
+        with span("patch", "patch", files=len(groups)) as sp:
+            async with self._locks.hold(groups):
+                planned = [await _planned(prepared.plans.get(path)) for path in groups]
+                results = await asyncio.gather(
+                    *(
+                        asyncio.to_thread(_fresh, path, group, plan)
+                        for (path, group), plan in zip(groups.items(), planned)
+                    )
+                )
+                ok = all(r.ok for r in results)
+                sp.set(
+                    hunks=sum(len(r.hunks) for r in results),
+                    ok=ok,
+                    reused=sum(1 for r, p in zip(results, planned) if r is p),
+                )
+                if ok:
+                    await asyncio.to_thread(commit, results)
+                    if self._changes is not None:
+                        self._changes.record(groups)
+                else:
+                    log.warning("patch not applied: %s", "; ".join(r.summary() for r in results))
+        return "\n".join(r.summary() for r in results)
+
+    def _prepare(self, prepared: _Prepared, diff: str) -> None:
+        """Parse a just‑closed fence and dry‑run the files it touches in the background."""
+        if prepared.error is not None:
+            return
+        try:
+            patches = parse_patch(diff)
+            prepared.patches += patches
+            touched = group_patches(self._root, patches)
+            groups = group_patches(self._root, prepared.patches)
+        except PatchError as exc:
+            prepared.error = exc
+            log.debug("streamed fence rejected early: %s", exc)
+            return
+        for path in touched:
+            old = prepared.plans.get(path)
+            if old is not None:
+                old.add_done_callback(_retrieve)
+            prepared.plans[path] = asyncio.create_task(
+                asyncio.to_thread(plan_file, path, groups[path]), name=f"plan:{path.name}"
+            )
+
+    def has_patch(self, text: str) -> bool:
+        """Whether *text* contains at least one diff fence."""
+        return self._DIFF_RE.search(text) is not None
+
+    async def adraft(self, history: Sequence[Message]) -> Completion:
+        """Ask the model for the next reply without touching the tree."""
+        messages: list[ChatMessage]
+        if self._assembler is not None:
+            ctx = await self._assembler.aassemble(SYSTEM, history, me=self.name)
+            self.last_usage = ctx.usage
+            messages = ctx.to_messages()
+        else:
+            messages = [{"role": "system", "content": SYSTEM}]
+            messages += [
+                {"role": "assistant", "content": m.content}
+                if m.sender == self.name
+                else {"role": "user", "content": f"{m.sender}: {m.content}"}
+                for m in history
+            ]
+        completion = await self._astream(messages)
+        self.last_completion_usage = completion.usage
+        log.debug(
+            "coder prompt=%d cached=%d context=%s",
+            completion.usage.prompt_tokens,
+            completion.usage.cached_tokens,
+            self.last_usage,
+        )
+        return completion
+
+    async def _astream(self, messages: Sequence[ChatMessage]) -> Completion:
+        """Stream the reply, handing each closed diff fence to :meth:`_prepare`."""
+        on_token = token_callback()
+        prepared = _Prepared()
+        chunks: List[str] = []
+        usage = Usage()
+        scanned = 0  # fences before this offset were already handed off
+        try:
+            async with contextlib.aclosing(self._llm.astream(messages)) as stream:
+                async for delta in stream:
+                    if delta.usage is not None:
+                        usage = delta.usage
+                    if not delta.text:
+                        continue
+                    chunks.append(delta.text)
+                    if on_token is not None:
+                        on_token(self.name, delta.text)
+                    if "`" in delta.text:
+                        buf = "".join(chunks)
+                        for m in _DIFF_RE.finditer(buf, scanned):
+                            self._prepare(prepared, m.group(1))
+                            scanned = m.end()
+        except BaseException:
+            prepared.discard()
+            raise
+        finally:
+            if on_token is not None and chunks:
+                on_token(self.name, "")
+        text = "".join(chunks)
+        if prepared.patches or prepared.error is not None:
+            self._prepared[text] = prepared
+        return Completion(text, usage)
+
+    async def acommit(self, text: str) -> str:
+        """Apply the patches of a (possibly speculative) draft; return the summary."""
+        return await self._apply_patches(text)
 
     async def areply(self, history: Sequence[Message]) -> Message:
-        prompt = SYSTEM + "\n\n" + "\n".join(f"{m.sender}: {m.content}" for m in history)
-        content = await self._llm.acomplete(prompt)
-        await self._apply_patches(content)
-        return Message(self.name, content)
+        completion = await self.adraft(history)
+        await self.acommit(completion.text)
+        return Message(self.name, completion.text)
@@ -19,6 +19,8 @@ class DocsAgent(AgentBase):
         self._llm = llm
 
     async def areply(self, history: Sequence[Message]) -> Message:
-        prompt = SYSTEM + "\n\nConversation:\n" + "\n".join(f"{m.sender}: {m.content}" for m in history)
-        content = await self._llm.acomplete(prompt)
-        return Message(self.name, content)
+        transcript = "Conversation:\n" + "\n".join(f"{m.sender}: {m.content}" for m in history)
+        completion = await self._llm.achat(
+            [{"role": "system", "content": SYSTEM}, {"role": "user", "content": transcript}]
+        )
+        return Message(self.name, completion.text)
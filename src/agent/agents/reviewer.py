@@ -3,24 +3,95 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
 
+from ..checks.lint import (
+    LINT_CACHE_NAME,
+    Flake8Linter,
+    IncrementalLinter,
+    Linter,
+    LintError,
+    PyflakesLinter,
+)
 from ..config import AgentConfig
 from ..core.agent_base import AgentBase, Message
 from ..core.executor import Executor
 from ..models.llm_base import LLMBase
 from ..util.prompts import REVIEWER as SYSTEM
 
+log = logging.getLogger(__name__)
+
+_LOCATION_RE = re.compile(r"^\d+:\d+: ")  # line numbers shift as the coder edits
+
+
+def _fingerprints(issues: Sequence[str]) -> Counter[str]:
+    return Counter(_LOCATION_RE.sub("", issue) for issue in issues)
+
 
 class ReviewerAgent(AgentBase):
-    """Runs flake8, summarises violations."""
+    """Lints files changed since the last review; fails only on issues the run introduced.
+
+    Issues present before the coder's first patch (the baseline from
+    :meth:`aprepare`) are reported as a count but never fail the review.
+    """
 
     def __init__(self, llm: LLMBase, cfg: AgentConfig, executor: Executor) -> None:
         super().__init__("Reviewer")
         self._executor = executor
         self._llm = llm  # optional follow‑up completions
+        self._max_issues = cfg.lint.max_issues
+        linter: Linter = Flake8Linter(executor)
+        if cfg.lint.backend == "pyflakes":
+            try:
+                linter = PyflakesLinter(cfg.project_path)
+            except ImportError:
+                log.warning("pyflakes is not installed; falling back to flake8")
+        self._lint = IncrementalLinter(
+            cfg.project_path,
+            linter,
+            cfg.index.exclude_dirs,
+            cfg.project_path / ".agent" / LINT_CACHE_NAME,
+        )
+        self._baseline: Dict[str, Counter[str]] = {}
+
+    async def aprepare(self) -> None:
+        try:
+            report, _ = await self._lint.arun()
+        except LintError as exc:
+            log.warning("no lint baseline, every issue counts as new: %s", exc)
+            return
+        self._baseline = {path: _fingerprints(issues) for path, issues in report.items()}
+
+    def _new(self, report: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Issues beyond the baseline's count of the same message in the same file."""
+        fresh: Dict[str, List[str]] = {}
+        for path, issues in report.items():
+            known = Counter(self._baseline.get(path, {}))
+            for issue in issues:
+                key = _LOCATION_RE.sub("", issue)
+                if known[key] > 0:
+                    known[key] -= 1
+                else:
+                    fresh.setdefault(path, []).append(issue)
+        return fresh
 
     async def areply(self, history: Sequence[Message]) -> Message:
-        rc, out, err = await self._executor.arun(["flake8", "."])
-        body = "No issues ✅" if rc == 0 else f"flake8 exit={rc}\n{out or err}"
-        return Message(self.name, body)
+        try:
+            report, linted = await self._lint.arun()
+        except LintError as exc:
+            return Message(self.name, str(exc), ok=False)
+        log.debug("reviewer linted %d changed files", linted)
+        fresh = self._new(report)
+        known = sum(len(v) for v in report.values()) - sum(len(v) for v in fresh.values())
+        note = f" ({known} pre‑existing issues not counted)" if known else ""
+        if not fresh:
+            return Message(self.name, f"No new issues ✅{note}", ok=True)
+        lines: List[str] = [f"{path}:{issue}" for path, issues in fresh.items() for issue in issues]
+        body = f"{self._lint.name}: {len(lines)} new issues in {len(fresh)} files{note}\n"
+        body += "\n".join(lines[: self._max_issues])
+        if len(lines) > self._max_issues:
+            body += f"\n… and {len(lines) - self._max_issues} more"
+        return Message(self.name, body, ok=False)
@@ -3,24 +3,160 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+from xml.etree.ElementTree import ParseError
 
+from ..checks.impact import GRAPH_NAME, ImportGraph
+from ..checks.junit import CaseResult, SuiteReport, digest, merge, parse_junit, shard
 from ..config import AgentConfig
 from ..core.agent_base import AgentBase, Message
+from ..core.changes import ChangeTracker
 from ..core.executor import Executor
 from ..models.llm_base import LLMBase
 from ..util.prompts import TESTER as SYSTEM
 
+log = logging.getLogger(__name__)
+
+_RAW_TAIL = 4000  # chars of raw output kept when a shard wrote no JUnit XML
+_NO_TESTS = 5  # pytest: nothing collected
+_COLLECTED_RE = re.compile(r"^(?P<path>[^\s:]+\.py)(?:::|: \d+)", re.MULTILINE)
+
+_Shard = Tuple[int, "List[CaseResult] | None", str]  # (rc, cases, raw output tail)
+
 
 class TesterAgent(AgentBase):
-    """Runs `pytest -q` and returns results verbatim."""
+    """Runs the tests affected by the coder's last patches, then the full suite.
+
+    Affected tests come from the project's import graph; when the impact of a
+    change cannot be bounded (non‑Python file, first turn) the whole suite runs.
+    Test files are sharded over ``testing.workers`` pytest processes and the
+    JUnit XML results are condensed into a short failure digest. Tests that
+    already failed before the coder's first patch (the baseline from
+    :meth:`aprepare`) are reported but do not fail the turn.
+    """
 
-    def __init__(self, llm: LLMBase, cfg: AgentConfig, executor: Executor) -> None:
+    def __init__(
+        self,
+        llm: LLMBase,
+        cfg: AgentConfig,
+        executor: Executor,
+        changes: ChangeTracker | None = None,
+    ) -> None:
         super().__init__("Tester")
         self._llm = llm  # not used but keeps uniform API
         self._executor = executor
+        self._cfg = cfg.testing
+        self._root = cfg.project_path
+        self._changes = changes
+        self._graph = ImportGraph(
+            cfg.project_path, cfg.index.exclude_dirs, cfg.project_path / ".agent" / GRAPH_NAME
+        )
+        self._timings: Dict[str, float] = {}
+        self._force_full = False
+        self._shardable: Dict[Tuple[str, ...], bool] = {}  # graph test files → matches pytest
+        self._baseline: Set[str] = set()  # node ids failing before the first patch
+
+    def request_full(self) -> None:
+        """Run the whole suite on the next turn regardless of what changed."""
+        self._force_full = True
+
+    async def aprepare(self) -> None:
+        rc, report, _ = await self._run("baseline", None)
+        if rc != 0 and not report.failures:
+            log.warning("baseline test run failed without results (exit=%d)", rc)
+        self._baseline = {case.nodeid for case in report.failures}
 
     async def areply(self, history: Sequence[Message]) -> Message:  # noqa: D401
-        rc, out, err = await self._executor.arun(["pytest", "-q"])
-        report = f"exit={rc}\nstdout:\n{out}\nstderr:\n{err}"
-        return Message(self.name, report)
+        tests = await self._select()
+        self._force_full = False
+        if tests is None:
+            ok, report = await self._check("full suite", None)
+            return Message(self.name, report, ok=ok)
+        if not tests and not self._cfg.full_on_green:
+            return Message(self.name, "exit=0\nNo tests depend on the changed files.", ok=True)
+        reports: List[str] = []
+        if tests:
+            ok, report = await self._check(f"affected tests ({len(tests)} files)", tests)
+            reports.append(report)
+            if not ok or not self._cfg.full_on_green:
+                return Message(self.name, "\n".join(reports), ok=ok)
+        ok, report = await self._check("full suite", None)
+        reports.append(report)
+        return Message(self.name, "\n".join(reports), ok=ok)
+
+    # ------------------------------------------------------------------ #
+    async def _select(self) -> List[str] | None:
+        changed = self._changes.take(self.name) if self._changes is not None else None
+        if self._force_full or not self._cfg.select_affected or changed is None:
+            return None
+        return await asyncio.to_thread(self._graph.affected_tests, changed)
+
+    async def _check(self, label: str, tests: List[str] | None) -> Tuple[bool, str]:
+        """Run *tests*; passing unless something failed that was not in the baseline."""
+        rc, report, text = await self._run(label, tests)
+        if rc == 0:
+            return True, text
+        known = sum(1 for case in report.failures if case.nodeid in self._baseline)
+        if not known:
+            return False, text
+        text += f"\n({known} pre‑existing failures not counted)"
+        return not report.missing and known == len(report.failures), text
+
+    async def _run(self, label: str, tests: List[str] | None) -> Tuple[int, SuiteReport, str]:
+        """Run *tests* (``None`` = whole suite) in parallel shards; return (rc, report, digest)."""
+        workers = self._cfg.workers or os.cpu_count() or 1
+        known = tests or await asyncio.to_thread(self._graph.test_files)
+        files = tests
+        if tests is None and workers > 1 and known and await self._collects_exactly(known):
+            files = known
+        groups = shard(files, workers, self._timings) if files else [[]]
+        run_id = uuid.uuid4().hex[:8]
+        start = time.monotonic()
+        results: List[_Shard] = await asyncio.gather(
+            *(self._run_shard(f"{run_id}-{i}", group, known) for i, group in enumerate(groups))
+        )
+        report = merge((cases for _, cases, _ in results), time.monotonic() - start)
+        self._timings.update(report.file_seconds())
+        rc = next((r for r, _, _ in results if r != 0), 0)
+
+        head = f"[{label}, {len(groups)} worker{'s' if len(groups) > 1 else ''}] exit={rc}"
+        body = [head, digest(report, self._cfg.max_failures, self._cfg.traceback_lines)]
+        body += [raw for _, cases, raw in results if cases is None and raw]
+        return rc, report, "\n".join(body)
+
+    async def _collects_exactly(self, known: List[str]) -> bool:
+        """Whether pytest itself would collect exactly *known* (honouring its ini options).
+
+        Listing files explicitly bypasses ``testpaths``, ``python_files`` and
+        ``norecursedirs``, so the suite is only sharded when that changes nothing.
+        """
+        key = tuple(sorted(known))
+        if key not in self._shardable:
+            rc, out, _ = await self._executor.arun([*self._cfg.command, "--collect-only", "-q"])
+            collected = {m["path"] for m in _COLLECTED_RE.finditer(out)}
+            self._shardable[key] = rc in (0, _NO_TESTS) and collected == set(key)
+        return self._shardable[key]
+
+    async def _run_shard(self, tag: str, files: List[str], known: List[str]) -> _Shard:
+        rel = Path(".agent") / "junit" / f"{tag}.xml"
+        xml = self._root / rel
+        xml.parent.mkdir(parents=True, exist_ok=True)
+        cmd = [*self._cfg.command, f"--junitxml={rel.as_posix()}", *files]
+        rc, out, err = await self._executor.arun(cmd)
+        if rc == _NO_TESTS:
+            rc = 0  # nothing collected (no tests yet, or none pytest would run): nothing failed
+        try:
+            cases = parse_junit(xml, files or known)
+        except (OSError, ParseError):
+            cases = None
+        finally:
+            xml.unlink(missing_ok=True)
+        raw = (out + ("\n" + err if err else "")).strip()
+        return rc, cases, raw[-_RAW_TAIL:]
@@ -0,0 +1,2 @@
+# src/agent/bench/__init__.py
+"""Performance benchmarks runnable as ``python -m agent.bench.<name>``."""
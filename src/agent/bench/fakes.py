@@ -0,0 +1,105 @@
+# src/agent/bench/fakes.py
+"""Deterministic, offline stand‑ins for the model and embedding providers."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import re
+from typing import AsyncIterator, Callable, Iterable, List, Sequence
+
+from ..core.tracing import span
+from ..embeddings.base import Embedder
+from ..models.llm_base import ChatMessage, Completion, Delta, LLMBase, Usage, collect
+from ..util.tokens import count_tokens
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_PIECE_RE = re.compile(r"\S*\s*")
+
+
+class ScriptedLLM(LLMBase):
+    """Reply from a fixed script; the *n*‑th reply is used on the *n*‑th own turn.
+
+    The turn is the number of ``assistant`` messages in the request, so a
+    discarded speculative draft does not advance the script. *ttft* and
+    *per_token* simulate provider latency (seconds).
+    """
+
+    def __init__(
+        self,
+        script: Sequence[str],
+        model: str = "scripted",
+        ttft: float = 0.0,
+        per_token: float = 0.0,
+    ) -> None:
+        self._script = list(script) or [""]
+        self._model = model
+        self._ttft = ttft
+        self._per_token = per_token
+        self.calls = 0
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await collect(self.astream(messages))
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        """Yield the scripted reply word by word, *per_token* seconds apart."""
+        self.calls += 1
+        turn = sum(1 for m in messages if m["role"] == "assistant")
+        text = self._script[min(turn, len(self._script) - 1)]
+        prompt = sum(count_tokens(m["content"], self._model) for m in messages)
+        completion = count_tokens(text, self._model)
+        with span("llm.chat", "llm", model=self._model) as sp:
+            await asyncio.sleep(self._ttft)
+            sp.set(ttft_ms=round(self._ttft * 1000, 1))
+            pieces = [p for p in _PIECE_RE.findall(text) if p]
+            for piece in pieces:
+                yield Delta(piece)
+                await asyncio.sleep(self._per_token * completion / len(pieces))
+            sp.set(prompt_tokens=prompt, completion_tokens=completion, cached_tokens=0)
+        yield Delta("", Usage(prompt, completion))
+
+
+class HashEmbedder(Embedder):
+    """Feature‑hashed bag of identifiers: similar code gets similar vectors."""
+
+    def __init__(self, dim: int = 256, model: str = "hash") -> None:
+        self._dim = dim
+        self._model = model
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def embed_one(self, text: str) -> list[float]:
+        vec = [0.0] * self._dim
+        for word in _WORD_RE.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            vec[h % self._dim] += 1.0 if (h >> 63) else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        with span("embed", "embed", model=self._model, inputs=len(items)):
+            return [self.embed_one(t) for t in items]
+
+
+def llm_factory(coder_script: Sequence[str], **latency: float) -> Callable[[str, str, str], LLMBase]:
+    """``SharedResources`` LLM factory: the coder follows *coder_script*, others acknowledge."""
+
+    def build(role: str, provider: str, model: str) -> LLMBase:
+        if role == "coder":
+            return ScriptedLLM(coder_script, f"scripted-{role}", **latency)
+        return ScriptedLLM(["Looks good."], f"scripted-{role}", **latency)
+
+    return build
+
+
+def embedder_factory(dim: int = 256) -> Callable[[str, str], Embedder]:
+    """``SharedResources`` embedder factory returning a :class:`HashEmbedder`."""
+    return lambda provider, model: HashEmbedder(dim)
@@ -0,0 +1,91 @@
+# src/agent/bench/startup.py
+"""Cold‑start import benchmark for the ``agent`` CLI, with a regression budget.
+
+Each sample is a fresh interpreter, so nothing is warm in ``sys.modules``::
+
+    python -m agent.bench.startup --budget-ms 50
+
+Exits non‑zero when the median import time of ``agent.cli`` exceeds the
+budget or when importing it drags in any of :data:`HEAVY`.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from typing import Any, Dict, List, Sequence
+
+HEAVY = ("pydantic", "openai", "chromadb", "autogen", "numpy", "httpx", "tiktoken", "asyncio")
+DEFAULT_BUDGET_MS = 50.0
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t
+print(json.dumps({{"ms": dt * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def sample(module: str) -> Dict[str, Any]:
+    """Import *module* once in a fresh interpreter; return its time and heavy deps."""
+    code = _PROBE.format(module=module, heavy=HEAVY)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def help_wall_ms() -> float:
+    """Wall time of ``agent --help`` including interpreter start‑up."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "agent.cli", "--help"], capture_output=True, check=True
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def run(modules: Sequence[str] = ("agent", "agent.cli"), runs: int = 5) -> Dict[str, Any]:
+    """Median/min import time per module plus ``--help`` wall time (milliseconds)."""
+    report: Dict[str, Any] = {"runs": runs, "modules": {}}
+    for module in modules:
+        samples = [sample(module) for _ in range(runs)]
+        times: List[float] = [s["ms"] for s in samples]
+        report["modules"][module] = {
+            "median_ms": round(statistics.median(times), 2),
+            "min_ms": round(min(times), 2),
+            "heavy": sorted({m for s in samples for m in s["heavy"]}),
+        }
+    report["help_wall_ms"] = round(statistics.median(help_wall_ms() for _ in range(runs)), 2)
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = ArgumentParser(prog="python -m agent.bench.startup", description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Fail when the median `import agent.cli` exceeds this.",
+    )
+    ns = parser.parse_args(argv)
+
+    report = run(runs=ns.runs)
+    cli = report["modules"]["agent.cli"]
+    failures = []
+    if cli["median_ms"] > ns.budget_ms:
+        failures.append(f"import agent.cli took {cli['median_ms']} ms (budget {ns.budget_ms} ms)")
+    for module, row in report["modules"].items():
+        if row["heavy"]:
+            failures.append(f"import {module} loaded {', '.join(row['heavy'])}")
+    report["budget_ms"] = ns.budget_ms
+    report["failures"] = failures
+    print(json.dumps(report, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
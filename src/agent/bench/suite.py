@@ -0,0 +1,317 @@
+# src/agent/bench/suite.py
+"""Offline end‑to‑end benchmark suite with machine‑readable results.
+
+Runs entirely locally (scripted LLM, hash embedder, synthetic repository)::
+
+    python -m agent.bench.suite --modules 200 --out bench.json
+    python -m agent.bench.suite --compare bench.json --tolerance 0.25
+
+Every stage reports wall time, the tracemalloc peak and stage metrics; the
+``pipeline`` stage also carries the per‑span summary from :mod:`agent.core.tracing`.
+With ``--compare`` the process exits non‑zero when a stage is slower than the
+baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from ..config import (
+    AgentConfig,
+    EmbeddingCacheConfig,
+    ExecutionConfig,
+    IndexConfig,
+    LintConfig,
+    RateLimit,
+    TestingConfig,
+    VectorStoreConfig,
+)
+from ..core.executor import Executor
+from ..core.resources import SharedResources
+from ..core.system import AgentSystem
+from ..core.tracing import Tracer, tracing
+from ..embeddings.engine import BatchingEmbedder
+from ..indexing.indexer import Indexer, Manifest
+from ..util.files import apply_patch
+from ..vectorstore.numpy_store import NumpyStore
+from . import fakes, synthetic
+
+STAGES = ("index", "search", "patch", "executor", "pipeline")
+
+
+@dataclass
+class StageResult:
+    """One line of the report."""
+
+    name: str
+    wall_s: float
+    peak_kb: float
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(name: str, fn: Callable[[], Dict[str, Any]], memory: bool = True) -> StageResult:
+    """Run *fn*, recording wall time and (optionally) the tracemalloc peak."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        metrics = fn()
+    finally:
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+        if memory:
+            tracemalloc.stop()
+    return StageResult(name, round(wall, 4), round(peak / 1024, 1), metrics)
+
+
+# --------------------------------------------------------------------------- #
+# Stages
+# --------------------------------------------------------------------------- #
+def _indexer(root: Path, dim: int) -> Indexer:
+    return Indexer(
+        root,
+        NumpyStore(),
+        BatchingEmbedder(fakes.HashEmbedder(dim)),
+        IndexConfig(),
+        Manifest(None, "hash"),
+    )
+
+
+def bench_index(root: Path, dim: int) -> Dict[str, Any]:
+    indexer = _indexer(root, dim)
+    out: Dict[str, Any] = {}
+    for label, touch in (("cold", False), ("warm", False), ("one_file_changed", True)):
+        if touch:
+            path = root / "pkg" / "mod_0.py"
+            path.write_text(path.read_text(encoding="utf-8") + "\n# touched\n", encoding="utf-8")
+        start = time.perf_counter()
+        stats = asyncio.run(indexer.arun())
+        out[label] = {"s": round(time.perf_counter() - start, 4), **asdict(stats)}
+    return out
+
+
+def bench_search(root: Path, dim: int, modules: int, queries: int, k: int = 8) -> Dict[str, Any]:
+    indexer = _indexer(root, dim)
+    asyncio.run(indexer.arun())
+    hasher = fakes.HashEmbedder(dim)
+    vectors = [hasher.embed_one(f"f{i % modules}_{i % 7} scaled") for i in range(queries)]
+    start = time.perf_counter()
+    hits = indexer.store.search_many(vectors, k)
+    elapsed = time.perf_counter() - start
+    return {
+        "queries": queries,
+        "k": k,
+        "qps": round(queries / elapsed, 1) if elapsed else None,
+        "empty": sum(1 for h in hits if not h),
+    }
+
+
+def bench_patch(root: Path, modules: int, files: int) -> Dict[str, Any]:
+    diff = synthetic.multi_file_patch(modules, files)
+    start = time.perf_counter()
+    planned = apply_patch(root, diff, dry_run=True)
+    verify = time.perf_counter() - start
+    start = time.perf_counter()
+    applied = apply_patch(root, diff)
+    write = time.perf_counter() - start
+    return {
+        "files": len(applied),
+        "hunks": sum(len(r.hunks) for r in applied),
+        "ok": all(r.ok for r in planned) and all(r.ok for r in applied),
+        "verify_s": round(verify, 4),
+        "apply_s": round(write, 4),
+    }
+
+
+def bench_executor(root: Path, commands: int, concurrency: int, output_bytes: int) -> Dict[str, Any]:
+    executor = Executor(ExecutionConfig(use_docker=False), root)
+    cmd = [sys.executable, "-c", f"import sys; sys.stdout.write('x' * {output_bytes})"]
+
+    async def run() -> List[int]:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one() -> int:
+            async with gate:
+                return (await executor.arun(cmd))[0]
+
+        return await asyncio.gather(*(one() for _ in range(commands)))
+
+    start = time.perf_counter()
+    codes = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return {
+        "commands": commands,
+        "concurrency": concurrency,
+        "failed": sum(1 for rc in codes if rc != 0),
+        "per_s": round(commands / elapsed, 1) if elapsed else None,
+    }
+
+
+def pipeline_config(root: Path, workers: int) -> AgentConfig:
+    """Network‑free config: NumPy store, no caches, local execution, scripted models.
+
+    A generous rate limit is set so the limiter's admission path is measured too.
+    """
+    lint = "pyflakes" if importlib.util.find_spec("pyflakes") else "flake8"
+    return AgentConfig(
+        project_path=root,
+        model_providers={role: ("openai", "scripted") for role in ("coder", "tester", "reviewer")},
+        provider_configs={"openai": {}},
+        embedding_provider=("openai", "hash"),
+        embedding_cache=EmbeddingCacheConfig(enabled=False),
+        rate_limits={"openai": RateLimit(rpm=1_000_000, tpm=1_000_000_000)},
+        vector_store=VectorStoreConfig(backend="numpy"),
+        execution=ExecutionConfig(use_docker=False),
+        testing=TestingConfig(
+            command=(sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"),
+            workers=workers,
+        ),
+        lint=LintConfig(backend=lint),
+    )
+
+
+def bench_pipeline(root: Path, dim: int, workers: int, ttft: float) -> Dict[str, Any]:
+    cfg = pipeline_config(root, workers)
+    script = synthetic.coder_script(0)
+    shared: List[SharedResources] = []
+
+    def resources() -> SharedResources:
+        shared.append(
+            SharedResources(cfg, fakes.llm_factory(script, ttft=ttft), fakes.embedder_factory(dim))
+        )
+        return shared[-1]
+
+    system = AgentSystem(cfg, resources=resources)
+    tracer = Tracer()
+    with tracing(tracer):
+        transcript = system.run_pipeline("refactor", "Make f0_0 scale its input by 3.")
+    return {
+        "messages": len(transcript),
+        "coder_turns": sum(1 for m in transcript if m.sender == "Coder"),
+        "final_ok": [m.ok for m in transcript if m.ok is not None][-2:],
+        "spans": tracer.summary(),
+        "rate_limits": shared[-1].limiter.metrics(),
+    }
+
+
+# --------------------------------------------------------------------------- #
+def run(
+    modules: int = 50,
+    funcs: int = 8,
+    stages: Sequence[str] = STAGES,
+    queries: int = 1000,
+    patch_files: int = 50,
+    commands: int = 40,
+    concurrency: int = 8,
+    workers: int = 1,
+    ttft: float = 0.0,
+    dim: int = 256,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """Build a synthetic repo and run the selected *stages*; return the report."""
+    params = {k: v for k, v in locals().items() if k != "stages"}
+    results: List[StageResult] = []
+    with tempfile.TemporaryDirectory(prefix="agent-bench-") as tmp:
+        base = synthetic.make_repo(Path(tmp) / "base", modules, funcs)
+
+        def fresh(name: str) -> Path:
+            return Path(shutil.copytree(base, Path(tmp) / name))
+
+        for stage in stages:
+            if stage == "index":
+                fn = lambda: bench_index(fresh("index"), dim)  # noqa: E731
+            elif stage == "search":
+                fn = lambda: bench_search(base, dim, modules, queries)  # noqa: E731
+            elif stage == "patch":
+                fn = lambda: bench_patch(fresh("patch"), modules, patch_files)  # noqa: E731
+            elif stage == "executor":
+                fn = lambda: bench_executor(base, commands, concurrency, 64 * 1024)  # noqa: E731
+            elif stage == "pipeline":
+                fn = lambda: bench_pipeline(fresh("pipeline"), dim, workers, ttft)  # noqa: E731
+            else:
+                raise ValueError(f"Unknown stage: {stage!r} (choose from {', '.join(STAGES)})")
+            results.append(measure(stage, fn, memory))
+    return {
+        "agent_version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "stages": [asdict(r) for r in results],
+        "total_wall_s": round(sum(r.wall_s for r in results), 4),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Stages whose wall time regressed by more than *tolerance* (fraction)."""
+    before = {s["name"]: s["wall_s"] for s in baseline.get("stages", [])}
+    slower = []
+    for stage in report["stages"]:
+        old = before.get(stage["name"])
+        if old and stage["wall_s"] > old * (1 + tolerance):
+            slower.append(f"{stage['name']}: {stage['wall_s']}s vs {old}s baseline")
+    return slower
+
+
+def _version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("agent")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = ArgumentParser(prog="python -m agent.bench.suite", description=__doc__)
+    parser.add_argument("--modules", type=int, default=50, help="Synthetic modules (and tests).")
+    parser.add_argument("--funcs", type=int, default=8, help="Functions per module.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma‑separated subset.")
+    parser.add_argument("--queries", type=int, default=1000, help="Search stage queries.")
+    parser.add_argument("--patch-files", type=int, default=50, help="Files in the patch stage.")
+    parser.add_argument("--commands", type=int, default=40, help="Executor stage commands.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Executor concurrency.")
+    parser.add_argument("--workers", type=int, default=1, help="Pytest shards in the pipeline.")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Simulated LLM latency (s).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc.")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--compare", type=Path, help="Baseline report to check against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown.")
+    ns = parser.parse_args(argv)
+
+    report = run(
+        modules=ns.modules,
+        funcs=ns.funcs,
+        stages=[s for s in ns.stages.split(",") if s],
+        queries=ns.queries,
+        patch_files=ns.patch_files,
+        commands=ns.commands,
+        concurrency=ns.concurrency,
+        workers=ns.workers,
+        ttft=ns.ttft,
+        memory=not ns.no_memory,
+    )
+    if ns.compare is not None:
+        report["regressions"] = compare(
+            report, json.loads(ns.compare.read_text(encoding="utf-8")), ns.tolerance
+        )
+    text = json.dumps(report, indent=2)
+    if ns.out is not None:
+        ns.out.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# src/agent/bench/synthetic.py
+"""Synthetic Python projects of configurable size, plus matching coder scripts."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+
+def module_source(i: int, funcs: int) -> str:
+    parent = f"from pkg import mod_{(i - 1) // 2}\n\nPARENT = mod_{(i - 1) // 2}.__name__\n" if i else ""
+    body = "".join(
+        f'\ndef f{i}_{j}(x):\n    """Return *x* scaled by {j + 1}."""\n    return x * {j + 1}\n\n'
+        for j in range(funcs)
+    )
+    return f'"""Synthetic module {i}."""\n\n{parent}{body}'
+
+
+def test_source(i: int) -> str:
+    return f"from pkg.mod_{i} import f{i}_0\n\n\ndef test_f{i}_0():\n    assert f{i}_0(2) == 2\n"
+
+
+def make_repo(root: Path, modules: int = 50, funcs: int = 8, tests: bool = True) -> Path:
+    """Write ``pkg/mod_<i>.py`` (a binary import tree) and one test per module."""
+    pkg = root / "pkg"
+    pkg.mkdir(parents=True, exist_ok=True)
+    (pkg / "__init__.py").write_text("", encoding="utf-8")
+    for i in range(modules):
+        (pkg / f"mod_{i}.py").write_text(module_source(i, funcs), encoding="utf-8")
+    if tests:
+        (root / "tests").mkdir(exist_ok=True)
+        for i in range(modules):
+            (root / "tests" / f"test_mod_{i}.py").write_text(test_source(i), encoding="utf-8")
+    return root
+
+
+def scale_patch(i: int, j: int, old: int, new: int) -> str:
+    """Unified diff changing ``f<i>_<j>`` to scale by *new* instead of *old*."""
+    return (
+        f"--- a/pkg/mod_{i}.py\n+++ b/pkg/mod_{i}.py\n"
+        f"@@ -{4 + 5 * j},3 +{4 + 5 * j},3 @@\n"
+        f" def f{i}_{j}(x):\n"
+        f'     """Return *x* scaled by {j + 1}."""\n'
+        f"-    return x * {old}\n"
+        f"+    return x * {new}\n"
+    )
+
+
+def multi_file_patch(modules: int, files: int) -> str:
+    """One diff annotating ``f<i>_0`` in *files* modules (for patch throughput)."""
+    out = []
+    for i in range(min(files, modules)):
+        out.append(
+            f"--- a/pkg/mod_{i}.py\n+++ b/pkg/mod_{i}.py\n@@ -4,3 +4,3 @@\n"
+            f" def f{i}_0(x):\n"
+            f'     """Return *x* scaled by 1."""\n'
+            f"-    return x * 1\n"
+            f"+    return x * 1  # tuned\n"
+        )
+    return "".join(out)
+
+
+def coder_script(target: int = 0) -> List[str]:
+    """Break ``f<target>_0``, then repair it, then stop (exercises a red → green loop)."""
+    fence = "```diff\n{}```"
+    return [
+        "Scaling f{0}_0 by 3.\n".format(target) + fence.format(scale_patch(target, 0, 1, 3)),
+        "Reverting: the test expects identity.\n" + fence.format(scale_patch(target, 0, 3, 1)),
+        "All checks pass; nothing left to change.",
+    ]
@@ -0,0 +1,2 @@
+# src/agent/checks/__init__.py
+"""Fast feedback for generated changes: test selection, linting, reports."""
@@ -0,0 +1,218 @@
+# src/agent/checks/impact.py
+"""Import‑graph based test impact analysis."""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+GRAPH_NAME = "imports.json"
+_GRAPH_VERSION = 1
+_SOURCE_ROOTS = ("", "src", "lib")
+
+
+def is_test_file(rel: str) -> bool:
+    """pytest's default discovery pattern: ``test_*.py`` or ``*_test.py``."""
+    name = rel.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def walk_python(root: Path, exclude: Set[str]) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for every ``.py`` file under *root*, skipping *exclude* and dot‑dirs."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in exclude and not d.startswith(".")]
+        for name in filenames:
+            if name.endswith(".py"):
+                path = Path(dirpath) / name
+                try:
+                    yield path, path.stat()
+                except OSError:
+                    continue
+
+
+def _imports(source: str, module: str, is_pkg: bool) -> List[str]:
+    """Dotted names *source* may import (absolute, with relatives resolved)."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    package = module if is_pkg else module.rpartition(".")[0]
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                if node.level - 1 > len(parts):
+                    continue
+                parts = parts[: len(parts) - (node.level - 1)]
+                base = ".".join(p for p in (*parts, base) if p)
+            if not base:
+                continue
+            names.add(base)
+            # ``from pkg import mod`` may import a submodule.
+            names.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+    return sorted(names)
+
+
+class ImportGraph:
+    """Module dependency graph of the Python files under *root*.
+
+    Per‑file imports are cached in *cache_path* and only re‑parsed when a
+    file's mtime/size changed and its content hash differs.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        exclude_dirs: Iterable[str] = (),
+        cache_path: Path | None = None,
+    ) -> None:
+        self._root = root
+        self._exclude = set(exclude_dirs)
+        self._cache_path = cache_path
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        if cache_path is not None and cache_path.exists():
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == _GRAPH_VERSION:
+                self._files = data.get("files", {})
+
+    # ------------------------------------------------------------------ #
+    def refresh(self) -> None:
+        """Bring the graph up to date with the working tree."""
+        files: Dict[str, Dict[str, Any]] = {}
+        dirty = False
+        for path, st in walk_python(self._root, self._exclude):
+            rel = path.relative_to(self._root).as_posix()
+            old = self._files.get(rel)
+            if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                files[rel] = old
+                continue
+            dirty = True
+            data = path.read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            if old and old["sha"] == sha:
+                files[rel] = {**old, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                continue
+            module, is_pkg = self._module(rel)
+            source = data.decode("utf-8", errors="replace")
+            files[rel] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha": sha,
+                "imports": _imports(source, module, is_pkg),
+            }
+        dirty = dirty or files.keys() != self._files.keys()
+        self._files = files
+        self._link()
+        if dirty:
+            self._save()
+
+    def test_files(self) -> List[str]:
+        """Every test file under *root* (relative POSIX paths)."""
+        self.refresh()
+        return sorted(rel for rel in self._files if is_test_file(rel))
+
+    def affected_tests(self, changed: Iterable[Path]) -> List[str] | None:
+        """Test files (relative POSIX paths) that transitively import *changed*.
+
+        Returns ``None`` when the impact cannot be bounded — a changed
+        non‑Python file, a file outside *root*, or one missing from the graph
+        (deleted, so nothing imports it any more) — so the caller should run
+        the whole suite.
+        """
+        self.refresh()
+        seeds: List[str] = []
+        for path in changed:
+            try:
+                rel = Path(path).resolve().relative_to(self._root.resolve()).as_posix()
+            except ValueError:
+                return None
+            if not rel.endswith(".py") or rel not in self._files:
+                return None
+            seeds.append(rel)
+
+        seen: Set[str] = set(seeds)
+        queue = deque(seeds)
+        while queue:
+            for dep in self._dependents.get(queue.popleft(), ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    queue.append(dep)
+
+        tests = {rel for rel in seen if is_test_file(rel) and rel in self._files}
+        # A conftest change reaches every test collected below it.
+        for rel in seen:
+            if rel.rsplit("/", 1)[-1] == "conftest.py":
+                scope = rel[: -len("conftest.py")]
+                tests.update(t for t in self._files if t.startswith(scope) and is_test_file(t))
+        return sorted(tests)
+
+    # ------------------------------------------------------------------ #
+    def _module(self, rel: str) -> Tuple[str, bool]:
+        parts = rel[:-3].split("/")
+        is_pkg = parts[-1] == "__init__"
+        if is_pkg:
+            parts = parts[:-1]
+        for prefix in _SOURCE_ROOTS[1:]:
+            if parts and parts[0] == prefix and len(parts) > 1:
+                parts = parts[1:]
+                break
+        return ".".join(parts), is_pkg
+
+    def _link(self) -> None:
+        modules: Dict[str, str] = {}
+        for rel in self._files:
+            for name in self._names(rel):
+                modules.setdefault(name, rel)
+        # Test dirs without ``__init__`` put their own folder on sys.path
+        # (rootdir‑relative imports); proper dotted names take precedence.
+        for rel in self._files:
+            modules.setdefault(rel[:-3].rsplit("/", 1)[-1], rel)
+        dependents: Dict[str, Set[str]] = {}
+        for rel, entry in self._files.items():
+            for name in entry["imports"]:
+                # Importing ``a.b.c`` also executes ``a`` and ``a.b``.
+                pieces = name.split(".")
+                for i in range(1, len(pieces) + 1):
+                    target = modules.get(".".join(pieces[:i]))
+                    if target is not None and target != rel:
+                        dependents.setdefault(target, set()).add(rel)
+        self._dependents = dependents
+
+    def _names(self, rel: str) -> Iterator[str]:
+        """Every dotted name *rel* is importable as (plain and source‑root layouts)."""
+        parts = rel[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts:
+            yield ".".join(parts)
+        if len(parts) > 1 and parts[0] in _SOURCE_ROOTS[1:]:
+            yield ".".join(parts[1:])
+
+    def _save(self) -> None:
+        if self._cache_path is None:
+            return
+        payload = {"version": _GRAPH_VERSION, "files": self._files}
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self._cache_path)
+        except OSError as exc:
+            log.debug("could not save import graph: %s", exc)
+
@@ -0,0 +1,136 @@
+# src/agent/checks/junit.py
+"""Parse pytest JUnit XML into a compact failure digest."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+
+@dataclass
+class CaseResult:
+    """One test case as reported by pytest."""
+
+    nodeid: str
+    outcome: str  # "passed" | "failed" | "error" | "skipped"
+    seconds: float = 0.0
+    message: str = ""
+    details: str = ""
+
+
+@dataclass
+class SuiteReport:
+    """Aggregated results of one or more JUnit files."""
+
+    cases: List[CaseResult] = field(default_factory=list)
+    seconds: float = 0.0
+    missing: int = 0  # shards that produced no XML (crash, collection abort)
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for c in self.cases if c.outcome == outcome)
+
+    @property
+    def failures(self) -> List[CaseResult]:
+        return [c for c in self.cases if c.outcome in ("failed", "error")]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures and not self.missing
+
+    def file_seconds(self) -> Dict[str, float]:
+        """Total duration per test file, used to balance the next sharding."""
+        out: Dict[str, float] = {}
+        for c in self.cases:
+            path = c.nodeid.split("::", 1)[0]
+            out[path] = out.get(path, 0.0) + c.seconds
+        return out
+
+
+def _nodeid(classname: str, name: str, files: Sequence[str]) -> str:
+    """Rebuild ``path::Class::test`` from JUnit's dotted ``classname``."""
+    for rel in files:
+        module = rel[:-3].replace("/", ".")
+        if classname == module or classname.startswith(module + "."):
+            rest = classname[len(module) + 1 :]
+            return "::".join(p for p in (rel, *rest.split("."), name) if p)
+    return f"{classname}::{name}" if classname else name
+
+
+def parse_junit(path: Path, files: Sequence[str] = ()) -> List[CaseResult]:
+    """Read one JUnit XML file written by ``pytest --junitxml``."""
+    root = ET.parse(path).getroot()
+    cases: List[CaseResult] = []
+    for tc in root.iter("testcase"):
+        outcome, message, details = "passed", "", ""
+        for tag in ("failure", "error", "skipped"):
+            node = tc.find(tag)
+            if node is not None:
+                outcome = {"failure": "failed"}.get(tag, tag)
+                message = node.get("message", "")
+                details = node.text or ""
+                break
+        cases.append(
+            CaseResult(
+                _nodeid(tc.get("classname", ""), tc.get("name", ""), files),
+                outcome,
+                float(tc.get("time") or 0.0),
+                message,
+                details,
+            )
+        )
+    return cases
+
+
+def merge(parts: Iterable[List[CaseResult] | None], seconds: float) -> SuiteReport:
+    """Combine per‑shard results; ``None`` marks a shard without XML."""
+    report = SuiteReport(seconds=seconds)
+    for part in parts:
+        if part is None:
+            report.missing += 1
+        else:
+            report.cases.extend(part)
+    return report
+
+
+def _short_tb(details: str, lines: int) -> List[str]:
+    rows = [r.rstrip() for r in details.strip().splitlines() if r.strip()]
+    return rows[-lines:]
+
+
+def digest(report: SuiteReport, max_failures: int = 10, tb_lines: int = 12) -> str:
+    """Summary line plus id, assertion and short traceback per failure."""
+    head = ", ".join(
+        f"{n} {label}"
+        for label, n in (
+            ("failed", report.count("failed")),
+            ("errors", report.count("error")),
+            ("passed", report.count("passed")),
+            ("skipped", report.count("skipped")),
+        )
+        if n
+    ) or "no tests ran"
+    out = [f"{head} in {report.seconds:.1f}s"]
+    if report.missing:
+        out.append(f"{report.missing} shard(s) produced no results (crash or collection error)")
+    failures = report.failures
+    for case in failures[:max_failures]:
+        out.append(f"{case.outcome.upper()} {case.nodeid}")
+        if case.message:
+            out.append("  " + case.message.splitlines()[0][:300])
+        out.extend("    " + r for r in _short_tb(case.details, tb_lines))
+    if len(failures) > max_failures:
+        out.append(f"… and {len(failures) - max_failures} more failures")
+    return "\n".join(out)
+
+
+def shard(files: Sequence[str], workers: int, weights: Dict[str, float]) -> List[List[str]]:
+    """Split *files* into at most *workers* groups of similar expected duration."""
+    groups: List[List[str]] = [[] for _ in range(max(1, min(workers, len(files))))]
+    load = [0.0] * len(groups)
+    for rel in sorted(files, key=lambda f: -weights.get(f, 1.0)):
+        i = load.index(min(load))
+        groups[i].append(rel)
+        load[i] += weights.get(rel, 1.0)
+    return [g for g in groups if g]
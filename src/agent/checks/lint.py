@@ -0,0 +1,211 @@
+# src/agent/checks/lint.py
+"""Incremental linting with per‑file results cached by content hash."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+from ..core.executor import Executor
+from .impact import walk_python
+
+log = logging.getLogger(__name__)
+
+LINT_CACHE_NAME = "lint.json"
+_CACHE_VERSION = 1
+_CONFIG_FILES = (".flake8", "setup.cfg", "tox.ini")
+_ISSUE_RE = re.compile(r"^(?P<path>.+?):(?P<line>\d+):(?P<col>\d+):\s*(?P<msg>.*)$")
+_ARGV_BATCH = 200  # files per linter process
+
+
+class LintError(RuntimeError):
+    """The linter itself failed (not installed, crashed, bad config)."""
+
+
+class Linter(ABC):
+    """Lint a set of files; issues are ``"line:col: message"`` per relative path."""
+
+    name: str = "lint"
+
+    def config_key(self, root: Path) -> str:
+        """Hash of everything besides file content that changes the output."""
+        h = hashlib.sha256(self.name.encode())
+        for name in _CONFIG_FILES:
+            path = root / name
+            if path.exists():
+                h.update(name.encode() + b"\0" + path.read_bytes())
+        return h.hexdigest()
+
+    @abstractmethod
+    async def alint(self, files: Sequence[str]) -> Dict[str, List[str]]:
+        """Return issues for each of *files* (every file gets an entry)."""
+
+
+class Flake8Linter(Linter):
+    """``flake8`` run through the :class:`Executor` on just the given files."""
+
+    name = "flake8"
+
+    def __init__(self, executor: Executor) -> None:
+        self._executor = executor
+
+    async def alint(self, files: Sequence[str]) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {f: [] for f in files}
+        for i in range(0, len(files), _ARGV_BATCH):
+            batch = list(files[i : i + _ARGV_BATCH])
+            try:
+                rc, stdout, stderr = await self._executor.arun(["flake8", *batch])
+            except OSError as exc:  # binary missing on the host
+                raise LintError(f"flake8 could not be started: {exc}") from exc
+            if rc not in (0, 1):
+                raise LintError(f"flake8 exit={rc}\n{stderr or stdout}")
+            for line in stdout.splitlines():
+                m = _ISSUE_RE.match(line)
+                if m is None:
+                    continue
+                rel = m["path"][2:] if m["path"].startswith("./") else m["path"]
+                out.setdefault(rel, []).append(f"{m['line']}:{m['col']}: {m['msg']}")
+        return out
+
+
+class PyflakesLinter(Linter):
+    """In‑process ``pyflakes``: no subprocess or container per review."""
+
+    name = "pyflakes"
+
+    def __init__(self, root: Path) -> None:
+        if importlib.util.find_spec("pyflakes") is None:  # fail early, not on first review
+            raise ImportError("pyflakes is not installed")
+        self._root = root
+
+    def config_key(self, root: Path) -> str:
+        import pyflakes  # type: ignore
+
+        return hashlib.sha256(f"pyflakes:{pyflakes.__version__}".encode()).hexdigest()
+
+    async def alint(self, files: Sequence[str]) -> Dict[str, List[str]]:
+        return await asyncio.to_thread(self._lint_sync, list(files))
+
+    def _lint_sync(self, files: List[str]) -> Dict[str, List[str]]:
+        from pyflakes import api, reporter  # type: ignore
+
+        out: Dict[str, List[str]] = {}
+        for rel in files:
+            issues: List[str] = []
+            sink = _Collector(issues)
+            try:
+                source = (self._root / rel).read_text(encoding="utf-8", errors="replace")
+            except OSError as exc:
+                issues.append(f"1:1: E902 {exc}")
+            else:
+                api.check(source, rel, reporter.Reporter(sink, sink))
+            out[rel] = issues
+        return out
+
+
+class _Collector:
+    """File‑like sink turning pyflakes' ``path:line:col: msg`` output into issues."""
+
+    def __init__(self, issues: List[str]) -> None:
+        self._issues = issues
+
+    def write(self, text: str) -> None:
+        for line in text.splitlines():
+            m = _ISSUE_RE.match(line)
+            if m is not None:
+                self._issues.append(f"{m['line']}:{m['col']}: {m['msg']}")
+            elif line.strip() and not self._issues:
+                self._issues.append(f"1:1: {line.strip()}")
+
+    def flush(self) -> None:  # pragma: no cover - file protocol
+        pass
+
+
+class IncrementalLinter:
+    """Lint only files whose content changed since the last review.
+
+    Issues are cached per file in *cache_path*, keyed by content hash and the
+    linter's :meth:`Linter.config_key`, and merged into a project‑wide report.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        linter: Linter,
+        exclude_dirs: Iterable[str] = (),
+        cache_path: Path | None = None,
+    ) -> None:
+        self._root = root
+        self._linter = linter
+        self._exclude: Set[str] = set(exclude_dirs)
+        self._cache_path = cache_path
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._config = ""
+        if cache_path is not None and cache_path.exists():
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == _CACHE_VERSION:
+                self._config = data.get("config", "")
+                self._files = data.get("files", {})
+
+    @property
+    def name(self) -> str:
+        return self._linter.name
+
+    async def arun(self) -> Tuple[Dict[str, List[str]], int]:
+        """Return (issues per file with issues, number of files actually linted)."""
+        config = await asyncio.to_thread(self._linter.config_key, self._root)
+        if config != self._config:
+            self._files, self._config = {}, config
+        files, stale = await asyncio.to_thread(self._scan)
+        if stale:
+            issues = await self._linter.alint(stale)
+            for rel in stale:
+                files[rel]["issues"] = issues.get(rel, [])
+        self._files = files
+        await asyncio.to_thread(self._save)
+        report = {rel: e["issues"] for rel, e in sorted(files.items()) if e["issues"]}
+        return report, len(stale)
+
+    # ------------------------------------------------------------------ #
+    def _scan(self) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        files: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        for path, st in walk_python(self._root, self._exclude):
+            rel = path.relative_to(self._root).as_posix()
+            old = self._files.get(rel)
+            if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                files[rel] = old
+                continue
+            try:
+                sha = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                continue
+            if old and old["sha"] == sha:
+                files[rel] = {**old, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                continue
+            files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha": sha, "issues": []}
+            stale.append(rel)
+        return files, stale
+
+    def _save(self) -> None:
+        if self._cache_path is None:
+            return
+        payload = {"version": _CACHE_VERSION, "config": self._config, "files": self._files}
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self._cache_path)
+        except OSError as exc:
+            log.debug("could not save lint cache: %s", exc)
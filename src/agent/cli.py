@@ -4,51 +4,220 @@
 from __future__ import annotations
 
 import os
-from argparse import ArgumentParser
+import sys
+from argparse import ArgumentParser, Namespace
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, TypeVar
 
-from .config import AgentConfig
-from .core.system import AgentSystem
+from .core.system import PIPELINE_NAMES, AgentSystem
+
+if TYPE_CHECKING:
+    from .config import AgentConfig
+
+T = TypeVar("T")
+
+# pydantic, the provider SDKs and the pipelines are imported only after the
+# arguments parsed, so ``--help`` and usage errors return immediately.
+
+
+def _parse_specs(raw: list[str] | None) -> List[Tuple[str, Tuple[str, str]]]:
+    """``role:provider:model`` strings → ``(role, (provider, model))`` pairs."""
+    pairs: List[Tuple[str, Tuple[str, str]]] = []
+    for spec in raw or ():
+        role, provider, model = spec.split(":", 2)
+        pairs.append((role, (provider, model)))
+    return pairs
 
 
 def _parse_models(raw: list[str] | None) -> Dict[str, Tuple[str, str]]:
-    mapping: Dict[str, Tuple[str, str]] = {}
-    if raw:
-        for spec in raw:
-            role, provider, model = spec.split(":", 2)
-            mapping[role] = (provider, model)
-    return mapping
+    return dict(_parse_specs(raw))
 
 
-def main() -> None:
-    parser = ArgumentParser(description="AutoGen multipurpose code‑assistant.")
-    parser.add_argument("--path", required=True, help="Target code folder.")
-    parser.add_argument(
-        "--pipeline",
-        choices=["refactor", "docs", "test", "validate"],
-        default="refactor",
-    )
+def _parse_fallbacks(raw: list[str] | None) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    chains: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+    for role, descriptor in _parse_specs(raw):
+        chains[role] = (*chains.get(role, ()), descriptor)
+    return chains
+
+
+def _add_common(parser: ArgumentParser) -> None:
     parser.add_argument(
         "--model",
         action="append",
         help="role:provider:model (repeatable). Example: coder:openai:gpt-4o",
     )
-    parser.add_argument("prompt", help="Task for the agents.")
-    ns = parser.parse_args()
+    parser.add_argument(
+        "--fallback",
+        action="append",
+        help="role:provider:model tried when the role's model fails (repeatable, in order).",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Also ask a role's first fallback when its model is slower than usual to respond.",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        metavar="FILE",
+        type=Path,
+        help="Record completions in this SQLite file and serve repeats from it.",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve completions only from the cache; fail on a miss (no network).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time, tokens and bytes per span (LLM, embed, exec, patch) at exit.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        type=Path,
+        help="Write spans to FILE: OTLP/JSON for *.json, JSONL otherwise.",
+    )
+    parser.add_argument(
+        "--price",
+        action="append",
+        metavar="MODEL=IN,OUT",
+        help="USD per 1M prompt/completion tokens, for --profile cost estimates.",
+    )
+
+
+def _parse_prices(raw: list[str] | None) -> Dict[str, Tuple[float, float]]:
+    prices: Dict[str, Tuple[float, float]] = {}
+    for spec in raw or ():
+        model, _, rates = spec.partition("=")
+        prompt, _, completion = rates.partition(",")
+        prices[model] = (float(prompt), float(completion or prompt))
+    return prices
+
+
+def _run(ns: Namespace, fn: Callable[[], T]) -> T:
+    """Call *fn*, recording spans when ``--profile`` or ``--trace`` was given."""
+    if not (ns.profile or ns.trace):
+        return fn()
+    from .core.tracing import Tracer, tracing
 
-    cfg = AgentConfig(
-        project_path=Path(ns.path).resolve(),
+    tracer = Tracer()
+    try:
+        with tracing(tracer):
+            return fn()
+    finally:
+        if ns.trace:
+            tracer.export(ns.trace)
+        if ns.profile:
+            print(tracer.format_summary(_parse_prices(ns.price)), file=sys.stderr)
+
+
+def _echo() -> Callable[[str, str], None]:
+    """Token callback writing ``[Agent] text…`` to stdout, one line block per reply."""
+    started = [False]
+
+    def emit(agent: str, text: str) -> None:
+        if not text:
+            sys.stdout.write("\n\n")
+        elif not started[0]:
+            sys.stdout.write(f"[{agent}] {text}")
+        else:
+            sys.stdout.write(text)
+        started[0] = bool(text)
+        sys.stdout.flush()
+
+    return emit
+
+
+def _config(ns: Namespace, project_path: Path) -> "AgentConfig":
+    from .config import AgentConfig, LLMCacheConfig, RoutingConfig
+
+    cache_kwargs = {"path": ns.llm_cache.resolve()} if ns.llm_cache is not None else {}
+    llm_cache = LLMCacheConfig(
+        enabled=ns.llm_cache is not None or ns.replay, replay=ns.replay, **cache_kwargs
+    )
+    return AgentConfig(
+        project_path=project_path,
         model_providers=_parse_models(ns.model)
         or {
             "coder": ("openai", "gpt-4o"),
             "tester": ("openai", "gpt-4o"),
             "reviewer": ("openai", "gpt-4o"),
         },
-        provider_configs={"openai": {"api_key": os.getenv("OPENAI_API_KEY")}},
+        provider_configs={
+            "openai": {"api_key": os.getenv("OPENAI_API_KEY")},
+            "anthropic": {"api_key": os.getenv("ANTHROPIC_API_KEY")},
+        },
         embedding_provider=("openai", "text-embedding-3-small"),
+        llm_cache=llm_cache,
+        routing=RoutingConfig(fallbacks=_parse_fallbacks(ns.fallback), hedge=ns.hedge),
     )
-    AgentSystem(cfg).run_pipeline(ns.pipeline, ns.prompt)
+
+
+def _parse_args(parser: ArgumentParser, argv: List[str]) -> Namespace:
+    """Parse *argv*, rejecting option combinations that would silently do nothing."""
+    ns = parser.parse_args(argv)
+    if ns.hedge and not ns.fallback:
+        parser.error("--hedge needs at least one --fallback to hedge with")
+    return ns
+
+
+def _batch_main(argv: List[str]) -> None:
+    from .core.batch import load_manifest
+
+    parser = ArgumentParser(
+        prog="agent batch", description="Run a JSONL manifest of jobs in one process."
+    )
+    parser.add_argument(
+        "manifest", type=Path, help='JSONL lines: {"path", "pipeline", "prompt"[, "id"]}.'
+    )
+    parser.add_argument(
+        "--out", type=Path, help="Results JSONL (default: <manifest>.results.jsonl)."
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs run at once.")
+    _add_common(parser)
+    ns = _parse_args(parser, argv)
+
+    jobs = load_manifest(ns.manifest)
+    out = ns.out or ns.manifest.with_name(ns.manifest.stem + ".results.jsonl")
+    cfg = _config(ns, jobs[0].path if jobs else Path.cwd())
+    results = _run(ns, lambda: AgentSystem(cfg).run_batch(jobs, out, ns.concurrency))
+    failed = sum(1 for r in results if not r.ok)
+    print(f"{len(results) - failed}/{len(results)} jobs succeeded; results in {out}")
+    if failed:
+        sys.exit(1)
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if argv[:1] == ["batch"]:
+        _batch_main(argv[1:])
+        return
+
+    parser = ArgumentParser(description="AutoGen multipurpose code‑assistant.")
+    parser.add_argument("--path", required=True, help="Target code folder.")
+    parser.add_argument(
+        "--pipeline",
+        choices=PIPELINE_NAMES,
+        default="refactor",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the coder's replies token by token as they are generated.",
+    )
+    _add_common(parser)
+    parser.add_argument("prompt", help="Task for the agents.")
+    ns = _parse_args(parser, argv)
+
+    cfg = _config(ns, Path(ns.path).resolve())
+    if not ns.stream:
+        _run(ns, lambda: AgentSystem(cfg).run_pipeline(ns.pipeline, ns.prompt))
+        return
+    from .core.agent_base import streaming
+
+    with streaming(_echo()):
+        _run(ns, lambda: AgentSystem(cfg).run_pipeline(ns.pipeline, ns.prompt))
 
 
 if __name__ == "__main__":
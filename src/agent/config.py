@@ -4,17 +4,31 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, Literal, Mapping, Tuple
+from typing import Any, Dict, Iterable, Literal, Mapping, Tuple
 
 from pydantic import BaseModel, Field, validator
 
-ProviderName = Literal["openai", "anthropic"]
+ProviderName = str  # built in: "openai", "anthropic"; more via models.factory.register_provider
 ModelDescriptor = Tuple[ProviderName, str]
 
 
+def _check_providers(role: str, descriptors: Iterable[ModelDescriptor]) -> None:
+    """Reject LLM providers that :mod:`agent.models.factory` cannot build."""
+    from .models.factory import PROVIDERS
+
+    for provider, _ in descriptors:
+        if provider not in PROVIDERS:
+            raise ValueError(
+                f"Unknown LLM provider {provider!r} for {role!r} (known: {', '.join(PROVIDERS)})"
+            )
+
+
 class VectorStoreConfig(BaseModel):
-    """Settings for Chroma vector DB."""
+    """Settings for the vector store (Chroma or in‑process NumPy)."""
 
+    backend: Literal["chroma", "numpy"] = Field(
+        "chroma", description="`numpy` avoids loading chromadb for small/medium repos."
+    )
     persist: bool = Field(False, description="Persist index on disk?")
     persist_path: Path | None = Field(
         None, description="Directory for the persistent index"
@@ -26,6 +40,11 @@ class VectorStoreConfig(BaseModel):
             raise ValueError("`persist_path` must be set when `persist=True`.")
         return v
 
+    ivf_lists: int = Field(
+        0, description="NumPy backend: IVF coarse centroids (0 = exact brute force)."
+    )
+    ivf_probe: int = Field(8, description="NumPy backend: IVF lists scanned per query.")
+
 
 class ExecutionConfig(BaseModel):
     """Sandbox / runtime settings for executing generated code."""
@@ -33,6 +52,168 @@ class ExecutionConfig(BaseModel):
     use_docker: bool = Field(True, description="Run commands inside Docker.")
     image: str = Field("python:3.12-slim", description="Docker image.")
     timeout: int = Field(60, description="Seconds allowed per command.")
+    max_output_bytes: int = Field(
+        1_000_000, description="Per‑stream capture cap; head and tail are kept."
+    )
+    pool_size: int = Field(
+        0, description="Warm containers per image reused via `docker exec` (0 = `docker run --rm`)."
+    )
+    pool_max_uses: int = Field(50, description="Commands before a container is recycled.")
+    pool_max_age: float = Field(600.0, description="Seconds before a container is recycled.")
+
+
+class TestingConfig(BaseModel):
+    """How the tester selects and runs tests."""
+
+    command: Tuple[str, ...] = Field(("pytest", "-q"), description="Test runner invocation.")
+    select_affected: bool = Field(
+        True, description="Run only tests that import the changed files first."
+    )
+    full_on_green: bool = Field(
+        True, description="Confirm with the full suite once the affected tests pass."
+    )
+    workers: int = Field(
+        1, description="Parallel pytest shards (0 = one per CPU)."
+    )
+    max_failures: int = Field(10, description="Failures detailed in the tester's digest.")
+    traceback_lines: int = Field(12, description="Traceback lines kept per failure.")
+
+
+class LintConfig(BaseModel):
+    """How the reviewer lints the project."""
+
+    backend: Literal["flake8", "pyflakes"] = Field(
+        "flake8", description="`flake8` via the executor, or in‑process `pyflakes`."
+    )
+    max_issues: int = Field(200, description="Issues listed in the reviewer's report.")
+
+
+class ConversationConfig(BaseModel):
+    """How agent turns are scheduled."""
+
+    mode: Literal["parallel", "groupchat"] = Field(
+        "parallel",
+        description="`parallel`: checkers run concurrently after each coder turn; "
+        "`groupchat`: AutoGen GroupChat, one agent at a time.",
+    )
+    speculative: bool = Field(
+        True, description="Start the next coder draft as soon as one check fails."
+    )
+
+
+class IndexConfig(BaseModel):
+    """Settings for the incremental codebase indexer."""
+
+    enabled: bool = Field(True, description="Index `project_path` before each run.")
+    extensions: Tuple[str, ...] = Field(
+        (".py", ".pyi", ".md", ".rst", ".txt", ".toml", ".cfg", ".ini", ".yaml", ".yml"),
+        description="File suffixes that are chunked and embedded.",
+    )
+    exclude_dirs: Tuple[str, ...] = Field(
+        (".git", ".hg", "__pycache__", ".venv", "venv", "node_modules", ".tox",
+         ".mypy_cache", ".pytest_cache", "build", "dist", ".agent"),
+        description="Directory names that are never descended into.",
+    )
+    max_chunk_lines: int = Field(120, description="Upper bound on lines per chunk.")
+    max_file_bytes: int = Field(1_000_000, description="Larger files are skipped.")
+    batch_size: int = Field(
+        2048, description="Chunks per indexing round (split further by the embedding engine)."
+    )
+
+
+class EmbeddingEngineConfig(BaseModel):
+    """Batching, concurrency and retry knobs for embedding requests."""
+
+    max_batch_tokens: int = Field(100_000, description="Token budget per request.")
+    max_batch_size: int = Field(512, description="Inputs per request.")
+    max_input_tokens: int = Field(8191, description="Longer inputs are truncated.")
+    concurrency: int = Field(4, description="Requests in flight at once.")
+    max_retries: int = Field(6, description="Retries on rate‑limit / transient errors.")
+
+
+class EmbeddingCacheConfig(BaseModel):
+    """On‑disk cache of embedding vectors keyed by (model, text hash)."""
+
+    enabled: bool = Field(True, description="Serve repeated texts from the cache.")
+    path: Path = Field(
+        Path.home() / ".cache" / "agent" / "embeddings",
+        description="Cache root, shared across projects, branches and pipelines.",
+    )
+    max_entries: int = Field(500_000, description="LRU eviction threshold per model.")
+
+
+class ContextConfig(BaseModel):
+    """Prompt budget for agents that receive retrieved code context."""
+
+    token_budget: int = Field(12_000, description="Max prompt tokens per turn.")
+    retrieval_k: int = Field(12, description="Vector‑store hits considered per task.")
+    retrieval_share: float = Field(
+        0.5, description="Fraction of the budget (after system + task) for code."
+    )
+    recent_messages: int = Field(6, description="Newest messages kept verbatim.")
+    max_message_tokens: int = Field(2_000, description="Cap per verbatim message.")
+
+
+class HttpConfig(BaseModel):
+    """Connection pool shared by all provider clients."""
+
+    max_connections: int = Field(100, description="Open connections per endpoint.")
+    max_keepalive_connections: int = Field(20, description="Idle connections kept warm.")
+    keepalive_expiry: float = Field(60.0, description="Seconds an idle connection lives.")
+    http2: bool = Field(True, description="Use HTTP/2 when the `h2` package is installed.")
+    timeout: float = Field(600.0, description="Read/write timeout in seconds.")
+    connect_timeout: float = Field(10.0, description="Connect timeout in seconds.")
+
+
+class RateLimit(BaseModel):
+    """Requests / tokens per minute for one provider or ``provider:model`` lane."""
+
+    rpm: float | None = Field(None, description="Requests per minute (None = unlimited).")
+    tpm: float | None = Field(None, description="Tokens per minute (None = unlimited).")
+
+
+class LLMCacheConfig(BaseModel):
+    """Local completion cache (and network‑free replay)."""
+
+    enabled: bool = Field(False, description="Record completions and serve repeats.")
+    path: Path = Field(
+        Path.home() / ".cache" / "agent" / "llm.sqlite", description="SQLite cache file."
+    )
+    replay: bool = Field(
+        False, description="Serve only from the cache; a miss is an error."
+    )
+
+
+class RoutingConfig(BaseModel):
+    """Per‑role fallback chains and hedged requests."""
+
+    fallbacks: Dict[str, Tuple[ModelDescriptor, ...]] = Field(
+        default_factory=dict,
+        description="role → alternates tried in order when the primary fails. "
+        'Example: {"coder": (("anthropic", "claude-sonnet-4-5"),)}',
+    )
+    hedge: bool = Field(
+        False,
+        description="Also ask the first alternate when the primary has not produced "
+        "a token within its usual time to first token.",
+    )
+    hedge_percentile: float = Field(
+        0.95, description="TTFT percentile of the primary that triggers the hedge."
+    )
+    hedge_min_samples: int = Field(
+        20, description="Observed TTFTs needed before a model is hedged."
+    )
+    hedge_min_delay: float = Field(
+        0.5, description="Never hedge sooner than this many seconds."
+    )
+
+    @validator("fallbacks")
+    def _known_fallbacks(
+        cls, v: Dict[str, Tuple[ModelDescriptor, ...]]
+    ) -> Dict[str, Tuple[ModelDescriptor, ...]]:
+        for role, chain in v.items():
+            _check_providers(role, chain)
+        return v
 
 
 class AgentConfig(BaseModel):
@@ -53,9 +234,42 @@ class AgentConfig(BaseModel):
     embedding_config: Dict[str, Any] = Field(
         default_factory=dict, description="API key & kwargs for embeddings."
     )
+    embedding_engine: EmbeddingEngineConfig = Field(
+        default_factory=EmbeddingEngineConfig, description="Embedding batching."
+    )
+    embedding_cache: EmbeddingCacheConfig = Field(
+        default_factory=EmbeddingCacheConfig, description="Embedding vector cache."
+    )
     vector_store: VectorStoreConfig = Field(
-        default_factory=VectorStoreConfig, description="ChromaDB settings."
+        default_factory=VectorStoreConfig, description="Vector store settings."
+    )
+    index: IndexConfig = Field(
+        default_factory=IndexConfig, description="Codebase indexing."
     )
+    http: HttpConfig = Field(
+        default_factory=HttpConfig, description="Shared provider connection pool."
+    )
+    rate_limits: Dict[str, RateLimit] = Field(
+        default_factory=dict,
+        description='Per lane limits, keyed "provider" or "provider:model". '
+        'Example: {"openai:gpt-4o": {"rpm": 500, "tpm": 300000}}',
+    )
+    llm_cache: LLMCacheConfig = Field(
+        default_factory=LLMCacheConfig, description="Completion cache / replay."
+    )
+    routing: RoutingConfig = Field(
+        default_factory=RoutingConfig, description="Model fallback and hedging."
+    )
+    context: ContextConfig = Field(
+        default_factory=ContextConfig, description="Per‑turn prompt budget."
+    )
+    testing: TestingConfig = Field(
+        default_factory=TestingConfig, description="Test selection."
+    )
+    conversation: ConversationConfig = Field(
+        default_factory=ConversationConfig, description="Turn scheduling."
+    )
+    lint: LintConfig = Field(default_factory=LintConfig, description="Reviewer linting.")
     execution: ExecutionConfig = Field(
         default_factory=ExecutionConfig, description="Code‑execution sandbox."
     )
@@ -63,6 +277,12 @@ class AgentConfig(BaseModel):
         12, description="Safety valve: pipeline stops after this many cycles."
     )
 
+    @validator("model_providers")
+    def _known_providers(cls, v: Dict[str, ModelDescriptor]) -> Dict[str, ModelDescriptor]:
+        for role, descriptor in v.items():
+            _check_providers(role, [descriptor])
+        return v
+
     class Config:
         frozen = True
         validate_assignment = True
@@ -3,16 +3,39 @@
 
 from __future__ import annotations
 
+import contextlib
 from abc import ABC, abstractmethod
-from typing import Sequence
+from contextvars import ContextVar
+from typing import Callable, Iterator, Sequence
+
+# (agent name, text) for each piece of a reply as the model generates it;
+# an empty text marks the end of the reply.
+TokenCallback = Callable[[str, str], None]
+
+_on_token: ContextVar[TokenCallback | None] = ContextVar("agent_on_token", default=None)
+
+
+@contextlib.contextmanager
+def streaming(callback: TokenCallback) -> Iterator[None]:
+    """Deliver reply tokens of agents run inside the block to *callback*."""
+    token = _on_token.set(callback)
+    try:
+        yield
+    finally:
+        _on_token.reset(token)
+
+
+def token_callback() -> TokenCallback | None:
+    return _on_token.get()
 
 
 class Message:
-    """A chat message."""
+    """A chat message; *ok* is set by checking agents (``None`` = not a verdict)."""
 
-    def __init__(self, sender: str, content: str) -> None:
+    def __init__(self, sender: str, content: str, ok: bool | None = None) -> None:
         self.sender = sender
         self.content = content
+        self.ok = ok
 
 
 class AgentBase(ABC):
@@ -26,6 +49,9 @@ class AgentBase(ABC):
         """Display name (used in chat transcripts)."""
         return self._name
 
+    async def aprepare(self) -> None:
+        """Called once before the coder's first patch (e.g. to take a baseline)."""
+
     @abstractmethod
     async def areply(self, history: Sequence[Message]) -> Message:
         """Produce next message given *history*."""
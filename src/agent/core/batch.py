@@ -0,0 +1,136 @@
+# src/agent/core/batch.py
+"""Run many (project, pipeline, prompt) jobs concurrently in one process."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, List, Sequence
+
+from ..config import AgentConfig
+from .resources import SharedResources
+from .system import pipeline_class
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchJob:
+    """One manifest entry."""
+
+    id: str
+    path: Path
+    pipeline: str
+    prompt: str
+
+
+@dataclass
+class JobResult:
+    """One line of the results JSONL."""
+
+    id: str
+    path: str
+    pipeline: str
+    ok: bool
+    seconds: float
+    queued_seconds: float
+    messages: int = 0
+    final: str = ""
+    error: str = ""
+
+
+def load_manifest(path: Path) -> List[BatchJob]:
+    """Read a JSONL manifest of ``{"path", "pipeline", "prompt"[, "id"]}`` objects.
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    jobs: List[BatchJob] = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            raw = json.loads(line)
+            target = Path(raw["path"]).expanduser()
+            if not target.is_absolute():
+                target = path.parent / target
+            jobs.append(
+                BatchJob(
+                    str(raw.get("id") or f"job-{lineno}"),
+                    target.resolve(),
+                    raw.get("pipeline", "refactor"),
+                    raw["prompt"],
+                )
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"{path}:{lineno}: invalid job: {exc}") from exc
+    return jobs
+
+
+class BatchRunner:
+    """Run jobs with at most *concurrency* in flight, sharing one :class:`SharedResources`.
+
+    Every job reuses the same pooled provider clients, rate limiter,
+    embedding caches and sandbox pools; per‑job config differs only in
+    ``project_path`` (and a per‑job subdirectory for a persisted index).
+    """
+
+    def __init__(self, cfg: AgentConfig, concurrency: int = 4) -> None:
+        self._cfg = cfg
+        self._concurrency = max(1, concurrency)
+
+    async def arun(self, jobs: Sequence[BatchJob], out: Path | None = None) -> List[JobResult]:
+        """Run *jobs*; append each result to *out* (JSONL) as soon as it finishes."""
+        res = SharedResources(self._cfg)
+        gate = asyncio.Semaphore(self._concurrency)
+        sink: IO[str] | None = None
+        if out is not None:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            sink = out.open("a", encoding="utf-8")
+        submitted = time.monotonic()
+
+        async def one(job: BatchJob) -> JobResult:
+            async with gate:
+                result = await self._run_job(job, res, time.monotonic() - submitted)
+            if sink is not None:
+                sink.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                sink.flush()
+            return result
+
+        try:
+            return list(await asyncio.gather(*(one(job) for job in jobs)))
+        finally:
+            if sink is not None:
+                sink.close()
+            await res.aclose()
+
+    # ------------------------------------------------------------------ #
+    async def _run_job(self, job: BatchJob, res: SharedResources, queued: float) -> JobResult:
+        start = time.monotonic()
+        base = JobResult(job.id, str(job.path), job.pipeline, False, 0.0, round(queued, 3))
+        try:
+            pipeline = pipeline_class(job.pipeline)(self._job_config(job), res)  # type: ignore[arg-type]
+            transcript = await pipeline.arun(job.prompt)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # one bad job must not sink the batch
+            log.exception("batch job %s failed", job.id)
+            base.error = f"{type(exc).__name__}: {exc}"
+        else:
+            base.ok = True
+            base.messages = len(transcript)
+            base.final = transcript[-1].content if transcript else ""
+        base.seconds = round(time.monotonic() - start, 3)
+        return base
+
+    def _job_config(self, job: BatchJob) -> AgentConfig:
+        update: dict = {"project_path": job.path}
+        vs = self._cfg.vector_store
+        if vs.persist_path is not None:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", job.id)
+            update["vector_store"] = vs.model_copy(update={"persist_path": vs.persist_path / slug})
+        return self._cfg.model_copy(update=update)
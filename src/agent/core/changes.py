@@ -0,0 +1,57 @@
+# src/agent/core/changes.py
+"""Files touched by the coder, shared with the checking agents."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Set
+
+
+class ChangeTracker:
+    """Record paths written by patches; each consumer drains its own view.
+
+    Every consumer (tester, reviewer, …) sees the paths changed since *its*
+    last :meth:`take`, so one agent draining does not hide changes from another.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, Set[Path]] = {}
+        self._all: Set[Path] = set()
+
+    def record(self, paths: Iterable[Path]) -> None:
+        """Mark *paths* as modified."""
+        items = {Path(p) for p in paths}
+        self._all |= items
+        for pending in self._pending.values():
+            pending |= items
+
+    def take(self, consumer: str) -> Set[Path] | None:
+        """Paths changed since *consumer*'s last call; ``None`` on the first call."""
+        if consumer not in self._pending:
+            self._pending[consumer] = set()
+            return None
+        out, self._pending[consumer] = self._pending[consumer], set()
+        return out
+
+    @property
+    def all(self) -> Set[Path]:
+        """Every path modified during this run."""
+        return set(self._all)
+
+
+class PathLocks:
+    """One :class:`asyncio.Lock` per file so concurrent writers never interleave."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[Path, asyncio.Lock] = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, paths: Iterable[Path]) -> AsyncIterator[None]:
+        """Hold the locks for all *paths* (taken in sorted order to avoid deadlock)."""
+        ordered = sorted(set(paths))
+        async with contextlib.AsyncExitStack() as stack:
+            for path in ordered:
+                await stack.enter_async_context(self._locks.setdefault(path, asyncio.Lock()))
+            yield
@@ -0,0 +1,179 @@
+# src/agent/core/context.py
+"""Token‑budgeted prompt assembly: retrieved code + summarised history."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Sequence
+
+from ..config import ContextConfig
+from ..embeddings.base import Embedder
+from ..models.llm_base import ChatMessage
+from ..util.tokens import count_tokens, truncate_tokens
+from ..vectorstore.base import Hit, VectorStore
+from .agent_base import Message
+
+
+@dataclass
+class ContextSection:
+    """One labelled part of a prompt and its token cost."""
+
+    name: str
+    text: str
+    tokens: int
+    role: Literal["system", "user", "assistant"] = "user"
+
+
+@dataclass
+class AssembledContext:
+    """Prompt sections in a fixed order (system → code → task → summary → history)."""
+
+    sections: List[ContextSection] = field(default_factory=list)
+
+    @property
+    def usage(self) -> Dict[str, int]:
+        """Tokens used per source, e.g. ``{"retrieval": 3100, "history": 820, ...}``."""
+        out: Dict[str, int] = {}
+        for s in self.sections:
+            out[s.name] = out.get(s.name, 0) + s.tokens
+        return out
+
+    @property
+    def total(self) -> int:
+        return sum(s.tokens for s in self.sections)
+
+    def render(self) -> str:
+        return "\n\n".join(s.text for s in self.sections if s.text)
+
+    def to_messages(self) -> List[ChatMessage]:
+        """Chat messages whose prefix (system, code, task) is stable across turns."""
+        return [{"role": s.role, "content": s.text} for s in self.sections if s.text]
+
+
+class ContextAssembler:
+    """Pack the system prompt, top retrieval hits and history into a budget.
+
+    Retrieval is keyed on the task (first message) so the code section stays
+    identical across turns; only the history tail varies, keeping per‑turn
+    prompts roughly constant in size.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore | None,
+        embedder: Embedder | None,
+        cfg: ContextConfig,
+        model: str = "gpt-4o",
+    ) -> None:
+        self._store = store
+        self._embedder = embedder
+        self._cfg = cfg
+        self._model = model
+        self._hits: Dict[str, List[Hit]] = {}
+
+    # ------------------------------------------------------------------ #
+    async def aassemble(
+        self, system: str, history: Sequence[Message], me: str | None = None
+    ) -> AssembledContext:
+        """Build the prompt; messages sent by *me* become ``assistant`` turns."""
+        ctx = AssembledContext()
+        budget = self._cfg.token_budget
+        ctx.sections.append(self._section("system", system, "system"))
+        if not history:
+            return ctx
+        task, rest = history[0], list(history[1:])
+
+        task_text = truncate_tokens(
+            f"{task.sender}: {task.content}", self._cfg.max_message_tokens, self._model
+        )
+        task_sec = self._section("task", "Task:\n" + task_text)
+        remaining = budget - ctx.total - task_sec.tokens
+
+        code_budget = int(remaining * self._cfg.retrieval_share)
+        code = await self._retrieval(task.content, code_budget)
+        if code.text:
+            ctx.sections.append(code)
+        ctx.sections.append(task_sec)
+
+        summary, recent = self._history(rest, budget - ctx.total, me)
+        if summary.text:
+            ctx.sections.append(summary)
+        ctx.sections.extend(recent)
+        return ctx
+
+    # ------------------------------------------------------------------ #
+    async def _retrieval(self, query: str, budget: int) -> ContextSection:
+        if self._store is None or self._embedder is None or budget <= 0:
+            return ContextSection("retrieval", "", 0)
+        hits = self._hits.get(query)
+        if hits is None:
+            [vector] = await self._embedder.aembed([query])
+            hits = self._store.search(vector, k=self._cfg.retrieval_k)
+            self._hits[query] = hits
+        parts: List[str] = ["Relevant code:"]
+        used = self._tokens(parts[0])
+        for hit in hits:
+            meta = hit.metadata
+            where = f"{meta.get('path', '?')}:{meta.get('start', '?')}-{meta.get('end', '?')}"
+            block = f"### {where}\n```\n{hit.text.rstrip()}\n```"
+            cost = self._tokens(block)
+            if used + cost > budget:
+                continue
+            parts.append(block)
+            used += cost
+        if len(parts) == 1:
+            return ContextSection("retrieval", "", 0)
+        return ContextSection("retrieval", "\n".join(parts), used)
+
+    def _history(
+        self, messages: List[Message], budget: int, me: str | None
+    ) -> tuple[ContextSection, List[ContextSection]]:
+        """Newest messages verbatim; older ones collapse to one‑line summaries."""
+        cap = self._cfg.max_message_tokens
+        recent: List[ContextSection] = []
+        used = 0
+        cut = len(messages)
+        recent_budget = int(budget * 0.8)
+        for i in range(len(messages) - 1, -1, -1):
+            if len(recent) >= self._cfg.recent_messages:
+                break
+            m = messages[i]
+            mine = me is not None and m.sender == me
+            text = m.content if mine else f"{m.sender}: {m.content}"
+            text = truncate_tokens(text, cap, self._model)
+            cost = self._tokens(text)
+            if used + cost > recent_budget:
+                if recent or recent_budget <= 0:
+                    break
+                # The newest message (often the latest failure report) is
+                # always kept verbatim, cut down to the history budget.
+                text = truncate_tokens(text, recent_budget, self._model)
+                cost = self._tokens(text)
+            recent.append(ContextSection("history", text, cost, "assistant" if mine else "user"))
+            used += cost
+            cut = i
+        recent.reverse()
+
+        lines: List[str] = []
+        s_used = 0
+        s_budget = budget - used
+        for m in messages[:cut]:
+            first = next((ln for ln in m.content.splitlines() if ln.strip()), "")
+            line = f"- {m.sender}: {first[:160]}"
+            cost = self._tokens(line)
+            if s_used + cost > s_budget:
+                lines.append("- …")
+                break
+            lines.append(line)
+            s_used += cost
+
+        summary = ContextSection(
+            "summary", "Earlier turns (summary):\n" + "\n".join(lines) if lines else "", s_used
+        )
+        return summary, recent
+
+    def _section(self, name: str, text: str, role: str = "user") -> ContextSection:
+        return ContextSection(name, text, self._tokens(text), role)  # type: ignore[arg-type]
+
+    def _tokens(self, text: str) -> int:
+        return count_tokens(text, self._model)
@@ -1,17 +1,20 @@
 # src/agent/core/conversation.py
-"""AutoGen GroupChat wiring."""
+"""Agent wiring: parallel turn scheduler or AutoGen GroupChat."""
 
 from __future__ import annotations
 
 import asyncio
-from typing import List
-
-from autogen import AssistantAgent, GroupChat, GroupChatManager, UserProxyAgent  # type: ignore
+from typing import Any, AsyncIterator, List
 
 from ..config import AgentConfig
-from ..core.agent_base import Message
+from ..core.agent_base import AgentBase, Message
+from ..core.changes import ChangeTracker, PathLocks
+from ..core.context import ContextAssembler
 from ..core.executor import Executor
-from ..models.llm_base import OpenAIModel
+from ..core.scheduler import TurnScheduler
+from ..indexing.indexer import Indexer
+from ..core.resources import SharedResources
+from ..models.factory import build_llm
 from ..agents.coder import CoderAgent
 from ..agents.tester import TesterAgent
 from ..agents.reviewer import ReviewerAgent
@@ -19,44 +22,131 @@ from ..agents.docs import DocsAgent
 
 
 class Conversation:
-    """Spin up specialised agents inside an AutoGen GroupChat."""
+    """Spin up specialised agents and let them iterate on the prompt."""
 
-    def __init__(self, cfg: AgentConfig) -> None:
+    def __init__(
+        self,
+        cfg: AgentConfig,
+        index: Indexer | None = None,
+        res: SharedResources | None = None,
+    ) -> None:
         self._cfg = cfg
-        exec_ = Executor(cfg.execution, cfg.project_path)
+        pool = res.sandbox(cfg.execution, cfg.project_path) if res is not None else None
+        exec_ = Executor(cfg.execution, cfg.project_path, pool)
 
         # Instantiate LLM backends
-        pconf = cfg.provider_configs["openai"]
-        coder_llm = OpenAIModel(cfg.model_providers["coder"][1], **pconf)
-        tester_llm = OpenAIModel(cfg.model_providers["tester"][1], **pconf)
-        reviewer_llm = OpenAIModel(cfg.model_providers["reviewer"][1], **pconf)
+        coder_llm = build_llm(cfg, "coder", res)
+        tester_llm = build_llm(cfg, "tester", res)
+        reviewer_llm = build_llm(cfg, "reviewer", res)
+
+        assembler = ContextAssembler(
+            index.store if index else None,
+            index.embedder if index else None,
+            cfg.context,
+            coder_llm.model,
+        )
 
         # Concrete agents
-        coder = CoderAgent(coder_llm, cfg, exec_)
-        tester = TesterAgent(tester_llm, cfg, exec_)
+        changes = ChangeTracker()
+        coder = CoderAgent(coder_llm, cfg, exec_, assembler, changes, PathLocks())
+        tester = TesterAgent(tester_llm, cfg, exec_, changes)
         reviewer = ReviewerAgent(reviewer_llm, cfg, exec_)
         docs = DocsAgent(reviewer_llm, cfg)  # reuse LLM
 
+        self._checkers: List[AgentBase] = [tester, reviewer, docs]
+        self.transcript: List[Message] = []
+        self._subscribers: List[asyncio.Queue[Message | None]] = []
+        self._done: asyncio.Future[List[Message]] | None = None
+        if cfg.conversation.mode == "groupchat":
+            self._init_groupchat([coder, tester, reviewer, docs])
+        else:
+            self._scheduler = TurnScheduler(
+                coder,
+                self._checkers,
+                cfg.max_iterations,
+                cfg.conversation.speculative,
+                on_message=self._publish,
+            )
+
+    def _init_groupchat(self, agents: List[AgentBase]) -> None:
+        from autogen import AssistantAgent, GroupChat, GroupChatManager, UserProxyAgent  # type: ignore
+
         # Wrap in AssistantAgent so AutoGen can drive them ----------------
-        def _wrap(a):
+        def _wrap(a: AgentBase) -> Any:
             async def _run(agent, messages, sender):  # noqa: ANN001
                 msg_objs = [Message(m["role"], m["content"]) for m in messages]
                 reply = await a.areply(msg_objs)
+                self._publish(reply)
                 return reply.content
 
             return AssistantAgent(name=a.name, llm_config={"callback": _run})
 
-        assistants: List[AssistantAgent] = list(map(_wrap, (coder, tester, reviewer, docs)))
+        assistants = list(map(_wrap, agents))
 
         self._group_manager = GroupChatManager(
             groupchat=GroupChat(assistants, messages=[]),
-            llm_config={"timeout": cfg.execution.timeout},
+            llm_config={"timeout": self._cfg.execution.timeout},
         )
         self._user = UserProxyAgent("User", code_execution_config=False, llm_config=False)
 
     # ------------------------------------------------------------------ #
-    async def arun(self, prompt: str) -> None:
-        """Start chatting until ``GroupChatManager`` decides to stop."""
-        await self._user.a_send(recipient=self._group_manager, message=prompt)
-        while not self._group_manager.is_finished():
-            await asyncio.sleep(0.5)
+    def start(self, prompt: str) -> "asyncio.Task[List[Message]]":
+        """Run in the background; follow along with :meth:`messages` / :meth:`wait`."""
+        self._future()
+        return asyncio.create_task(self.arun(prompt), name="conversation")
+
+    async def arun(self, prompt: str) -> List[Message]:
+        """Iterate until the agents are done (or ``max_iterations``); return the transcript."""
+        done = self._future()
+        try:
+            if self._cfg.conversation.mode == "groupchat":
+                self._publish(Message("User", prompt))
+                await asyncio.gather(*(agent.aprepare() for agent in self._checkers))
+                # ``a_send`` drives the group chat and returns once it has ended.
+                await self._user.a_send(recipient=self._group_manager, message=prompt)
+            else:
+                await self._scheduler.arun(prompt)
+        except BaseException as exc:
+            if not done.done():
+                done.set_exception(exc)
+                done.exception()  # retrieved here; awaiting callers still see it
+            raise
+        finally:
+            for queue in self._subscribers:
+                queue.put_nowait(None)
+        if not done.done():
+            done.set_result(list(self.transcript))
+        return list(self.transcript)
+
+    async def wait(self) -> List[Message]:
+        """Resolve with the transcript as soon as the conversation ends."""
+        return await asyncio.shield(self._future())
+
+    async def messages(self) -> AsyncIterator[Message]:
+        """Every message (earlier ones first), as it is produced, until the end."""
+        queue: asyncio.Queue[Message | None] = asyncio.Queue()
+        for msg in self.transcript:
+            queue.put_nowait(msg)
+        if self._done is not None and self._done.done():
+            queue.put_nowait(None)
+        self._subscribers.append(queue)
+        try:
+            while (msg := await queue.get()) is not None:
+                yield msg
+        finally:
+            self._subscribers.remove(queue)
+
+    @property
+    def finished(self) -> bool:
+        return self._done is not None and self._done.done()
+
+    # ------------------------------------------------------------------ #
+    def _future(self) -> "asyncio.Future[List[Message]]":
+        if self._done is None:
+            self._done = asyncio.get_running_loop().create_future()
+        return self._done
+
+    def _publish(self, msg: Message) -> None:
+        self.transcript.append(msg)
+        for queue in self._subscribers:
+            queue.put_nowait(msg)
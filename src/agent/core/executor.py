@@ -4,44 +4,183 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import shutil
+import signal
 from pathlib import Path
-from typing import List, Sequence, Tuple
+from typing import TYPE_CHECKING, Callable, List, Sequence, Tuple
 
 from ..config import ExecutionConfig
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .sandbox import SandboxPool
+
+
+LineCallback = Callable[[str, str], None]  # (stream name, line without newline)
+
+_READ_CHUNK = 64 * 1024
+_MAX_PARTIAL_LINE = 64 * 1024
+
+
+class BoundedBuffer:
+    """Keep the first and last ``cap // 2`` bytes of a stream, drop the middle."""
+
+    def __init__(self, cap: int) -> None:
+        self._half = max(1, cap // 2)
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.dropped = 0
+
+    def feed(self, data: bytes) -> None:
+        room = self._half - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        self._tail += data
+        excess = len(self._tail) - self._half
+        if excess > self._half:  # trim in bulk, amortised O(1) per byte
+            del self._tail[:excess]
+            self.dropped += excess
+
+    def text(self) -> str:
+        excess = len(self._tail) - self._half
+        tail = self._tail[excess:] if excess > 0 else self._tail
+        dropped = self.dropped + max(0, excess)
+        head = self._head.decode("utf-8", errors="replace")
+        if not dropped:
+            return head + tail.decode("utf-8", errors="replace")
+        marker = f"\n… [{dropped} bytes truncated] …\n"
+        return head + marker + tail.decode("utf-8", errors="replace")
+
+
+async def _pump(
+    stream: asyncio.StreamReader, buf: BoundedBuffer, name: str, on_line: LineCallback | None
+) -> None:
+    partial = b""
+    while True:
+        data = await stream.read(_READ_CHUNK)
+        if not data:
+            break
+        buf.feed(data)
+        if on_line is None:
+            continue
+        partial += data
+        *lines, partial = partial.split(b"\n")
+        for line in lines:
+            on_line(name, line.decode("utf-8", errors="replace"))
+        if len(partial) > _MAX_PARTIAL_LINE:
+            on_line(name, partial.decode("utf-8", errors="replace"))
+            partial = b""
+    if on_line is not None and partial:
+        on_line(name, partial.decode("utf-8", errors="replace"))
+
+
+def _kill_group(proc: asyncio.subprocess.Process) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def run_process(
+    cmd: Sequence[str],
+    cwd: Path,
+    timeout: float,
+    max_output: int = 1_000_000,
+    on_line: LineCallback | None = None,
+) -> Tuple[int, str, str]:
+    """Run *cmd*, return (exit‑code, stdout, stderr); ``124`` on timeout.
+
+    Output is streamed into bounded head+tail buffers (*max_output* bytes per
+    stream) and optionally reported line by line via *on_line*. On timeout the
+    whole process group is killed so forked workers do not linger.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name == "posix",
+    )
+    out, err = BoundedBuffer(max_output), BoundedBuffer(max_output)
+    assert proc.stdout is not None and proc.stderr is not None
+    readers = asyncio.gather(
+        _pump(proc.stdout, out, "stdout", on_line),
+        _pump(proc.stderr, err, "stderr", on_line),
+    )
+    # One deadline for the output *and* the exit: a child may close its pipes
+    # and keep running.
+    finished = asyncio.gather(readers, proc.wait())
+    try:
+        _, rc = await asyncio.wait_for(asyncio.shield(finished), timeout)
+    except asyncio.TimeoutError:
+        _kill_group(proc)
+        await proc.wait()
+        try:
+            await asyncio.wait_for(finished, 5)
+        except asyncio.TimeoutError:
+            finished.cancel()
+            await asyncio.gather(finished, return_exceptions=True)
+        return 124, out.text(), (err.text() + "\nTIMEOUT").lstrip()
+    except BaseException:
+        _kill_group(proc)
+        finished.cancel()
+        await asyncio.shield(proc.wait())  # reap: no zombie after a cancel
+        await asyncio.gather(finished, return_exceptions=True)
+        raise
+    return rc, out.text(), err.text()
 
 
 class Executor:
     """Wrapper around subprocess/Docker with timeout enforcement."""
 
-    def __init__(self, cfg: ExecutionConfig, root: Path) -> None:
+    def __init__(
+        self, cfg: ExecutionConfig, root: Path, pool: "SandboxPool | None" = None
+    ) -> None:
         self._cfg = cfg
         self._root = root
+        self._pool = pool
 
     # ------------------------------------------------------------------ #
-    async def arun(self, cmd: Sequence[str]) -> Tuple[int, str, str]:
-        """Return (exit‑code, stdout, stderr)."""
+    async def arun(
+        self, cmd: Sequence[str], on_line: LineCallback | None = None
+    ) -> Tuple[int, str, str]:
+        """Return (exit‑code, stdout, stderr), each stream capped at ``max_output_bytes``."""
+        backend = "local"
         if self._cfg.use_docker:
-            return await self._arun_docker(cmd)
-        return await self._arun_local(cmd)
+            backend = "pool" if self._pool is not None else "docker"
+        with span("exec", "exec", cmd=" ".join(cmd)[:200], backend=backend) as sp:
+            if backend == "pool":
+                assert self._pool is not None
+                result = await self._pool.arun(
+                    cmd, self._cfg.timeout, self._cfg.max_output_bytes, on_line
+                )
+            elif backend == "docker":
+                result = await self._arun_docker(cmd, on_line)
+            else:
+                result = await self._arun_local(cmd, on_line)
+            rc, out, err = result
+            sp.set(rc=rc, stdout_bytes=len(out.encode()), stderr_bytes=len(err.encode()))
+        return result
 
     # Local ------------------------------------------------------------- #
-    async def _arun_local(self, cmd: Sequence[str]) -> Tuple[int, str, str]:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=self._root,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+    async def _arun_local(
+        self, cmd: Sequence[str], on_line: LineCallback | None = None
+    ) -> Tuple[int, str, str]:
+        return await run_process(
+            cmd, self._root, self._cfg.timeout, self._cfg.max_output_bytes, on_line
         )
-        try:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), self._cfg.timeout)
-        except asyncio.TimeoutError:
-            proc.kill()
-            return 124, "", "TIMEOUT"
-        return proc.returncode, stdout.decode(), stderr.decode()
 
     # Docker ------------------------------------------------------------ #
-    async def _arun_docker(self, cmd: Sequence[str]) -> Tuple[int, str, str]:
+    async def _arun_docker(
+        self, cmd: Sequence[str], on_line: LineCallback | None = None
+    ) -> Tuple[int, str, str]:
         if shutil.which("docker") is None:
             return 127, "", "Docker not found."
         full = [
@@ -55,4 +194,4 @@ class Executor:
             self._cfg.image,
             *cmd,
         ]
-        return await self._arun_local(full)
+        return await self._arun_local(full, on_line)
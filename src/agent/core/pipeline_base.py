@@ -5,21 +5,40 @@ from __future__ import annotations
 
 import asyncio
 from abc import ABC, abstractmethod
+from typing import List
 
 from ..config import AgentConfig
+from ..core.agent_base import Message
 from ..core.conversation import Conversation
+from ..indexing.indexer import Indexer
+from ..core.resources import SharedResources
+from ..core.tracing import span
 
 
 class PipelineBase(ABC):
     """Common pipeline behaviour."""
 
-    def __init__(self, cfg: AgentConfig) -> None:
+    def __init__(self, cfg: AgentConfig, res: SharedResources | None = None) -> None:
         self._cfg = cfg
-
-    async def arun(self, prompt: str) -> None:
-        """Run the pipeline asynchronously."""
-        convo = self._conversation()
-        await convo.arun(prompt)
+        self._index: Indexer | None = None
+        self._res: SharedResources | None = res
+        self._owns_res = res is None  # shared resources (batch runs) are closed by their owner
+
+    async def arun(self, prompt: str) -> List[Message]:
+        """Run the pipeline asynchronously; return the conversation transcript."""
+        if self._res is None:
+            self._res = SharedResources(self._cfg)
+        try:
+            if self._cfg.index.enabled:
+                self._index = Indexer.from_config(self._cfg, self._res)
+                with span("index", "index") as sp:
+                    stats = await self._index.arun()
+                    sp.set(**vars(stats))
+            convo = self._conversation()
+            return await convo.arun(prompt)
+        finally:
+            if self._owns_res:
+                await self._res.aclose()
 
     @abstractmethod
     def _conversation(self) -> Conversation: ...
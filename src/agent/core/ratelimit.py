@@ -0,0 +1,251 @@
+# src/agent/core/ratelimit.py
+"""Token‑bucket RPM/TPM limiter with priority classes for LLM / embedding calls."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from ..config import RateLimit
+from ..embeddings.base import Embedder
+from ..models.llm_base import ChatMessage, Completion, Delta, LLMBase
+from ..util.tokens import count_tokens, count_tokens_batch
+from .tracing import span
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority | None] = ContextVar("agent_priority", default=None)
+
+
+@contextlib.contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run calls made inside the block at *level* (e.g. background indexing)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Continuous‑refill bucket; ``per_minute`` units, burst up to one minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self._level = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._stamp) * self._rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until *amount* units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self._level >= amount else (amount - self._level) / self._rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        """Refund (or, if negative, charge) units after the real cost is known."""
+        self._refill()
+        self._level = min(self.capacity, self._level + amount)
+
+
+@dataclass
+class _Lane:
+    rpm: TokenBucket | None
+    tpm: TokenBucket | None
+    cond: asyncio.Condition = field(default_factory=asyncio.Condition)
+    heap: List[Tuple[int, int]] = field(default_factory=list)
+    granted: int = 0
+    waited: float = 0.0
+
+    def wait_time(self, tokens: int) -> float:
+        rpm = self.rpm.wait_time(1) if self.rpm else 0.0
+        tpm = self.tpm.wait_time(tokens) if self.tpm else 0.0
+        return max(rpm, tpm)
+
+
+class RateLimiter:
+    """Admit calls per ``provider:model`` (or ``provider``) lane, by priority.
+
+    Waiters queue in a heap ordered by (priority, arrival); only the head may
+    take from the buckets, so a burst of background indexing cannot starve an
+    interactive coder turn. Keys without a configured limit pass straight through.
+    """
+
+    def __init__(self, limits: Mapping[str, RateLimit] | None = None) -> None:
+        self._limits = dict(limits or {})
+        self._lanes: Dict[str, _Lane] = {}
+        self._seq = itertools.count()
+
+    def _name(self, key: str) -> str:
+        return key if key in self._limits else key.split(":", 1)[0]
+
+    def _lane(self, key: str) -> _Lane | None:
+        name = self._name(key)
+        limit = self._limits.get(name)
+        if limit is None:
+            return None
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = _Lane(
+                TokenBucket(limit.rpm) if limit.rpm else None,
+                TokenBucket(limit.tpm) if limit.tpm else None,
+            )
+            self._lanes[name] = lane
+        return lane
+
+    # ------------------------------------------------------------------ #
+    async def acquire(self, key: str, tokens: int = 0, level: Priority = Priority.NORMAL) -> None:
+        """Wait until one request of *tokens* may be sent on *key*'s lane.
+
+        Each admission is traced as a ``ratelimit.wait`` span carrying the
+        lane, priority and the queue depth ahead of the caller.
+        """
+        lane = self._lane(key)
+        if lane is None:
+            return
+        scoped = _priority.get()
+        entry = (int(level if scoped is None else scoped), next(self._seq))
+        start = time.monotonic()
+        heapq.heappush(lane.heap, entry)
+        with span(
+            "ratelimit.wait",
+            "ratelimit",
+            lane=self._name(key),
+            priority=Priority(entry[0]).name.lower(),
+            queued=len(lane.heap) - 1,
+        ):
+            await self._admit(lane, entry, tokens, start)
+
+    async def _admit(
+        self, lane: _Lane, entry: Tuple[int, int], tokens: int, start: float
+    ) -> None:
+        async with lane.cond:
+            try:
+                while True:
+                    timeout: float | None = None
+                    if lane.heap[0] == entry:
+                        timeout = lane.wait_time(tokens)
+                        if timeout <= 0:
+                            heapq.heappop(lane.heap)
+                            if lane.rpm:
+                                lane.rpm.take(1)
+                            if lane.tpm:
+                                lane.tpm.take(tokens)
+                            lane.granted += 1
+                            lane.waited += time.monotonic() - start
+                            lane.cond.notify_all()
+                            return
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(lane.cond.wait(), timeout)
+            except BaseException:
+                if entry in lane.heap:
+                    lane.heap.remove(entry)
+                    heapq.heapify(lane.heap)
+                    lane.cond.notify_all()
+                raise
+
+    def settle(self, key: str, estimated: int, actual: int) -> None:
+        """Correct the TPM bucket once the provider reported real usage."""
+        lane = self._lane(key)
+        if lane is not None and lane.tpm is not None and actual:
+            lane.tpm.give(estimated - actual)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth (total and per priority), grants and cumulative wait per lane."""
+        out: Dict[str, Dict[str, float]] = {}
+        for name, lane in self._lanes.items():
+            row: Dict[str, float] = {"queued": len(lane.heap), "granted": lane.granted}
+            for p in Priority:
+                row[f"queued_{p.name.lower()}"] = sum(1 for e in lane.heap if e[0] == p)
+            row["waited_s"] = round(lane.waited, 3)
+            out[name] = row
+        return out
+
+
+class RateLimitedLLM(LLMBase):
+    """Route every completion through a :class:`RateLimiter` lane."""
+
+    def __init__(
+        self, inner: LLMBase, limiter: RateLimiter, key: str, level: Priority = Priority.NORMAL
+    ) -> None:
+        self._inner = inner
+        self._limiter = limiter
+        self._key = key
+        self._level = level
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._inner.params
+
+    def _estimate(self, messages: Sequence[ChatMessage]) -> int:
+        prompt = sum(count_tokens(m["content"], self.model) for m in messages)
+        params = self.params
+        return prompt + int(params.get("max_completion_tokens") or params.get("max_tokens") or 0)
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        estimate = self._estimate(messages)
+        await self._limiter.acquire(self._key, estimate, self._level)
+        completion = await self._inner.achat(messages)
+        u = completion.usage
+        self._limiter.settle(self._key, estimate, u.prompt_tokens + u.completion_tokens)
+        return completion
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        estimate = self._estimate(messages)
+        await self._limiter.acquire(self._key, estimate, self._level)
+        async with contextlib.aclosing(self._inner.astream(messages)) as stream:
+            async for delta in stream:
+                if delta.usage is not None:
+                    u = delta.usage
+                    self._limiter.settle(self._key, estimate, u.prompt_tokens + u.completion_tokens)
+                yield delta
+
+
+class RateLimitedEmbedder(Embedder):
+    """Route every embedding request through a :class:`RateLimiter` lane."""
+
+    def __init__(
+        self, inner: Embedder, limiter: RateLimiter, key: str, level: Priority = Priority.NORMAL
+    ) -> None:
+        self._inner = inner
+        self._limiter = limiter
+        self._key = key
+        self._level = level
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        await self._limiter.acquire(
+            self._key, sum(count_tokens_batch(items, self.model)), self._level
+        )
+        return await self._inner.aembed(items)
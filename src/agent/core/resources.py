@@ -0,0 +1,77 @@
+# src/agent/core/resources.py
+"""Process‑level objects shared by every agent (and every job) in a run."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
+
+from ..config import AgentConfig, EmbeddingCacheConfig, ExecutionConfig
+from ..models.clients import ClientRegistry
+from ..models.routing import LatencyTracker
+from .ratelimit import RateLimiter
+from .sandbox import SandboxPool
+
+if TYPE_CHECKING:
+    from ..embeddings.base import Embedder
+    from ..embeddings.cache import EmbeddingCache
+    from ..models.llm_base import LLMBase
+
+# (role, provider, model) → raw model; (provider, model) → raw embedder.
+LLMFactory = Callable[[str, str, str], "LLMBase"]
+EmbedderFactory = Callable[[str, str], "Embedder"]
+
+
+class SharedResources:
+    """Pooled provider clients, rate limiter, TTFT statistics and warm sandboxes.
+
+    Build it inside the running event loop and :meth:`aclose` it when done.
+    *llm_factory* / *embedder_factory* replace the provider backends (the
+    rate limiting, batching and caching layers still wrap them), e.g. with
+    the offline stand‑ins in :mod:`agent.bench.fakes`.
+    """
+
+    def __init__(
+        self,
+        cfg: AgentConfig,
+        llm_factory: LLMFactory | None = None,
+        embedder_factory: EmbedderFactory | None = None,
+    ) -> None:
+        self.llm_factory = llm_factory
+        self.embedder_factory = embedder_factory
+        self.clients = ClientRegistry(cfg.http)
+        self.limiter = RateLimiter(cfg.rate_limits)
+        self.latency = LatencyTracker()  # shared by every role's hedging decisions
+        self._sandboxes: Dict[Tuple[str, Path], SandboxPool] = {}
+        self._embedding_caches: Dict[Tuple[Path, str], EmbeddingCache] = {}
+
+    def sandbox(self, cfg: ExecutionConfig, root: Path) -> SandboxPool | None:
+        """Shared container pool for (image, workspace), or ``None`` if pooling is off."""
+        if not cfg.use_docker or cfg.pool_size <= 0:
+            return None
+        key = (cfg.image, root)
+        pool = self._sandboxes.get(key)
+        if pool is None:
+            pool = SandboxPool(cfg.image, root, cfg.pool_size, cfg.pool_max_uses, cfg.pool_max_age)
+            self._sandboxes[key] = pool
+        return pool
+
+    def embedding_cache(self, cfg: EmbeddingCacheConfig, model: str) -> "EmbeddingCache":
+        """One cache per (directory, model), so concurrent jobs never race on its files."""
+        key = (cfg.path, model)
+        cache = self._embedding_caches.get(key)
+        if cache is None:
+            from ..embeddings.cache import EmbeddingCache
+
+            cache = EmbeddingCache(cfg.path, model, cfg.max_entries)
+            self._embedding_caches[key] = cache
+        return cache
+
+    async def aclose(self) -> None:
+        caches, self._embedding_caches = list(self._embedding_caches.values()), {}
+        for cache in caches:
+            cache.close()
+        pools, self._sandboxes = list(self._sandboxes.values()), {}
+        for pool in pools:
+            await pool.aclose()
+        await self.clients.aclose()
@@ -0,0 +1,168 @@
+# src/agent/core/sandbox.py
+"""Pool of warm, long‑lived Docker containers driven via ``docker exec``."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from .executor import LineCallback, run_process
+
+_DOCKER_FAILURES = {125, 126, 127}  # docker (or the container) may have failed
+_HEALTH_AFTER_IDLE = 30.0  # seconds idle before re‑checking a container
+
+
+@dataclass
+class _Container:
+    cid: str
+    started: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class SandboxPool:
+    """Keep up to *size* containers of *image* with *root* mounted at ``/workspace``.
+
+    Commands run through ``docker exec`` so each call skips container start‑up
+    and reuses a warm import cache. Containers are retired after *max_uses*
+    commands, *max_age* seconds, a timeout, or a failed health check. The
+    ``(rc, stdout, stderr)`` contract matches :meth:`Executor.arun`.
+    """
+
+    def __init__(
+        self,
+        image: str,
+        root: Path,
+        size: int = 2,
+        max_uses: int = 50,
+        max_age: float = 600.0,
+    ) -> None:
+        self._image = image
+        self._root = root
+        self._size = max(1, size)
+        self._max_uses = max_uses
+        self._max_age = max_age
+        # ``None`` is a wake‑up token: a slot was freed, a waiter may start a container.
+        self._idle: asyncio.Queue[_Container | None] = asyncio.Queue()
+        self._live = 0
+        self._all: List[_Container] = []
+        self._closed = False
+
+    # ------------------------------------------------------------------ #
+    async def arun(
+        self,
+        cmd: Sequence[str],
+        timeout: float,
+        max_output: int = 1_000_000,
+        on_line: LineCallback | None = None,
+    ) -> Tuple[int, str, str]:
+        if shutil.which("docker") is None:
+            return 127, "", "Docker not found."
+        try:
+            box = await self._acquire(timeout)
+        except RuntimeError as exc:
+            return 125, "", str(exc)
+        try:
+            rc, out, err = await run_process(
+                ["docker", "exec", "-w", "/workspace", box.cid, *cmd],
+                self._root,
+                timeout,
+                max_output,
+                on_line,
+            )
+        except BaseException:
+            # Cancelled or failed mid‑command: the exec may still be running
+            # inside the container, so it cannot go back to the idle queue.
+            await asyncio.shield(self._retire(box))
+            raise
+        box.uses += 1
+        box.last_used = time.monotonic()
+        # A timed‑out command keeps running inside the container: recycle it.
+        if rc == 124 or self._expired(box) or (
+            rc in _DOCKER_FAILURES and not await self._healthy(box)
+        ):
+            await self._retire(box)
+        else:
+            self._idle.put_nowait(box)
+        return rc, out, err
+
+    async def aclose(self) -> None:
+        """Remove every container owned by the pool."""
+        self._closed = True
+        boxes, self._all = self._all, []
+        await asyncio.gather(*(self._kill(b.cid) for b in boxes), return_exceptions=True)
+        self._live = 0
+
+    # ------------------------------------------------------------------ #
+    async def _acquire(self, timeout: float) -> _Container:
+        while True:
+            if self._closed:
+                raise RuntimeError("Sandbox pool is closed.")
+            if self._idle.empty() and self._live < self._size:
+                self._live += 1
+                try:
+                    return await self._start(timeout)
+                except BaseException:
+                    self._live -= 1
+                    self._idle.put_nowait(None)  # a waiter may try the freed slot
+                    raise
+            box = await self._idle.get()
+            if box is None:
+                continue
+            if self._expired(box):
+                await self._retire(box)
+                continue
+            if time.monotonic() - box.last_used > _HEALTH_AFTER_IDLE and not await self._healthy(box):
+                await self._retire(box)
+                continue
+            return box
+
+    async def _start(self, timeout: float) -> _Container:
+        rc, out, err = await run_process(
+            [
+                "docker",
+                "run",
+                "-d",
+                "--rm",
+                "-v",
+                f"{self._root}:/workspace",
+                "-w",
+                "/workspace",
+                "--entrypoint",
+                "sleep",
+                self._image,
+                "infinity",
+            ],
+            self._root,
+            timeout,
+        )
+        if rc != 0:
+            raise RuntimeError(f"Could not start sandbox ({rc}): {err.strip() or out.strip()}")
+        box = _Container(out.strip())
+        self._all.append(box)
+        return box
+
+    async def _healthy(self, box: _Container) -> bool:
+        rc, _, _ = await run_process(["docker", "exec", box.cid, "true"], self._root, 10)
+        return rc == 0
+
+    async def _retire(self, box: _Container) -> None:
+        if self._closed:  # :meth:`aclose` already reset the bookkeeping
+            await self._kill(box.cid)
+            return
+        if box not in self._all:
+            return
+        self._all.remove(box)
+        self._live -= 1
+        self._idle.put_nowait(None)
+        await self._kill(box.cid)
+
+    async def _kill(self, cid: str) -> None:
+        await run_process(["docker", "rm", "-f", cid], self._root, 30)
+
+    def _expired(self, box: _Container) -> bool:
+        return box.uses >= self._max_uses or time.monotonic() - box.started > self._max_age
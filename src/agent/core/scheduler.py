@@ -0,0 +1,162 @@
+# src/agent/core/scheduler.py
+"""Coder turn, then every checking agent at once; optional speculative drafts."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Awaitable, Callable, Dict, List, Sequence, Set, Tuple, TypeVar
+
+from ..agents.coder import CoderAgent
+from ..models.llm_base import Completion
+from .agent_base import AgentBase, Message
+from .tracing import span
+
+log = logging.getLogger(__name__)
+
+MessageCallback = Callable[[Message], None]
+T = TypeVar("T")
+
+
+class TurnScheduler:
+    """Drive coder → checkers iterations with the checkers fanned out concurrently.
+
+    After each coder patch lands, every checker (tester, reviewer, docs…)
+    replies to the same history snapshot in parallel; their messages are
+    appended in *checkers* order, so transcripts are deterministic. An
+    iteration therefore costs the slowest checker, not the sum of them.
+
+    With *speculative* on, the next coder draft starts as soon as one
+    checker reports a failure, while slower checkers are still running. The
+    draft is kept only if everything it did not see came back green;
+    otherwise it is cancelled and redrafted from the full history.
+
+    Every checker's :meth:`~AgentBase.aprepare` runs alongside the first
+    draft and finishes before the first patch is applied. The loop stops when
+    the coder replies without a patch, when no checker reports a failure, or
+    after *max_iterations*.
+    """
+
+    def __init__(
+        self,
+        coder: CoderAgent,
+        checkers: Sequence[AgentBase],
+        max_iterations: int = 12,
+        speculative: bool = True,
+        on_message: MessageCallback | None = None,
+    ) -> None:
+        self._coder = coder
+        self._checkers = list(checkers)
+        self._max_iterations = max_iterations
+        self._speculative = speculative
+        self._on_message = on_message
+        self.speculated = 0  # drafts started early
+        self.speculation_hits = 0  # … and used
+
+    async def arun(self, prompt: str, user: str = "User") -> List[Message]:
+        """Run until done; return the full transcript."""
+        history: List[Message] = []
+        self._emit(history, Message(user, prompt))
+        draft: asyncio.Task[Completion] | None = None
+        # Checker baselines are taken while the first draft is generated.
+        prepare: asyncio.Task[List[None]] | None = asyncio.create_task(
+            _gather(*(agent.aprepare() for agent in self._checkers)), name="prepare"
+        )
+        try:
+            for i in range(self._max_iterations):
+                with span("iteration", "turn", iteration=i, speculative=draft is not None):
+                    if draft is not None:
+                        self.speculation_hits += 1
+                        completion = await draft
+                    else:
+                        completion = await _traced(self._coder.name, self._coder.adraft(history))
+                    draft = None
+                    self._emit(history, Message(self._coder.name, completion.text))
+                    if not self._coder.has_patch(completion.text):
+                        break
+                    if prepare is not None:
+                        await prepare
+                        prepare = None
+                    await self._coder.acommit(completion.text)
+                    results, draft = await self._fan_out(history)
+                    for msg in results:
+                        self._emit(history, msg)
+                    if not any(m.ok is False for m in results):
+                        break
+        finally:
+            await _cancel(draft)
+            await _cancel(prepare)
+        return history
+
+    # ------------------------------------------------------------------ #
+    async def _fan_out(
+        self, history: List[Message]
+    ) -> Tuple[List[Message], "asyncio.Task[Completion] | None"]:
+        snapshot = list(history)
+        tasks = [
+            asyncio.create_task(
+                _traced(agent.name, agent.areply(snapshot)), name=f"check:{agent.name}"
+            )
+            for agent in self._checkers
+        ]
+        order = {task: i for i, task in enumerate(tasks)}
+        done: Dict[int, Message] = {}
+        draft: asyncio.Task[Completion] | None = None
+        seen: Set[int] = set()  # checker replies the current draft was based on
+        pending = set(tasks)
+        try:
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                failed = False
+                for task in finished:
+                    msg = task.result()
+                    done[order[task]] = msg
+                    failed = failed or msg.ok is False
+                if self._speculative and failed and pending:
+                    await _cancel(draft)
+                    seen = set(done)
+                    partial = snapshot + [done[i] for i in sorted(seen)]
+                    draft = asyncio.create_task(
+                        _traced(self._coder.name, self._coder.adraft(partial)), name="draft:coder"
+                    )
+                    self.speculated += 1
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await _cancel(draft)
+            raise
+        results = [done[i] for i in range(len(tasks))]
+        if draft is not None and any(
+            results[i].ok is False for i in range(len(results)) if i not in seen
+        ):
+            log.debug("discarding speculative draft: a later check failed")
+            await _cancel(draft)
+            draft = None
+        return results, draft
+
+    def _emit(self, history: List[Message], msg: Message) -> None:
+        history.append(msg)
+        if self._on_message is not None:
+            self._on_message(msg)
+
+
+async def _traced(name: str, aw: Awaitable[T]) -> T:
+    with span(f"agent.{name}", "agent"):
+        return await aw
+
+
+async def _gather(*aws: Awaitable[T]) -> List[T]:
+    return list(await asyncio.gather(*aws))
+
+
+async def _cancel(task: "asyncio.Task | None") -> None:
+    if task is None:
+        return
+    if task.done():
+        if not task.cancelled():
+            task.exception()  # mark a discarded draft's failure as retrieved
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
@@ -3,34 +3,71 @@
 
 from __future__ import annotations
 
-import asyncio
-from typing import Literal, Mapping, Type
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Literal, Mapping, Sequence, Tuple, Type
 
-from ..config import AgentConfig
-from ..pipelines.refactor_pipeline import RefactorPipeline
-from ..pipelines.docs_pipeline import DocsPipeline
-from ..pipelines.test_pipeline import TestPipeline
-from ..pipelines.validate_pipeline import ValidatePipeline
-from ..core.pipeline_base import PipelineBase
+if TYPE_CHECKING:
+    from ..config import AgentConfig
+    from ..core.agent_base import Message
+    from ..core.pipeline_base import PipelineBase
+    from ..core.resources import SharedResources
+    from .batch import BatchJob, JobResult
 
 PipelineName = Literal["refactor", "docs", "test", "validate"]
 
-_PIPELINES: Mapping[PipelineName, Type[PipelineBase]] = {
-    "refactor": RefactorPipeline,
-    "docs": DocsPipeline,
-    "test": TestPipeline,
-    "validate": ValidatePipeline,
+# "module:Class", imported on first use so unused pipelines cost nothing.
+_PIPELINES: Mapping[PipelineName, str] = {
+    "refactor": "..pipelines.refactor_pipeline:RefactorPipeline",
+    "docs": "..pipelines.docs_pipeline:DocsPipeline",
+    "test": "..pipelines.test_pipeline:TestPipeline",
+    "validate": "..pipelines.validate_pipeline:ValidatePipeline",
 }
+PIPELINE_NAMES: Tuple[str, ...] = tuple(_PIPELINES)
+
+
+def pipeline_class(name: PipelineName) -> Type["PipelineBase"]:
+    """The pipeline registered under *name*."""
+    try:
+        module, _, attr = _PIPELINES[name].partition(":")
+    except KeyError:
+        raise ValueError(f"Unknown pipeline: {name!r}") from None
+    return getattr(import_module(module, __package__), attr)
 
 
 class AgentSystem:
     """Public API: run a chosen pipeline."""
 
-    def __init__(self, cfg: AgentConfig) -> None:
+    def __init__(
+        self, cfg: "AgentConfig", resources: Callable[[], "SharedResources"] | None = None
+    ) -> None:
         self._cfg = cfg
+        self._resources = resources  # called inside the event loop; owned by this system
 
     # ------------------------------------------------------------------ #
-    def run_pipeline(self, pipeline: PipelineName, prompt: str) -> None:
-        """Execute *pipeline* synchronously."""
-        cls = _PIPELINES[pipeline]
-        asyncio.run(cls(self._cfg).arun(prompt))
+    def run_pipeline(self, pipeline: PipelineName, prompt: str) -> List["Message"]:
+        """Execute *pipeline* synchronously; return the transcript."""
+        import asyncio  # deferred: keeps `agent --help` light
+
+        cls = pipeline_class(pipeline)
+
+        async def _run() -> List["Message"]:
+            if self._resources is None:
+                return await cls(self._cfg).arun(prompt)
+            res = self._resources()
+            try:
+                return await cls(self._cfg, res).arun(prompt)
+            finally:
+                await res.aclose()
+
+        return asyncio.run(_run())
+
+    def run_batch(
+        self, jobs: Sequence["BatchJob"], out: Path | None = None, concurrency: int = 4
+    ) -> List["JobResult"]:
+        """Run many (project, pipeline, prompt) jobs in one event loop."""
+        import asyncio
+
+        from .batch import BatchRunner
+
+        return asyncio.run(BatchRunner(self._cfg, concurrency).arun(jobs, out))
@@ -0,0 +1,243 @@
+# src/agent/core/tracing.py
+"""Lightweight spans for LLM calls, embeddings, commands and patches."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import statistics
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+# USD per million (prompt, completion) tokens, keyed by model name.
+Prices = Mapping[str, Tuple[float, float]]
+
+
+@dataclass
+class Span:
+    """One timed operation. Well‑known attrs:
+
+    ``model``, ``prompt_tokens``, ``completion_tokens``, ``cached_tokens``,
+    ``ttft_ms`` (LLM); ``inputs`` (embeddings); ``rc``, ``stdout_bytes``,
+    ``stderr_bytes`` (commands); ``files``, ``hunks``, ``ok`` (patches).
+    """
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+
+    @property
+    def ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+_tracer: ContextVar["Tracer | None"] = ContextVar("agent_tracer", default=None)
+_parent: ContextVar[Span | None] = ContextVar("agent_span", default=None)
+
+
+def _hex(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Tracer:
+    """Collect spans for one run; export as JSONL or OTLP‑JSON, or summarise."""
+
+    def __init__(self) -> None:
+        self.trace_id = _hex(16)
+        self.spans: List[Span] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str, **attrs: Any) -> Iterator[Span]:
+        parent = _parent.get()
+        sp = Span(
+            name,
+            kind,
+            self.trace_id,
+            _hex(8),
+            parent.span_id if parent else None,
+            time.time_ns(),
+            attrs=dict(attrs),
+        )
+        token = _parent.set(sp)
+        try:
+            yield sp
+        except BaseException as exc:
+            sp.error = f"{type(exc).__name__}: {exc}"[:500]
+            raise
+        finally:
+            _parent.reset(token)
+            sp.end_ns = time.time_ns()
+            self.spans.append(sp)
+
+    # Export ------------------------------------------------------------ #
+    def export_jsonl(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as fh:
+            for sp in sorted(self.spans, key=lambda s: s.start_ns):
+                row = {
+                    "name": sp.name,
+                    "kind": sp.kind,
+                    "trace_id": sp.trace_id,
+                    "span_id": sp.span_id,
+                    "parent_id": sp.parent_id,
+                    "start_ns": sp.start_ns,
+                    "ms": round(sp.ms, 3),
+                    **sp.attrs,
+                }
+                if sp.error:
+                    row["error"] = sp.error
+                fh.write(json.dumps(row, default=str) + "\n")
+
+    def export_otlp(self, path: Path, service: str = "agent") -> None:
+        """OTLP/JSON (``ExportTraceServiceRequest``), loadable by OTel collectors."""
+        spans = [
+            {
+                "traceId": sp.trace_id,
+                "spanId": sp.span_id,
+                **({"parentSpanId": sp.parent_id} if sp.parent_id else {}),
+                "name": sp.name,
+                "kind": 3 if sp.kind in ("llm", "embed") else 1,  # CLIENT / INTERNAL
+                "startTimeUnixNano": str(sp.start_ns),
+                "endTimeUnixNano": str(sp.end_ns),
+                "attributes": [_otlp_attr("agent.kind", sp.kind)]
+                + [_otlp_attr(k, v) for k, v in sp.attrs.items()],
+                "status": {"code": 2, "message": sp.error} if sp.error else {"code": 1},
+            }
+            for sp in self.spans
+        ]
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attr("service.name", service)]},
+                    "scopeSpans": [{"scope": {"name": "agent.tracing"}, "spans": spans}],
+                }
+            ]
+        }
+        path.write_text(json.dumps(payload), encoding="utf-8")
+
+    def export(self, path: Path) -> None:
+        """OTLP‑JSON for ``.json``, JSONL otherwise."""
+        if path.suffix == ".json":
+            self.export_otlp(path)
+        else:
+            self.export_jsonl(path)
+
+    # Summary ----------------------------------------------------------- #
+    def summary(self, prices: Prices | None = None) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, total/p50/p95 ms, tokens, bytes, queue depth and cost."""
+        groups: Dict[str, List[Span]] = {}
+        for sp in self.spans:
+            groups.setdefault(sp.name, []).append(sp)
+        out: Dict[str, Dict[str, float]] = {}
+        for name, spans in sorted(groups.items(), key=lambda kv: -sum(s.ms for s in kv[1])):
+            times = sorted(s.ms for s in spans)
+            row: Dict[str, float] = {
+                "count": len(spans),
+                "errors": sum(1 for s in spans if s.error),
+                "total_ms": round(sum(times), 1),
+                "p50_ms": round(statistics.median(times), 1),
+                "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 1),
+            }
+            for key in ("prompt_tokens", "completion_tokens", "cached_tokens",
+                        "stdout_bytes", "stderr_bytes"):
+                total = sum(int(s.attrs.get(key) or 0) for s in spans)
+                if total:
+                    row[key] = total
+            ttft = [s.attrs["ttft_ms"] for s in spans if s.attrs.get("ttft_ms") is not None]
+            if ttft:
+                row["ttft_p50_ms"] = round(statistics.median(ttft), 1)
+            queued = [s.attrs["queued"] for s in spans if s.attrs.get("queued") is not None]
+            if queued:
+                row["queued_max"] = max(queued)
+            if prices:
+                cost = sum(_cost(s, prices) for s in spans)
+                if cost:
+                    row["cost_usd"] = round(cost, 4)
+            out[name] = row
+        return out
+
+    def format_summary(self, prices: Prices | None = None) -> str:
+        """Human‑readable table of :meth:`summary`, hottest first."""
+        rows = self.summary(prices)
+        if not rows:
+            return "no spans recorded"
+        lines = [f"{'span':<22}{'n':>5}{'total s':>10}{'p50 ms':>9}{'p95 ms':>9}  tokens / bytes"]
+        for name, r in rows.items():
+            extra = []
+            if "prompt_tokens" in r or "completion_tokens" in r:
+                extra.append(
+                    f"in={r.get('prompt_tokens', 0)} out={r.get('completion_tokens', 0)}"
+                    f" cached={r.get('cached_tokens', 0)}"
+                )
+            if "ttft_p50_ms" in r:
+                extra.append(f"ttft_p50={r['ttft_p50_ms']}ms")
+            if "queued_max" in r:
+                extra.append(f"queued_max={int(r['queued_max'])}")
+            if "stdout_bytes" in r or "stderr_bytes" in r:
+                extra.append(f"out={r.get('stdout_bytes', 0)}B err={r.get('stderr_bytes', 0)}B")
+            if "cost_usd" in r:
+                extra.append(f"${r['cost_usd']}")
+            if r["errors"]:
+                extra.append(f"errors={int(r['errors'])}")
+            lines.append(
+                f"{name:<22}{int(r['count']):>5}{r['total_ms'] / 1000:>10.2f}"
+                f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}  {' '.join(extra)}"
+            )
+        return "\n".join(lines)
+
+
+def _cost(sp: Span, prices: Prices) -> float:
+    price = prices.get(str(sp.attrs.get("model", "")))
+    if price is None:
+        return 0.0
+    prompt = int(sp.attrs.get("prompt_tokens") or 0)
+    completion = int(sp.attrs.get("completion_tokens") or 0)
+    return (prompt * price[0] + completion * price[1]) / 1e6
+
+
+def _otlp_attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# --------------------------------------------------------------------------- #
+@contextlib.contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """Record spans into *tracer* for code (and tasks started) inside the block."""
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+def current_tracer() -> Tracer | None:
+    return _tracer.get()
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str, **attrs: Any) -> Iterator[Span]:
+    """Time the block as a span of the active tracer; a detached no‑op otherwise."""
+    tracer = _tracer.get()
+    if tracer is None:
+        yield Span(name, kind, "", "", attrs=attrs)
+        return
+    with tracer.span(name, kind, **attrs) as sp:
+        yield sp
@@ -10,6 +10,11 @@ from typing import Iterable, List
 class Embedder(ABC):
     """Return vector representations for text."""
 
+    @property
+    def model(self) -> str:
+        """Model identifier (used for tokenisation and cache keys)."""
+        return type(self).__name__
+
     @abstractmethod
     async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
         """Async embedding call."""
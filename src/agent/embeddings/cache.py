@@ -0,0 +1,219 @@
+# src/agent/embeddings/cache.py
+"""Persistent embedding cache keyed by (model, text hash)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from .base import Embedder
+
+_VECTORS = "vectors.f32"
+_INDEX = "index.sqlite"
+
+
+def cache_key(model: str, text: str) -> bytes:
+    """16‑byte digest identifying *text* embedded by *model*."""
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """Memory‑mapped float32 matrix plus an SQLite ``key → slot`` index.
+
+    One directory per model (vector width is fixed per model). When
+    *max_entries* is reached the least‑recently‑used slots are recycled.
+    Several processes may share a directory: slots, the free list and the
+    LRU clock live in the database and are only read or changed inside an
+    exclusive (``BEGIN IMMEDIATE``) transaction, which also covers the
+    vector reads and writes.
+    """
+
+    def __init__(self, root: Path, model: str, max_entries: int = 500_000) -> None:
+        self._dir = root / re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self._dir / _INDEX, check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER);"
+            "CREATE TABLE IF NOT EXISTS idx (key BLOB PRIMARY KEY, slot INTEGER, used INTEGER);"
+            "CREATE INDEX IF NOT EXISTS idx_used ON idx(used);"
+            "CREATE TABLE IF NOT EXISTS free (slot INTEGER PRIMARY KEY);"
+        )
+        self._dim: int | None = None
+        self._mm: np.memmap | None = None
+        with self._lock, self._transaction():
+            if self._meta("high") is None:  # index written before the free list was persisted
+                used = {s for (s,) in self._db.execute("SELECT slot FROM idx")}
+                high = max(used) + 1 if used else 0
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO free VALUES (?)",
+                    [(s,) for s in range(high) if s not in used],
+                )
+                self._set_meta("high", high)
+            self._sync()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM idx").fetchone()[0]
+
+    # ------------------------------------------------------------------ #
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return cached vectors for the subset of *keys* present."""
+        if not keys:
+            return {}
+        with self._lock, self._transaction():
+            found = self._lookup(keys)
+            if not found:
+                return {}
+            self._touch(found, self._tick())
+            self._sync()
+            assert self._mm is not None
+            return {k: np.array(self._mm[s]) for k, s in found.items()}
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence[Sequence[float]]) -> None:
+        """Store *vectors* under *keys*, evicting LRU entries when full."""
+        if not keys:
+            return
+        arr = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._transaction():
+            self._sync()
+            if self._dim is None:
+                self._dim = int(arr.shape[1])
+                self._set_meta("dim", self._dim)
+            elif arr.shape[1] != self._dim:
+                raise ValueError(f"Cached dim {self._dim} != {arr.shape[1]} for {self._dir.name}.")
+            clock = self._tick()
+            existing = self._lookup(keys)
+            self._touch(existing, clock)  # eviction only picks rows used before *clock*
+            rows = []
+            for key, vec in zip(keys, arr):
+                slot = existing.get(key)
+                if slot is None:
+                    slot = self._alloc(clock)
+                    existing[key] = slot
+                self._mm[slot] = vec  # type: ignore[index]
+                rows.append((key, slot, clock))
+            self._mm.flush()  # type: ignore[union-attr]
+            self._db.executemany("INSERT OR REPLACE INTO idx VALUES (?, ?, ?)", rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                self._mm.flush()
+            self._db.close()
+
+    # ------------------------------------------------------------------ #
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Exclusive write transaction: other processes wait on the database lock."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _meta(self, key: str) -> int | None:
+        row = self._db.execute("SELECT v FROM meta WHERE k=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: int) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _sync(self) -> None:
+        """Pick up the width and size another process may have set; remap if grown."""
+        if self._dim is None:
+            self._dim = self._meta("dim")
+        high = self._meta("high") or 0
+        if self._dim is not None and high and (self._mm is None or self._mm.shape[0] < high):
+            self._map(high)
+
+    def _lookup(self, keys: Sequence[bytes]) -> Dict[bytes, int]:
+        found: Dict[bytes, int] = {}
+        for lo in range(0, len(keys), 500):
+            part = list(keys[lo : lo + 500])
+            marks = ",".join("?" * len(part))
+            found.update(self._db.execute(f"SELECT key, slot FROM idx WHERE key IN ({marks})", part))
+        return found
+
+    def _tick(self) -> int:
+        return self._db.execute("SELECT COALESCE(MAX(used), 0) + 1 FROM idx").fetchone()[0]
+
+    def _touch(self, found: Dict[bytes, int], clock: int) -> None:
+        self._db.executemany("UPDATE idx SET used=? WHERE key=?", [(clock, k) for k in found])
+
+    def _alloc(self, clock: int) -> int:
+        row = self._db.execute("SELECT MIN(slot) FROM free").fetchone()
+        if row[0] is None:
+            high = self._meta("high") or 0
+            if high < self._max:
+                self._set_meta("high", high + 1)
+                if self._mm is None or self._mm.shape[0] <= high:
+                    self._map(min(self._max, max(1024, (high + 1) * 2)))
+                return high
+            self._evict(max(1, self._max // 20), clock)
+            row = self._db.execute("SELECT MIN(slot) FROM free").fetchone()
+            if row[0] is None:
+                raise RuntimeError(f"Embedding cache {self._dir} is full with the current batch.")
+        self._db.execute("DELETE FROM free WHERE slot=?", (row[0],))
+        return row[0]
+
+    def _evict(self, n: int, clock: int) -> None:
+        """Free up to *n* LRU slots, never one touched or written at *clock* (this batch)."""
+        victims = self._db.execute(
+            "SELECT key, slot FROM idx WHERE used < ? ORDER BY used LIMIT ?", (clock, n)
+        ).fetchall()
+        self._db.executemany("DELETE FROM idx WHERE key=?", [(k,) for k, _ in victims])
+        self._db.executemany("INSERT OR IGNORE INTO free VALUES (?)", [(s,) for _, s in victims])
+
+    def _map(self, rows: int) -> None:
+        """(Re)open the memmap with capacity for at least *rows* vectors."""
+        assert self._dim is not None
+        path = self._dir / _VECTORS
+        need = rows * self._dim * 4
+        with open(path, "ab") as fh:
+            if fh.tell() < need:
+                fh.truncate(need)
+        if self._mm is not None:
+            self._mm.flush()
+        size = path.stat().st_size // (self._dim * 4)
+        self._mm = np.memmap(path, dtype=np.float32, mode="r+", shape=(size, self._dim))
+
+
+class CachedEmbedder(Embedder):
+    """Serve repeat texts from :class:`EmbeddingCache`; only misses hit *inner*."""
+
+    def __init__(self, inner: Embedder, cache: EmbeddingCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        keys = [cache_key(self.model, t) for t in items]
+        # Off the loop: these may wait on another process's lock and flush the memmap.
+        hits = await asyncio.to_thread(self._cache.get_many, keys)
+        todo: Dict[bytes, str] = {}
+        for k, t in zip(keys, items):
+            if k not in hits:
+                todo.setdefault(k, t)  # identical texts are embedded once
+        if todo:
+            fresh = await self._inner.aembed(list(todo.values()))
+            await asyncio.to_thread(self._cache.put_many, list(todo), fresh)
+            hits.update((k, np.asarray(v, dtype=np.float32)) for k, v in zip(todo, fresh))
+        return [hits[k].tolist() for k in keys]
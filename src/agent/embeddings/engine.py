@@ -0,0 +1,111 @@
+# src/agent/embeddings/engine.py
+"""Token‑aware batching, bounded concurrency and retry around any embedder."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Iterable, List, Sequence
+
+from ..util.tokens import count_tokens_batch, truncate_tokens
+from .base import Embedder
+
+_RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRY_NAMES = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for throttling / transient provider errors (duck‑typed, SDK agnostic)."""
+    if getattr(exc, "status_code", None) in _RETRY_STATUS:
+        return True
+    return type(exc).__name__ in _RETRY_NAMES
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds suggested by a ``Retry-After`` header, if the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def pack(lengths: Sequence[int], max_tokens: int, max_items: int) -> List[List[int]]:
+    """Greedily group indices so each batch stays under both limits, in order."""
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    used = 0
+    for i, n in enumerate(lengths):
+        if cur and (used + n > max_tokens or len(cur) >= max_items):
+            batches.append(cur)
+            cur, used = [], 0
+        cur.append(i)
+        used += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+class BatchingEmbedder(Embedder):
+    """Split large inputs into token‑bounded batches run concurrently.
+
+    Output order always matches input order. Rate‑limit and transient errors
+    are retried with jittered exponential backoff (honouring ``Retry-After``).
+    """
+
+    def __init__(
+        self,
+        inner: Embedder,
+        max_batch_tokens: int = 100_000,
+        max_batch_size: int = 512,
+        max_input_tokens: int = 8191,
+        concurrency: int = 4,
+        max_retries: int = 6,
+        backoff: float = 1.0,
+    ) -> None:
+        self._inner = inner
+        self._max_batch_tokens = max_batch_tokens
+        self._max_batch_size = max_batch_size
+        self._max_input_tokens = max_input_tokens
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._max_retries = max_retries
+        self._backoff = backoff
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        if not items:
+            return []
+        lengths = await asyncio.to_thread(count_tokens_batch, items, self.model)
+        for i, n in enumerate(lengths):
+            if n > self._max_input_tokens:
+                items[i] = truncate_tokens(items[i], self._max_input_tokens, self.model)
+                lengths[i] = self._max_input_tokens
+
+        out: List[list[float]] = [[] for _ in items]
+
+        async def _run(batch: List[int]) -> None:
+            vectors = await self._aembed_batch([items[i] for i in batch])
+            for i, vec in zip(batch, vectors):
+                out[i] = vec
+
+        batches = pack(lengths, self._max_batch_tokens, self._max_batch_size)
+        await asyncio.gather(*(_run(b) for b in batches))
+        return out
+
+    async def _aembed_batch(self, batch: List[str]) -> List[list[float]]:
+        attempt = 0
+        while True:
+            async with self._sem:
+                try:
+                    return await self._inner.aembed(batch)
+                except Exception as exc:  # noqa: BLE001
+                    if attempt >= self._max_retries or not is_retryable(exc):
+                        raise
+                    delay = retry_after(exc) or self._backoff * 2**attempt
+            # Sleep outside the semaphore so other batches keep flowing.
+            attempt += 1
+            await asyncio.sleep(delay * (1 + random.random() * 0.25))
@@ -0,0 +1,53 @@
+# src/agent/embeddings/factory.py
+"""Build the configured :class:`Embedder`."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from ..config import AgentConfig
+from .base import Embedder
+from .engine import BatchingEmbedder
+
+if TYPE_CHECKING:
+    from ..core.resources import SharedResources
+
+
+def build_embedder(cfg: AgentConfig, res: "SharedResources | None" = None) -> Embedder:
+    """Instantiate the embedder named by ``cfg.embedding_provider``."""
+    provider, model = cfg.embedding_provider
+    inner: Embedder
+    if res is not None and res.embedder_factory is not None:
+        inner = res.embedder_factory(provider, model)
+    elif provider == "openai":
+        from .openai_embed import OpenAIEmbedder
+
+        conf = dict(cfg.embedding_config)
+        client = res.clients.openai(**conf) if res is not None else None
+        inner = OpenAIEmbedder(model, api_key=conf.get("api_key"), client=client)
+    else:
+        raise ValueError(f"Unsupported embedding provider: {provider!r}")
+    if res is not None:
+        from ..core.ratelimit import RateLimitedEmbedder
+
+        inner = RateLimitedEmbedder(inner, res.limiter, f"{provider}:{model}")
+    eng = cfg.embedding_engine
+    embedder: Embedder = BatchingEmbedder(
+        inner,
+        max_batch_tokens=eng.max_batch_tokens,
+        max_batch_size=eng.max_batch_size,
+        max_input_tokens=eng.max_input_tokens,
+        concurrency=eng.concurrency,
+        max_retries=eng.max_retries,
+    )
+    if cfg.embedding_cache.enabled:
+        from .cache import CachedEmbedder, EmbeddingCache
+
+        key = f"{provider}:{model}"
+        cache = (
+            res.embedding_cache(cfg.embedding_cache, key)
+            if res is not None
+            else EmbeddingCache(cfg.embedding_cache.path, key, cfg.embedding_cache.max_entries)
+        )
+        embedder = CachedEmbedder(embedder, cache)
+    return embedder
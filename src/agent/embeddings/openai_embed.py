@@ -8,16 +8,28 @@ from typing import Iterable, List
 
 from openai import AsyncOpenAI  # type: ignore
 
+from ..core.tracing import span
 from .base import Embedder
 
 
 class OpenAIEmbedder(Embedder):
     """Wrapper around OpenAI embedding endpoint."""
 
-    def __init__(self, model: str, api_key: str | None = None) -> None:
-        self._client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self, model: str, api_key: str | None = None, client: AsyncOpenAI | None = None
+    ) -> None:
+        self._client = client or AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
         self._model = model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
-        resp = await self._client.embeddings.create(model=self._model, input=list(texts))
+        items = list(texts)
+        with span("embed", "embed", model=self._model, inputs=len(items)) as sp:
+            resp = await self._client.embeddings.create(model=self._model, input=items)
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                sp.set(prompt_tokens=usage.prompt_tokens or 0)
         return [d.embedding for d in resp.data]
@@ -0,0 +1,2 @@
+# src/agent/indexing/__init__.py
+"""Walk, chunk and embed the target codebase."""
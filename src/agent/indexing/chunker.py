@@ -0,0 +1,111 @@
+# src/agent/indexing/chunker.py
+"""Split source files into embeddable chunks at def/class boundaries."""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A contiguous span of one file (1‑based, inclusive line numbers)."""
+
+    path: str
+    start: int
+    end: int
+    text: str
+
+    @property
+    def hash(self) -> str:
+        """SHA‑256 of the chunk text."""
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+def chunk_file(path: str, source: str, max_lines: int = 120) -> List[Chunk]:
+    """Chunk *source*; Python is split syntactically, everything else by paragraphs."""
+    lines = source.splitlines(keepends=True)
+    if not lines:
+        return []
+    spans: List[Tuple[int, int]]
+    if path.endswith((".py", ".pyi")):
+        try:
+            spans = _python_spans(ast.parse(source), len(lines), max_lines)
+        except (SyntaxError, ValueError):
+            spans = _text_spans(lines, max_lines)
+    else:
+        spans = _text_spans(lines, max_lines)
+    chunks: List[Chunk] = []
+    for start, end in spans:
+        text = "".join(lines[start - 1 : end])
+        if text.strip():
+            chunks.append(Chunk(path, start, end, text))
+    return chunks
+
+
+# Python ------------------------------------------------------------- #
+def _node_start(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(d.lineno for d in decorators)])
+
+
+def _python_spans(tree: ast.Module, n_lines: int, max_lines: int) -> List[Tuple[int, int]]:
+    """One span per top‑level def/class; module code in between is grouped."""
+    spans: List[Tuple[int, int]] = []
+    cursor = 1
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start, end = _node_start(node), node.end_lineno or node.lineno
+        if start > cursor:
+            spans.extend(_split(cursor, start - 1, max_lines))
+        if isinstance(node, ast.ClassDef) and end - start + 1 > max_lines:
+            spans.extend(_class_spans(node, start, end, max_lines))
+        else:
+            spans.extend(_split(start, end, max_lines))
+        cursor = end + 1
+    if cursor <= n_lines:
+        spans.extend(_split(cursor, n_lines, max_lines))
+    return spans
+
+
+def _class_spans(node: ast.ClassDef, start: int, end: int, max_lines: int) -> List[Tuple[int, int]]:
+    """Large classes: header/attributes chunk followed by one chunk per method."""
+    spans: List[Tuple[int, int]] = []
+    cursor = start
+    for child in node.body:
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        c_start, c_end = _node_start(child), child.end_lineno or child.lineno
+        if c_start > cursor:
+            spans.extend(_split(cursor, c_start - 1, max_lines))
+        spans.extend(_split(c_start, c_end, max_lines))
+        cursor = c_end + 1
+    if cursor <= end:
+        spans.extend(_split(cursor, end, max_lines))
+    return spans
+
+
+# Plain text --------------------------------------------------------- #
+def _text_spans(lines: List[str], max_lines: int) -> List[Tuple[int, int]]:
+    """Greedily pack blank‑line separated paragraphs up to *max_lines*."""
+    spans: List[Tuple[int, int]] = []
+    start = 1
+    last_blank = 0
+    for i, line in enumerate(lines, start=1):
+        if not line.strip():
+            last_blank = i
+        if i - start + 1 >= max_lines:
+            cut = last_blank if last_blank > start else i
+            spans.append((start, cut))
+            start = cut + 1
+            last_blank = 0
+    if start <= len(lines):
+        spans.append((start, len(lines)))
+    return spans
+
+
+def _split(start: int, end: int, max_lines: int) -> List[Tuple[int, int]]:
+    return [(s, min(s + max_lines - 1, end)) for s in range(start, end + 1, max_lines)]
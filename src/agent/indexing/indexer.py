@@ -0,0 +1,258 @@
+# src/agent/indexing/indexer.py
+"""Incremental, content‑hashed indexer feeding the vector store."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
+
+from ..config import AgentConfig, IndexConfig
+from ..core.ratelimit import Priority, priority
+from ..embeddings.base import Embedder
+from ..embeddings.factory import build_embedder
+from ..vectorstore.base import VectorStore, content_id
+from ..vectorstore.factory import build_store
+from .chunker import Chunk, chunk_file
+
+if TYPE_CHECKING:
+    from ..core.resources import SharedResources
+
+log = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+_MANIFEST_VERSION = 2
+_SAVE_EVERY = 16  # batches between manifest checkpoints
+
+
+_Fresh = Tuple[str, Chunk, Dict[str, Any]]  # (id, chunk, metadata)
+
+
+@dataclass
+class IndexStats:
+    """Counters reported by :meth:`Indexer.arun`."""
+
+    files: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    chunks_embedded: int = 0
+    chunks_reused: int = 0
+
+
+class Manifest:
+    """Per‑file content hashes of everything currently in the vector store."""
+
+    def __init__(self, path: Path | None, model: str) -> None:
+        self._path = path
+        self.model = model
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            # A different embedding model invalidates every stored vector.
+            if data.get("version") == _MANIFEST_VERSION and data.get("model") == model:
+                self.files = data.get("files", {})
+
+    def save(self) -> None:
+        """Atomically write the manifest (no‑op for in‑memory indexes)."""
+        if self._path is None:
+            return
+        payload = {"version": _MANIFEST_VERSION, "model": self.model, "files": self.files}
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self._path)
+
+
+class Indexer:
+    """Walk *root*, chunk changed files and embed only chunks not seen before."""
+
+    def __init__(
+        self,
+        root: Path,
+        store: VectorStore,
+        embedder: Embedder,
+        cfg: IndexConfig,
+        manifest: Manifest,
+    ) -> None:
+        self._root = root
+        self._store = store
+        self._embedder = embedder
+        self._cfg = cfg
+        self._manifest = manifest
+        self._skip: set[Path] = set()
+
+    @classmethod
+    def from_config(cls, cfg: AgentConfig, res: "SharedResources | None" = None) -> "Indexer":
+        """Wire store, embedder and manifest from *cfg*."""
+        vs = cfg.vector_store
+        manifest_path = vs.persist_path / MANIFEST_NAME if vs.persist and vs.persist_path else None
+        indexer = cls(
+            cfg.project_path,
+            build_store(vs),
+            build_embedder(cfg, res),
+            cfg.index,
+            Manifest(manifest_path, ":".join(cfg.embedding_provider)),
+        )
+        if vs.persist_path is not None:
+            indexer._skip.add(vs.persist_path.resolve())
+        return indexer
+
+    @property
+    def store(self) -> VectorStore:
+        """The vector store this indexer writes to."""
+        return self._store
+
+    @property
+    def embedder(self) -> Embedder:
+        """The embedder used for chunks (and queries against them)."""
+        return self._embedder
+
+    # ------------------------------------------------------------------ #
+    async def arun(self) -> IndexStats:
+        """Bring the vector store up to date with the working tree."""
+        stats = IndexStats()
+        files = self._manifest.files
+        seen: set[str] = set()
+        pending: List[Tuple[str, Dict[str, Any], List[_Fresh]]] = []
+
+        for path, st in self._walk():
+            rel = path.relative_to(self._root).as_posix()
+            seen.add(rel)
+            stats.files += 1
+            old = files.get(rel)
+            if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                continue
+            data = path.read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            if old and old["sha"] == sha:
+                old["mtime_ns"] = st.st_mtime_ns  # touched, not modified
+                continue
+            try:
+                source = data.decode("utf-8")
+            except UnicodeDecodeError:
+                # Drop what an earlier, decodable version left in the store and
+                # remember the hash so the file is not re‑read until it changes.
+                if old and old["chunks"]:
+                    self._store.delete_where(path=rel)
+                    stats.files_removed += 1
+                files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha": sha, "chunks": []}
+                continue
+            chunks = _identify(rel, chunk_file(rel, source, self._cfg.max_chunk_lines))
+            fresh = self._diff(chunks, old["chunks"] if old else [])
+            entry = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha": sha,
+                "chunks": [[id_, m["hash"], m["start"], m["end"]] for id_, _, m in chunks],
+            }
+            pending.append((rel, entry, fresh))
+            stats.files_changed += 1
+            stats.chunks_reused += len(chunks) - len(fresh)
+
+        for rel in set(files) - seen:
+            self._store.delete_where(path=rel)
+            del files[rel]
+            stats.files_removed += 1
+
+        try:
+            with priority(Priority.BACKGROUND):
+                await self._aembed(pending, stats)
+        finally:
+            self._checkpoint()
+        log.info("indexed %s", stats)
+        return stats
+
+    def _diff(self, chunks: List[_Fresh], old_rows: List[List[Any]]) -> List[_Fresh]:
+        """Drop vanished chunks, re‑span moved ones; return chunks needing vectors."""
+        old_spans = {row[0]: (row[2], row[3]) for row in old_rows}
+        fresh: List[_Fresh] = []
+        moved_ids: List[str] = []
+        moved_meta: List[Dict[str, Any]] = []
+        current: set[str] = set()
+        for id_, chunk, meta in chunks:
+            current.add(id_)
+            span = old_spans.get(id_)
+            if span is None:
+                fresh.append((id_, chunk, meta))
+            elif tuple(span) != (chunk.start, chunk.end):
+                moved_ids.append(id_)
+                moved_meta.append(meta)
+        self._store.delete([id_ for id_ in old_spans if id_ not in current])
+        self._store.update_metadata(moved_ids, moved_meta)
+        return fresh
+
+    async def _aembed(
+        self, pending: List[Tuple[str, Dict[str, Any], List[_Fresh]]], stats: IndexStats
+    ) -> None:
+        """Embed fresh chunks in batches; commit a file once all its chunks landed."""
+        files = self._manifest.files
+        remaining = [len(fresh) for _, _, fresh in pending]
+        queue: List[Tuple[int, _Fresh]] = []
+        for owner, (rel, entry, fresh) in enumerate(pending):
+            if not fresh:
+                files[rel] = entry
+            queue.extend((owner, c) for c in fresh)
+
+        size = max(1, self._cfg.batch_size)
+        for n, lo in enumerate(range(0, len(queue), size), start=1):
+            batch = queue[lo : lo + size]
+            texts = [c.text for _, (_, c, _) in batch]
+            vectors = await self._embedder.aembed(texts)
+            self._store.add(
+                texts,
+                vectors,
+                [m for _, (_, _, m) in batch],
+                [id_ for _, (id_, _, _) in batch],
+            )
+            stats.chunks_embedded += len(batch)
+            for owner, _ in batch:
+                remaining[owner] -= 1
+                if remaining[owner] == 0:
+                    rel, entry, _ = pending[owner]
+                    files[rel] = entry
+            if n % _SAVE_EVERY == 0:
+                self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        """Flush the store before the manifest so it never claims unsaved chunks."""
+        self._store.flush()
+        self._manifest.save()
+
+    def _walk(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        exclude = set(self._cfg.exclude_dirs)
+        suffixes = tuple(self._cfg.extensions)
+        for dirpath, dirnames, filenames in os.walk(self._root):
+            base = Path(dirpath)
+            dirnames[:] = sorted(
+                d for d in dirnames if d not in exclude and (base / d).resolve() not in self._skip
+            )
+            for name in sorted(filenames):
+                if not name.endswith(suffixes):
+                    continue
+                path = base / name
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if st.st_size <= self._cfg.max_file_bytes:
+                    yield path, st
+
+
+def _identify(rel: str, chunks: List[Chunk]) -> List[_Fresh]:
+    """Attach content‑addressed IDs and metadata; repeated chunks get an ordinal."""
+    seen: Dict[str, int] = {}
+    out: List[_Fresh] = []
+    for c in chunks:
+        digest = c.hash
+        ordinal = seen.get(digest, 0)
+        seen[digest] = ordinal + 1
+        meta = {"path": rel, "start": c.start, "end": c.end, "hash": digest, "ordinal": ordinal}
+        out.append((content_id(c.text, meta), c, meta))
+    return out
@@ -0,0 +1,98 @@
+# src/agent/models/anthropic_model.py
+"""Anthropic Messages backend (optional: ``pip install agent[anthropic]``)."""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from ..core.tracing import span
+from .llm_base import ChatMessage, Completion, Delta, LLMBase, Usage, collect
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic  # type: ignore
+
+_DEFAULT_MAX_TOKENS = 4096  # required by the API
+
+
+def to_anthropic(messages: Sequence[ChatMessage]) -> Tuple[str, List[Dict[str, str]]]:
+    """Split out the system prompt and merge consecutive same‑role turns.
+
+    The Messages API takes the system prompt as a separate field and expects
+    the conversation to open with a user turn that alternates with the assistant.
+    """
+    system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+    turns: List[Dict[str, str]] = []
+    for m in messages:
+        if m["role"] == "system":
+            continue
+        if turns and turns[-1]["role"] == m["role"]:
+            turns[-1]["content"] += "\n\n" + m["content"]
+        else:
+            turns.append({"role": m["role"], "content": m["content"]})
+    if turns and turns[0]["role"] == "assistant":
+        turns.insert(0, {"role": "user", "content": "Continue."})
+    return system, turns
+
+
+class AnthropicModel(LLMBase):
+    """Anthropic Messages backend, streamed."""
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str | None = None,
+        client: "AsyncAnthropic | None" = None,
+        **kwargs: Any,
+    ) -> None:
+        if client is None:
+            from anthropic import AsyncAnthropic  # type: ignore
+
+            client = AsyncAnthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        self._client = client
+        self._model = model
+        self._kwargs: dict[str, Any] = {"max_tokens": _DEFAULT_MAX_TOKENS, **kwargs}
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return dict(self._kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await collect(self.astream(messages))
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        """Yield text deltas as they arrive; usage comes with the final one."""
+        system, turns = to_anthropic(messages)
+        usage = Usage()
+        with span("llm.chat", "llm", model=self._model) as sp:
+            start = time.perf_counter()
+            stream = await self._client.messages.create(
+                model=self._model,
+                messages=turns,
+                stream=True,
+                **({"system": system} if system else {}),
+                **self._kwargs,
+            )
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    if "ttft_ms" not in sp.attrs:
+                        sp.set(ttft_ms=round((time.perf_counter() - start) * 1000, 1))
+                    yield Delta(event.delta.text)
+                elif event.type == "message_start":
+                    u = event.message.usage
+                    cached = getattr(u, "cache_read_input_tokens", 0) or 0
+                    written = getattr(u, "cache_creation_input_tokens", 0) or 0
+                    usage = Usage((u.input_tokens or 0) + cached + written, 0, cached)
+                elif event.type == "message_delta" and getattr(event, "usage", None):
+                    usage.completion_tokens = event.usage.output_tokens or 0
+            sp.set(
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cached_tokens=usage.cached_tokens,
+            )
+        yield Delta("", usage)
@@ -0,0 +1,176 @@
+# src/agent/models/cache.py
+"""SQLite‑backed completion cache with a deterministic replay mode."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from ..core.tracing import span
+from .llm_base import ChatMessage, Completion, Delta, LLMBase, Usage
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when no completion was recorded for a request."""
+
+
+def request_key(model: str, messages: Sequence[ChatMessage], params: Dict[str, Any]) -> str:
+    """Stable hash of everything that determines a completion."""
+    blob = json.dumps(
+        {"model": model, "messages": list(messages), "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CachedLLM(LLMBase):
+    """Serve repeated requests from a local SQLite file.
+
+    In *replay* mode the wrapped model is never called; a miss raises
+    :class:`CacheMissError`, which makes pipeline runs network‑free and
+    reproducible. Concurrent identical requests share one upstream call.
+    """
+
+    def __init__(self, inner: LLMBase, path: Path, replay: bool = False) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._inner = inner
+        self._replay = replay
+        self._lock = threading.Lock()  # one connection, used from worker threads
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, model TEXT, text TEXT,"
+            " prompt_tokens INTEGER, completion_tokens INTEGER, created REAL);"
+        )
+        self._inflight: Dict[str, asyncio.Future[Completion]] = {}
+
+    @property
+    def model(self) -> str:
+        return self._inner.model
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._inner.params
+
+    def _get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT text FROM completions WHERE key=?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _store(self, key: str, completion: Completion) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    self.model,
+                    completion.text,
+                    completion.usage.prompt_tokens,
+                    completion.usage.completion_tokens,
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    async def _alookup(self, key: str) -> Completion | None:
+        text = await asyncio.to_thread(self._get, key)  # SQLite may wait on a writer
+        if text is None:
+            if self._replay:
+                raise CacheMissError(f"No recorded completion for {self.model} request {key[:12]}.")
+            return None
+        with span("llm.cache_hit", "llm", model=self.model):
+            return Completion(text, Usage())  # nothing was spent
+
+    async def _ajoin(self, key: str) -> Completion | None:
+        """A stored completion, or the result of an identical in‑flight request.
+
+        ``None`` means the caller has to make the request. When the request a
+        caller joined is cancelled (or its stream closed early) the caller
+        retries instead of inheriting the cancellation.
+        """
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                cached = await self._alookup(key)
+                if cached is not None:
+                    return cached
+                pending = self._inflight.get(key)
+                if pending is None:
+                    return None
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task is not None and task.cancelling()):
+                    raise  # this caller was cancelled, not the request it joined
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await self._afetch(request_key(self.model, messages, self.params), messages)
+
+    async def _afetch(self, key: str, messages: Sequence[ChatMessage]) -> Completion:
+        joined = await self._ajoin(key)
+        if joined is not None:
+            return joined
+        fut: asyncio.Future[Completion] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            completion = await self._inner.achat(messages)
+            fut.set_result(completion)
+            await asyncio.to_thread(self._store, key, completion)
+        except Exception as exc:
+            if not fut.done():
+                fut.set_exception(exc)
+                fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        except BaseException:
+            if not fut.done():
+                fut.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+        return completion
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        """Hits and joined in‑flight requests arrive whole; a miss streams through."""
+        key = request_key(self.model, messages, self.params)
+        joined = await self._ajoin(key)
+        if joined is not None:
+            yield Delta(joined.text, joined.usage)
+            return
+        fut: asyncio.Future[Completion] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        chunks: List[str] = []
+        usage = Usage()
+        try:
+            async with contextlib.aclosing(self._inner.astream(messages)) as stream:
+                async for delta in stream:
+                    chunks.append(delta.text)
+                    if delta.usage is not None:
+                        usage = delta.usage
+                    yield delta
+            completion = Completion("".join(chunks), usage)
+            fut.set_result(completion)
+            await asyncio.to_thread(self._store, key, completion)
+        except Exception as exc:
+            if not fut.done():
+                fut.set_exception(exc)
+                fut.exception()
+            raise
+        except BaseException:  # cancelled, or the consumer closed the stream early
+            if not fut.done():
+                fut.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
@@ -0,0 +1,94 @@
+# src/agent/models/clients.py
+"""Shared, connection‑pooled provider clients."""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from ..config import HttpConfig
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """Hand out provider SDK clients that share one HTTP pool per endpoint.
+
+    Every agent and the embedder get their client here, so all requests to an
+    endpoint multiplex over the same keep‑alive (HTTP/2 when ``h2`` is
+    installed) connections instead of paying a TLS handshake per role.
+    Create it inside the running event loop and :meth:`aclose` it afterwards.
+    """
+
+    def __init__(self, cfg: HttpConfig | None = None) -> None:
+        self._cfg = cfg or HttpConfig()
+        self._pools: Dict[Tuple[str, str], "httpx.AsyncClient"] = {}
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+
+    # ------------------------------------------------------------------ #
+    def pool(self, provider: str, endpoint: str) -> "httpx.AsyncClient":
+        """The pooled HTTP client for *provider* at *endpoint*."""
+        key = (provider, endpoint)
+        pool = self._pools.get(key)
+        if pool is None:
+            import httpx
+
+            cfg = self._cfg
+            pool = httpx.AsyncClient(
+                http2=cfg.http2 and _http2_available(),
+                limits=httpx.Limits(
+                    max_connections=cfg.max_connections,
+                    max_keepalive_connections=cfg.max_keepalive_connections,
+                    keepalive_expiry=cfg.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(cfg.timeout, connect=cfg.connect_timeout),
+                follow_redirects=True,
+            )
+            self._pools[key] = pool
+        return pool
+
+    def openai(self, api_key: str | None = None, base_url: str | None = None, **kwargs: Any) -> Any:
+        """Shared ``AsyncOpenAI`` for (*api_key*, *base_url*)."""
+        from openai import AsyncOpenAI  # type: ignore
+
+        key = ("openai", api_key, base_url, tuple(sorted(kwargs.items())))
+        client = self._clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=self.pool("openai", base_url or "default"),
+                **kwargs,
+            )
+            self._clients[key] = client
+        return client
+
+    def anthropic(
+        self, api_key: str | None = None, base_url: str | None = None, **kwargs: Any
+    ) -> Any:
+        """Shared ``AsyncAnthropic`` for (*api_key*, *base_url*)."""
+        from anthropic import AsyncAnthropic  # type: ignore
+
+        key = ("anthropic", api_key, base_url, tuple(sorted(kwargs.items())))
+        client = self._clients.get(key)
+        if client is None:
+            client = AsyncAnthropic(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=self.pool("anthropic", base_url or "default"),
+                **kwargs,
+            )
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        pools, self._pools = self._pools, {}
+        self._clients.clear()
+        for pool in pools.values():
+            await pool.aclose()
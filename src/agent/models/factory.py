@@ -0,0 +1,107 @@
+# src/agent/models/factory.py
+"""Build the :class:`LLMBase` used by each agent role."""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from ..config import AgentConfig
+from .llm_base import LLMBase, OpenAIModel
+
+if TYPE_CHECKING:
+    from ..core.resources import SharedResources
+
+_CLIENT_OPTIONS = ("api_key", "base_url", "organization", "project")
+
+# (model, provider config, shared resources) → backend
+ProviderBuilder = Callable[[str, Dict[str, Any], "SharedResources | None"], LLMBase]
+
+
+def split_client_options(conf: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Separate SDK client options (credentials, endpoint) from request kwargs."""
+    client = {k: v for k, v in conf.items() if k in _CLIENT_OPTIONS}
+    request = {k: v for k, v in conf.items() if k not in _CLIENT_OPTIONS}
+    return client, request
+
+
+def _openai(model: str, conf: Dict[str, Any], res: "SharedResources | None") -> LLMBase:
+    client_opts, request_kwargs = split_client_options(conf)
+    client = res.clients.openai(**client_opts) if res is not None else None
+    return OpenAIModel(model, api_key=client_opts.get("api_key"), client=client, **request_kwargs)
+
+
+def _anthropic(model: str, conf: Dict[str, Any], res: "SharedResources | None") -> LLMBase:
+    if importlib.util.find_spec("anthropic") is None:
+        raise ImportError(
+            "The anthropic provider needs the `anthropic` package: pip install agent[anthropic]"
+        )
+    from .anthropic_model import AnthropicModel
+
+    client_opts, request_kwargs = split_client_options(conf)
+    client = res.clients.anthropic(**client_opts) if res is not None else None
+    return AnthropicModel(model, api_key=client_opts.get("api_key"), client=client, **request_kwargs)
+
+
+PROVIDERS: Dict[str, ProviderBuilder] = {"openai": _openai, "anthropic": _anthropic}
+
+
+def register_provider(name: str, builder: ProviderBuilder) -> None:
+    """Make *name* usable in ``model_providers`` / ``routing.fallbacks``."""
+    PROVIDERS[name] = builder
+
+
+def create_llm(
+    cfg: AgentConfig, provider: str, model: str, res: "SharedResources | None" = None
+) -> LLMBase:
+    """The raw backend for (*provider*, *model*), configured from ``provider_configs``."""
+    builder = PROVIDERS.get(provider)
+    if builder is None:
+        raise ValueError(f"Unknown LLM provider {provider!r} (known: {', '.join(PROVIDERS)})")
+    return builder(model, dict(cfg.provider_configs.get(provider, {})), res)
+
+
+def _backend(
+    cfg: AgentConfig, role: str, provider: str, model: str, res: "SharedResources | None"
+) -> LLMBase:
+    llm: LLMBase
+    if res is not None and res.llm_factory is not None:
+        llm = res.llm_factory(role, provider, model)
+    else:
+        llm = create_llm(cfg, provider, model, res)
+    if res is not None:
+        from ..core.ratelimit import Priority, RateLimitedLLM
+
+        level = Priority.INTERACTIVE if role == "coder" else Priority.NORMAL
+        llm = RateLimitedLLM(llm, res.limiter, f"{provider}:{model}", level)
+    return llm
+
+
+def build_llm(cfg: AgentConfig, role: str, res: "SharedResources | None" = None) -> LLMBase:
+    """Instantiate the model for *role*.
+
+    Each model in the role's chain (primary, then ``routing.fallbacks``) is
+    rate‑limited on its own lane; the chain is routed by a
+    :class:`~agent.models.routing.FallbackLLM` and wrapped in the response cache.
+    """
+    chain: List[Tuple[str, str]] = [cfg.model_providers[role], *cfg.routing.fallbacks.get(role, ())]
+    models = [_backend(cfg, role, provider, model, res) for provider, model in chain]
+    llm = models[0]
+    if len(models) > 1:
+        from .routing import FallbackLLM
+
+        routing = cfg.routing
+        llm = FallbackLLM(
+            models,
+            res.latency if res is not None else None,
+            routing.hedge,
+            routing.hedge_percentile,
+            routing.hedge_min_samples,
+            routing.hedge_min_delay,
+        )
+    cache = cfg.llm_cache
+    if cache.enabled or cache.replay:
+        from .cache import CachedLLM
+
+        llm = CachedLLM(llm, cache.path, replay=cache.replay)
+    return llm
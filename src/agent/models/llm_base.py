@@ -4,37 +4,158 @@
 from __future__ import annotations
 
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, List
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Literal, Sequence, TypedDict
 
-from openai import AsyncOpenAI  # type: ignore
+from ..core.tracing import span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI  # type: ignore
+
+
+class ChatMessage(TypedDict):
+    """Provider‑neutral chat message."""
+
+    role: Literal["system", "user", "assistant"]
+    content: str
+
+
+@dataclass
+class Usage:
+    """Token accounting reported by the provider."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # prompt tokens served from the provider's prefix cache
+
+
+@dataclass
+class Completion:
+    """Completion text plus usage."""
+
+    text: str
+    usage: Usage = field(default_factory=Usage)
+
+
+@dataclass
+class Delta:
+    """One streamed piece of a completion; the last one carries the usage."""
+
+    text: str = ""
+    usage: Usage | None = None
+
+
+async def collect(stream: AsyncIterator[Delta]) -> Completion:
+    """Drain *stream* into one :class:`Completion`."""
+    chunks: List[str] = []
+    usage = Usage()
+    async for delta in stream:
+        chunks.append(delta.text)
+        if delta.usage is not None:
+            usage = delta.usage
+    return Completion("".join(chunks), usage)
 
 
 class LLMBase(ABC):
-    """Minimal interface every model provider must implement."""
+    """Minimal interface every model provider must implement.
+
+    Callers should put stable content first (system prompt, repo context) and
+    the growing history last so provider‑side prompt caching can reuse the
+    prefix across turns.
+    """
+
+    @property
+    def model(self) -> str:
+        """Model identifier (used for tokenisation and cache keys)."""
+        return type(self).__name__
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Sampling kwargs that influence the output (part of cache keys)."""
+        return {}
 
     @abstractmethod
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        """Return the completion for an ordered list of *messages* (async)."""
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        """Yield the completion as it is generated (one piece unless overridden).
+
+        Consume the iterator to the end (or ``aclose`` it) so spans opened by
+        the backend are closed in the caller's context.
+        """
+        completion = await self.achat(messages)
+        yield Delta(completion.text, completion.usage)
+
     async def acomplete(self, prompt: str) -> str:
         """Return completion text for *prompt* (async)."""
+        return (await self.achat([{"role": "user", "content": prompt}])).text
 
 
 class OpenAIModel(LLMBase):
     """OpenAI Chat‑Completion backend."""
 
-    def __init__(self, model: str, api_key: str | None = None, **kwargs: Any) -> None:
-        self._client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self,
+        model: str,
+        api_key: str | None = None,
+        client: "AsyncOpenAI | None" = None,
+        **kwargs: Any,
+    ) -> None:
+        if client is None:
+            from openai import AsyncOpenAI  # type: ignore
+
+            client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self._client = client
         self._model = model
         self._kwargs: dict[str, Any] = kwargs
 
-    async def acomplete(self, prompt: str) -> str:
-        """Stream tokens then join to one string."""
-        chunks: List[str] = []
-        stream = await self._client.chat.completions.create(
-            model=self._model,
-            messages=[{"role": "user", "content": prompt}],
-            stream=True,
-            **self._kwargs,
-        )
-        async for part in stream:
-            chunks.append(part.choices[0].delta.content or "")
-        return "".join(chunks)
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return dict(self._kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await collect(self.astream(messages))
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        """Yield content deltas as they arrive; usage comes with the final one."""
+        usage = Usage()
+        with span("llm.chat", "llm", model=self._model) as sp:
+            start = time.perf_counter()
+            stream = await self._client.chat.completions.create(
+                model=self._model,
+                messages=list(messages),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._kwargs,
+            )
+            async for part in stream:
+                if part.choices:
+                    text = part.choices[0].delta.content or ""
+                    if text:
+                        if "ttft_ms" not in sp.attrs:
+                            sp.set(ttft_ms=round((time.perf_counter() - start) * 1000, 1))
+                        yield Delta(text)
+                if getattr(part, "usage", None):
+                    usage = _usage(part.usage)
+            sp.set(
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cached_tokens=usage.cached_tokens,
+            )
+        yield Delta("", usage)
+
+
+def _usage(raw: Any) -> Usage:
+    details = getattr(raw, "prompt_tokens_details", None)
+    return Usage(
+        prompt_tokens=raw.prompt_tokens or 0,
+        completion_tokens=raw.completion_tokens or 0,
+        cached_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0,
+    )
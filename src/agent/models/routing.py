@@ -0,0 +1,177 @@
+# src/agent/models/routing.py
+"""Fallback chains and hedged requests across models."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Sequence, Tuple
+
+from .llm_base import ChatMessage, Completion, Delta, LLMBase, collect
+
+log = logging.getLogger(__name__)
+
+_Event = Delta | Exception | None  # None: the stream ended
+
+
+class LatencyTracker:
+    """Rolling time‑to‑first‑token samples per model."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, seconds: float) -> None:
+        self._samples.setdefault(model, deque(maxlen=self._window)).append(seconds)
+
+    def count(self, model: str) -> int:
+        return len(self._samples.get(model, ()))
+
+    def percentile(self, model: str, pct: float) -> float | None:
+        """The *pct* (0–1) quantile of *model*'s TTFT, or ``None`` without samples."""
+        samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+class _Attempt:
+    """One request, pumped by its own task into the shared event queue.
+
+    Running the whole stream inside one task keeps the backend's spans (and
+    any other context state) opened and closed in the same context.
+    """
+
+    def __init__(
+        self,
+        llm: LLMBase,
+        messages: Sequence[ChatMessage],
+        events: "asyncio.Queue[Tuple[_Attempt, _Event]]",
+    ) -> None:
+        self.llm = llm
+        self.start = time.perf_counter()
+        self._events = events
+        self.task = asyncio.create_task(self._pump(messages), name=f"llm:{llm.model}")
+
+    async def _pump(self, messages: Sequence[ChatMessage]) -> None:
+        try:
+            async with contextlib.aclosing(self.llm.astream(messages)) as stream:
+                async for delta in stream:
+                    self._events.put_nowait((self, delta))
+        except Exception as exc:  # noqa: BLE001 – handed to the consumer
+            self._events.put_nowait((self, exc))
+        else:
+            self._events.put_nowait((self, None))
+
+
+class FallbackLLM(LLMBase):
+    """Try *chain* in order; optionally hedge a slow primary with the next model.
+
+    A model that fails before its first token is replaced by the next one in
+    the chain. With *hedge* on, the first alternate is also asked once the
+    primary has gone longer than its *hedge_percentile* TTFT without a token;
+    whichever answers first is streamed and the other request is cancelled.
+    Failures after the first token are raised (the output cannot be retracted).
+    """
+
+    def __init__(
+        self,
+        chain: Sequence[LLMBase],
+        latency: LatencyTracker | None = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.5,
+    ) -> None:
+        if not chain:
+            raise ValueError("FallbackLLM needs at least one model.")
+        self._chain = list(chain)
+        self._latency = latency or LatencyTracker()
+        self._hedge = hedge
+        self._pct = hedge_percentile
+        self._min_samples = hedge_min_samples
+        self._min_delay = hedge_min_delay
+        self.stats = {"requests": 0, "fallbacks": 0, "hedged": 0, "hedge_won": 0}
+
+    @property
+    def model(self) -> str:
+        return self._chain[0].model
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            **self._chain[0].params,
+            "fallbacks": [m.model for m in self._chain[1:]],
+        }
+
+    def _hedge_after(self, llm: LLMBase) -> float | None:
+        if not self._hedge or self._latency.count(llm.model) < self._min_samples:
+            return None
+        threshold = self._latency.percentile(llm.model, self._pct)
+        return None if threshold is None else max(self._min_delay, threshold)
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await collect(self.astream(messages))
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        self.stats["requests"] += 1
+        events: asyncio.Queue[Tuple[_Attempt, _Event]] = asyncio.Queue()
+        queue = iter(self._chain)
+        live: List[_Attempt] = [_Attempt(next(queue), messages, events)]
+        primary = live[0]
+        hedged = False
+        try:
+            # Race until some attempt produces its first event.
+            while True:
+                timeout = None
+                if not hedged and len(live) == 1 and live[0] is primary:
+                    timeout = self._hedge_after(primary.llm)
+                    if timeout is not None:
+                        timeout = max(0.0, timeout - (time.perf_counter() - primary.start))
+                try:
+                    attempt, event = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    alternate = next(queue, None)
+                    hedged = True
+                    if alternate is not None:
+                        self.stats["hedged"] += 1
+                        log.debug("hedging %s with %s", primary.llm.model, alternate.model)
+                        live.append(_Attempt(alternate, messages, events))
+                    continue
+                if attempt not in live:
+                    continue
+                if isinstance(event, Exception):
+                    live.remove(attempt)
+                    log.warning("%s failed: %s", attempt.llm.model, event)
+                    if not live:
+                        fallback = next(queue, None)
+                        if fallback is None:
+                            raise event
+                        self.stats["fallbacks"] += 1
+                        live.append(_Attempt(fallback, messages, events))
+                    continue
+                break
+            # Only real first‑token times are recorded: a cancelled loser's
+            # elapsed time is a lower bound and would drag the percentile down.
+            self._latency.record(attempt.llm.model, time.perf_counter() - attempt.start)
+            for other in live:
+                if other is not attempt:
+                    other.task.cancel()
+            if hedged and attempt is not primary and primary in live:
+                self.stats["hedge_won"] += 1
+            live = [attempt]
+
+            # Stream the winner.
+            while event is not None:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+                source, event = await events.get()
+                while source is not attempt:
+                    source, event = await events.get()
+        finally:
+            for other in live:
+                other.task.cancel()
@@ -1,5 +1,5 @@
 # src/agent/pipelines/test_pipeline.py
-\"\"\"Test pipeline.\"\"\"
+"""Test pipeline."""
 
 from __future__ import annotations
 
@@ -9,7 +9,7 @@ from ..core.pipeline_base import PipelineBase
 
 
 class TestPipeline(PipelineBase):
-    \"\"\"Runs specialised agent conversation for *test* tasks.\"\"\"
+    """Runs specialised agent conversation for *test* tasks."""
 
     def _conversation(self) -> Conversation:  # noqa: D401
-        return Conversation(self._cfg)
+        return Conversation(self._cfg, self._index, self._res)
@@ -1,5 +1,5 @@
 # src/agent/pipelines/validate_pipeline.py
-\"\"\"Validate pipeline.\"\"\"
+"""Validate pipeline."""
 
 from __future__ import annotations
 
@@ -9,7 +9,7 @@ from ..core.pipeline_base import PipelineBase
 
 
 class ValidatePipeline(PipelineBase):
-    \"\"\"Runs specialised agent conversation for *validate* tasks.\"\"\"
+    """Runs specialised agent conversation for *validate* tasks."""
 
     def _conversation(self) -> Conversation:  # noqa: D401
-        return Conversation(self._cfg)
+        return Conversation(self._cfg, self._index, self._res)
@@ -4,7 +4,22 @@
 from __future__ import annotations
 
 import difflib
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+
+def _new_file_mode() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return 0o666 & ~mask
+
+
+# Read once: os.umask can only be queried by setting it, which is not thread‑safe.
+_NEW_FILE_MODE = _new_file_mode()
 
 
 def read(path: Path) -> str:
@@ -13,14 +28,379 @@ def read(path: Path) -> str:
 
 
 def write(path: Path, text: str) -> None:
-    """Write *text* to *path* atomically."""
-    path.write_text(text, encoding="utf-8")
+    """Write *text* to *path* atomically (temp file in the same dir, then rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        # mkstemp creates 0600; keep the target's mode, or what open() would give.
+        os.chmod(tmp, path.stat().st_mode & 0o7777 if path.exists() else _NEW_FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# --------------------------------------------------------------------------- #
+# Unified diff parsing
+# --------------------------------------------------------------------------- #
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_DEV_NULL = "/dev/null"
+
+
+class PatchError(ValueError):
+    """The patch text is malformed or does not apply."""
+
+
+@dataclass
+class Hunk:
+    """One ``@@`` block; *lines* keep their `` ``/``-``/``+`` prefix."""
+
+    old_start: int
+    new_start: int
+    lines: List[str] = field(default_factory=list)
+    old_no_eol: bool = False  # "\ No newline at end of file" after the last old line
+    new_no_eol: bool = False
+
+    @property
+    def old(self) -> List[str]:
+        return [ln[1:] for ln in self.lines if ln[0] in " -"]
+
+    @property
+    def new(self) -> List[str]:
+        return [ln[1:] for ln in self.lines if ln[0] in " +"]
+
+
+@dataclass
+class FilePatch:
+    """All hunks for one file."""
+
+    old_path: str
+    new_path: str
+    hunks: List[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        """Path the patch writes to (the old path for deletions)."""
+        return self.old_path if self.is_delete else self.new_path
+
+    @property
+    def is_new(self) -> bool:
+        return self.old_path == _DEV_NULL
+
+    @property
+    def is_delete(self) -> bool:
+        return self.new_path == _DEV_NULL
+
+
+def _strip_path(raw: str) -> str:
+    name = raw.split("\t", 1)[0].strip()
+    if name != _DEV_NULL and name[:2] in ("a/", "b/"):
+        name = name[2:]
+    return name
+
+
+def _split(text: str) -> List[str]:
+    """Lines of *text* without their ``\\n`` / ``\\r\\n`` terminators.
+
+    Unlike :meth:`str.splitlines` this does not break on form feeds, ``\\x1c``–``\\x1e``,
+    ``\\x85`` or ``\\u2028``, which are ordinary characters inside a source line.
+    """
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [ln[:-1] if ln.endswith("\r") else ln for ln in lines]
+
+
+def parse_patch(text: str) -> List[FilePatch]:
+    """Parse a (possibly multi‑file) unified diff.
+
+    Hunk line counts are not trusted (model output often gets them wrong);
+    a hunk ends at the next ``@@`` or file header. Blank lines inside a hunk
+    are read as empty context lines.
+    """
+    lines = _split(text)
+    patches: List[FilePatch] = []
+    current: FilePatch | None = None
+    hunk: Hunk | None = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            current = FilePatch(_strip_path(line[4:]), _strip_path(lines[i + 1][4:]))
+            patches.append(current)
+            hunk = None
+            i += 2
+            continue
+        m = _HUNK_RE.match(line)
+        if m:
+            if current is None:
+                raise PatchError(f"hunk before any file header: {line!r}")
+            hunk = Hunk(int(m[1]), int(m[3]))
+            current.hunks.append(hunk)
+        elif line.startswith("diff ") or line.startswith("index "):
+            hunk = None
+        elif hunk is not None:
+            if line.startswith("\\"):
+                if hunk.lines and hunk.lines[-1][0] in " -":
+                    hunk.old_no_eol = True
+                if hunk.lines and hunk.lines[-1][0] in " +":
+                    hunk.new_no_eol = True
+            elif line[:1] in (" ", "-", "+"):
+                hunk.lines.append(line)
+            elif line == "":
+                hunk.lines.append(" ")
+        i += 1
+
+    for patch in patches:
+        for h in patch.hunks:
+            while h.lines and h.lines[-1] == " ":  # trailing fence padding
+                h.lines.pop()
+        patch.hunks = [h for h in patch.hunks if h.lines]
+        if not patch.hunks and not patch.is_delete:
+            raise PatchError(f"no hunks for {patch.path}")
+    if not patches:
+        raise PatchError("no unified diff headers (---/+++) found")
+    return patches
+
+
+# --------------------------------------------------------------------------- #
+# Applying
+# --------------------------------------------------------------------------- #
+@dataclass
+class HunkResult:
+    """Where (and how loosely) one hunk applied."""
+
+    index: int
+    applied: bool
+    line: int = 0  # 1‑based line in the original file
+    offset: int = 0  # lines away from the header's position
+    fuzz: int = 0  # context lines ignored at each end
+    message: str = ""
+
+
+@dataclass
+class FileResult:
+    """Outcome of patching one file; nothing is written unless every hunk applied."""
+
+    path: Path
+    hunks: List[HunkResult] = field(default_factory=list)
+    original: str | None = None
+    patched: str | None = None  # None: file is deleted
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and all(h.applied for h in self.hunks)
+
+    @property
+    def diff(self) -> str:
+        """Unified diff of what was (or would be) written."""
+        before = (self.original or "").splitlines(keepends=True)
+        after = (self.patched or "").splitlines(keepends=True)
+        return "".join(
+            difflib.unified_diff(before, after, fromfile=str(self.path), tofile=str(self.path))
+        )
+
+    def summary(self) -> str:
+        if self.ok:
+            fuzzy = [h for h in self.hunks if h.offset or h.fuzz]
+            note = f" ({len(fuzzy)} with offset/fuzz)" if fuzzy else ""
+            return f"{self.path}: {len(self.hunks)} hunks applied{note}"
+        if self.error:
+            return f"{self.path}: {self.error}"
+        failed = ", ".join(f"#{h.index + 1} {h.message}" for h in self.hunks if not h.applied)
+        return f"{self.path}: hunks failed: {failed}"
+
+
+def _equal(a: Sequence[str], b: Sequence[str], loose: bool) -> bool:
+    if loose:
+        return all(x.rstrip() == y.rstrip() for x, y in zip(a, b))
+    return list(a) == list(b)
+
+
+def _locate(
+    lines: Sequence[str], old: Sequence[str], expected: int, lo: int, loose: bool
+) -> int | None:
+    """Index of *old* in *lines* at or after *lo*, nearest to *expected*."""
+    n = len(old)
+    hi = len(lines) - n
+    if hi < lo:
+        return None
+    expected = min(max(expected, lo), hi)
+    for step in range(0, max(expected - lo, hi - expected) + 1):
+        for pos in (expected - step, expected + step) if step else (expected,):
+            if lo <= pos <= hi and _equal(lines[pos : pos + n], old, loose):
+                return pos
+    return None
+
+
+def _context_trim(hunk: Hunk, fuzz: int) -> Tuple[int, int]:
+    """How many leading/trailing context lines can be dropped (up to *fuzz*)."""
+    head = 0
+    while head < fuzz and head < len(hunk.lines) and hunk.lines[head][0] == " ":
+        head += 1
+    tail = 0
+    while (
+        tail < fuzz
+        and tail < len(hunk.lines) - head
+        and hunk.lines[len(hunk.lines) - 1 - tail][0] == " "
+    ):
+        tail += 1
+    return head, tail
+
+
+def apply_hunks(
+    text: str, hunks: Sequence[Hunk], fuzz: int = 2
+) -> Tuple[str, List[HunkResult]]:
+    """Apply *hunks* to *text* in memory; the text is unchanged where hunks fail."""
+    cr = "\r" if "\r\n" in text else ""  # appended to inserted lines
+    # Split on "\n" only; a line keeps its "\r", so untouched lines round‑trip.
+    lines = text.split("\n")
+    final_eol = lines[-1] == ""
+    if final_eol:
+        lines.pop()
+    keys = [ln[:-1] if ln.endswith("\r") else ln for ln in lines]  # what hunks match
+    out: List[str] = []
+    results: List[HunkResult] = []
+    pos = 0  # consumed prefix of *lines*
+    drift = 0  # offset of the previous hunk, applied to the next one
+    for idx, hunk in enumerate(hunks):
+        found = None
+        for level in range(fuzz + 1):
+            head, tail = _context_trim(hunk, level)
+            if level and (head, tail) == _context_trim(hunk, level - 1):
+                continue
+            body = hunk.lines[head : len(hunk.lines) - tail]
+            old = [ln[1:] for ln in body if ln[0] in " -"]
+            new = [ln[1:] for ln in body if ln[0] in " +"]
+            base = max(hunk.old_start - 1, 0) + head
+            if not old:  # pure insertion: "-N,0" means after line N
+                base = hunk.old_start
+            for loose in (False, True):
+                at = _locate(keys, old, base + drift, pos, loose)
+                if at is not None:
+                    found = (at, old, new, level, at - base)
+                    break
+            if found:
+                break
+        if found is None:
+            results.append(HunkResult(idx, False, message="context not found"))
+            continue
+        at, old, new, level, offset = found
+        out.extend(lines[pos:at])
+        out.extend(ln + cr for ln in new)
+        pos = at + len(old)
+        drift = offset
+        if pos == len(lines):
+            if hunk.new_no_eol:
+                final_eol = False
+            elif hunk.old_no_eol:
+                final_eol = True
+        results.append(HunkResult(idx, True, at + 1, offset, level))
+    out.extend(lines[pos:])
+    if not out:
+        return "", results
+    if not final_eol and out[-1].endswith("\r"):
+        out[-1] = out[-1][:-1]
+    return "\n".join(out) + ("\n" if final_eol else ""), results
+
+
+def _resolve(root: Path, rel: str) -> Path:
+    path = (root / rel).resolve()
+    if not path.is_relative_to(root.resolve()):
+        raise PatchError(f"{rel}: path escapes the project root")
+    return path
+
+
+def group_patches(root: Path, patches: Sequence[FilePatch]) -> Dict[Path, List[FilePatch]]:
+    """Resolve each patch's target under *root* and group them by file, in order."""
+    groups: Dict[Path, List[FilePatch]] = {}
+    for fp in patches:
+        groups.setdefault(_resolve(root, fp.path), []).append(fp)
+    return groups
+
+
+def plan_file(path: Path, patches: Sequence[FilePatch], fuzz: int = 2) -> FileResult:
+    """Compute *path*'s new content from its *patches* (applied in order) without writing."""
+    original = read(path) if path.exists() else None
+    res = FileResult(path, original=original)
+    current = original
+    for fp in patches:
+        if fp.is_new and current is not None and current.strip():
+            res.error = "file already exists"
+        elif current is None and not fp.is_new:
+            res.error = "file not found"
+        elif fp.is_delete:
+            current = None
+            continue
+        else:
+            current, hunks = apply_hunks(current or "", fp.hunks, fuzz)
+            base = len(res.hunks)
+            res.hunks += [replace(h, index=base + h.index) for h in hunks]
+        if not res.ok:
+            break
+    res.patched = current
+    return res
+
+
+def plan_patch(root: Path, text: str, fuzz: int = 2) -> List[FileResult]:
+    """Parse *text* and compute every file's new content without writing."""
+    return [
+        plan_file(path, group, fuzz)
+        for path, group in group_patches(root, parse_patch(text)).items()
+    ]
+
+
+def commit(results: Sequence[FileResult]) -> None:
+    """Write planned results atomically; earlier writes are rolled back on failure."""
+    done: List[FileResult] = []
+    try:
+        for res in results:
+            if res.patched is None:
+                res.path.unlink(missing_ok=True)
+            else:
+                write(res.path, res.patched)
+            done.append(res)
+    except BaseException:
+        for res in reversed(done):
+            if res.original is None:
+                res.path.unlink(missing_ok=True)
+            else:
+                write(res.path, res.original)
+        raise
+
+
+def apply_patch(
+    root: Path, text: str, dry_run: bool = False, fuzz: int = 2
+) -> List[FileResult]:
+    """Apply a multi‑file unified diff under *root*, all files or none.
+
+    Every hunk is located first (exact, then offset, then trailing‑whitespace
+    insensitive, then with up to *fuzz* context lines dropped); only when all
+    of them apply are the files written. ``dry_run`` just verifies.
+    """
+    results = plan_patch(root, text, fuzz)
+    if not dry_run and results and all(r.ok for r in results):
+        commit(results)
+    return results
 
 
 def apply_diff(path: Path, diff: str) -> str:
-    """Apply *diff* (unified) to *path*, return resulting diff."""
-    original = read(path).splitlines(keepends=True)
-    patched = list(difflib.restore(diff.splitlines(keepends=True), 2))
-    write(path, "".join(patched))
-    udiff = difflib.unified_diff(original, patched, fromfile=str(path), tofile=str(path))
+    """Apply single‑file *diff* (unified) to *path*, return resulting diff."""
+    text = read(path) if path.exists() else ""
+    patches = parse_patch(diff)
+    patched, hunks = apply_hunks(text, [h for p in patches for h in p.hunks])
+    failed = [h for h in hunks if not h.applied]
+    if failed:
+        raise PatchError(f"{path}: {len(failed)} of {len(hunks)} hunks did not apply")
+    write(path, patched)
+    udiff = difflib.unified_diff(
+        text.splitlines(keepends=True),
+        patched.splitlines(keepends=True),
+        fromfile=str(path),
+        tofile=str(path),
+    )
     return "".join(udiff)
@@ -0,0 +1,54 @@
+# src/agent/util/tokens.py
+"""Token counting via ``tiktoken`` with a conservative offline fallback."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, List, Sequence
+
+_FALLBACK_ENCODING = "cl100k_base"
+_CHARS_PER_TOKEN = 3  # pessimistic estimate when no BPE tables are available
+
+
+@lru_cache(maxsize=None)
+def encoding_for(model: str) -> Any | None:
+    """Return the ``tiktoken`` encoding for *model*, or ``None`` if unavailable."""
+    try:
+        import tiktoken  # type: ignore
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:  # noqa: BLE001 – BPE download failed (offline sandbox)
+        return None
+    try:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Number of tokens *text* occupies for *model*."""
+    enc = encoding_for(model)
+    if enc is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(enc.encode_ordinary(text))
+
+
+def count_tokens_batch(texts: Sequence[str], model: str = "gpt-4o") -> List[int]:
+    """Vectorised :func:`count_tokens` (tiktoken encodes batches in threads)."""
+    enc = encoding_for(model)
+    if enc is None:
+        return [-(-len(t) // _CHARS_PER_TOKEN) for t in texts]
+    return [len(ids) for ids in enc.encode_ordinary_batch(list(texts))]
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """Cut *text* to at most *max_tokens* tokens."""
+    enc = encoding_for(model)
+    if enc is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    ids = enc.encode_ordinary(text)
+    return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
@@ -3,15 +3,77 @@
 
 from __future__ import annotations
 
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Any, Dict, List, Mapping, NamedTuple, Sequence
+
+
+class Hit(NamedTuple):
+    """One search result; *score* is a similarity (higher is better)."""
+
+    id: str
+    text: str
+    score: float
+    metadata: Dict[str, Any]
+
+
+def content_id(text: str, metadata: Mapping[str, Any] | None = None) -> str:
+    """Stable, content‑addressed document ID.
+
+    Keyed on ``metadata["path"]`` plus the content hash so identical snippets
+    in different files do not collide, while re‑adding the same chunk is a
+    no‑op upsert rather than a duplicate.
+    """
+    meta = metadata or {}
+    digest = meta.get("hash") or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    key = f"{meta.get('path', '')}\0{digest}\0{meta.get('ordinal', 0)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
 
 
 class VectorStore(ABC):
-    """Add/query embeddings."""
+    """Upsert/delete/query embeddings."""
+
+    @abstractmethod
+    def add(
+        self,
+        texts: List[str],
+        vectors: List[list[float]],
+        metadatas: Sequence[Mapping[str, Any]] | None = None,
+        ids: Sequence[str] | None = None,
+    ) -> List[str]:
+        """Upsert documents; *ids* default to :func:`content_id`. Returns the IDs."""
 
     @abstractmethod
-    def add(self, texts: List[str], vectors: List[list[float]]) -> None: ...
+    def delete(self, ids: Sequence[str]) -> None:
+        """Remove documents by ID (unknown IDs are ignored)."""
 
     @abstractmethod
-    def search(self, vector: list[float], k: int = 4) -> List[Tuple[str, float]]: ...
+    def delete_where(self, **where: Any) -> None:
+        """Remove every document whose metadata matches all of *where*, e.g. ``path=...``."""
+
+    @abstractmethod
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Mapping[str, Any]]) -> None:
+        """Replace metadata without touching vectors (e.g. shifted line spans)."""
+
+    @abstractmethod
+    def search(self, vector: list[float], k: int = 4) -> List[Hit]: ...
+
+    def search_many(self, vectors: Sequence[list[float]], k: int = 4) -> List[List[Hit]]:
+        """Batched :meth:`search`; backends override with a vectorised query."""
+        return [self.search(v, k) for v in vectors]
+
+    def flush(self) -> None:
+        """Persist pending writes (no‑op for stores that write through)."""
+
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _resolve_ids(
+        texts: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]] | None,
+        ids: Sequence[str] | None,
+    ) -> List[str]:
+        if ids is not None:
+            return list(ids)
+        if metadatas is None:
+            return [content_id(t) for t in texts]
+        return [content_id(t, m) for t, m in zip(texts, metadatas)]
@@ -4,12 +4,12 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, Mapping, Sequence
 
 import chromadb  # type: ignore
 from chromadb import Settings
 
-from .base import VectorStore
+from .base import Hit, VectorStore
 
 
 class ChromaStore(VectorStore):
@@ -23,13 +23,63 @@ class ChromaStore(VectorStore):
             self._client = chromadb.PersistentClient(path=str(path), settings=Settings())
         else:
             self._client = chromadb.Client(Settings())
-        self._col = self._client.get_or_create_collection("code")
+        self._col = self._client.get_or_create_collection(
+            "code", metadata={"hnsw:space": "cosine"}
+        )
 
     # ------------------------------------------------------------------ #
-    def add(self, texts: List[str], vectors: List[list[float]]) -> None:
-        ids = [f"id{i}" for i in range(len(texts))]
-        self._col.add(ids=ids, embeddings=vectors, documents=texts)
+    def add(
+        self,
+        texts: List[str],
+        vectors: List[list[float]],
+        metadatas: Sequence[Mapping[str, Any]] | None = None,
+        ids: Sequence[str] | None = None,
+    ) -> List[str]:
+        if not texts:
+            return []
+        ids_ = self._resolve_ids(texts, metadatas, ids)
+        self._col.upsert(
+            ids=ids_,
+            embeddings=vectors,
+            documents=texts,
+            metadatas=[dict(m) for m in metadatas] if metadatas is not None else None,
+        )
+        return ids_
 
-    def search(self, vector: list[float], k: int = 4) -> List[Tuple[str, float]]:
-        q = self._col.query(query_embeddings=[vector], n_results=k)
-        return list(zip(q["documents"][0], q["distances"][0]))
+    def delete(self, ids: Sequence[str]) -> None:
+        if ids:
+            self._col.delete(ids=list(ids))
+
+    def delete_where(self, **where: Any) -> None:
+        if not where:
+            raise ValueError("delete_where() needs at least one metadata filter.")
+        clauses = [{k: v} for k, v in where.items()]
+        self._col.delete(where=clauses[0] if len(clauses) == 1 else {"$and": clauses})
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Mapping[str, Any]]) -> None:
+        if ids:
+            self._col.update(ids=list(ids), metadatas=[dict(m) for m in metadatas])
+
+    def search(self, vector: list[float], k: int = 4) -> List[Hit]:
+        return self.search_many([vector], k)[0]
+
+    def search_many(self, vectors: Sequence[list[float]], k: int = 4) -> List[List[Hit]]:
+        if not vectors:
+            return []
+        q = self._col.query(
+            query_embeddings=list(vectors),
+            n_results=k,
+            include=["documents", "distances", "metadatas"],
+        )
+        out: List[List[Hit]] = []
+        for i in range(len(vectors)):
+            metas: List[Dict[str, Any]] = [m or {} for m in q["metadatas"][i]]
+            out.append(
+                [
+                    Hit(id_, doc, 1.0 - dist, meta)
+                    for id_, doc, dist, meta in zip(
+                        q["ids"][i], q["documents"][i], q["distances"][i], metas
+                    )
+                ]
+            )
+        return out
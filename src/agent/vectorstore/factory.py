@@ -0,0 +1,18 @@
+# src/agent/vectorstore/factory.py
+"""Build the configured :class:`VectorStore`."""
+
+from __future__ import annotations
+
+from ..config import VectorStoreConfig
+from .base import VectorStore
+
+
+def build_store(cfg: VectorStoreConfig) -> VectorStore:
+    """Instantiate the vector store described by *cfg*."""
+    if cfg.backend == "numpy":
+        from .numpy_store import NumpyStore
+
+        return NumpyStore(cfg.persist, cfg.persist_path, cfg.ivf_lists, cfg.ivf_probe)
+    from .chroma_store import ChromaStore
+
+    return ChromaStore(cfg.persist, cfg.persist_path)
@@ -0,0 +1,273 @@
+# src/agent/vectorstore/numpy_store.py
+"""In‑process NumPy backend: brute‑force cosine search with optional IVF."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from .base import Hit, VectorStore
+
+_VECTORS = "numpy_vectors.npy"
+_DOCS = "numpy_docs.json"
+_QUERY_BLOCK = 64  # queries scored per matmul in search_many
+_KMEANS_ITERS = 12
+
+
+class NumpyStore(VectorStore):
+    """Contiguous float32 matrix of unit vectors; top‑k via ``argpartition``.
+
+    With ``ivf_lists > 0`` a spherical k‑means coarse quantiser is trained once
+    the corpus is large enough, and queries only scan the ``ivf_probe`` closest
+    lists. Persisted stores are memory‑mapped on load and copied into RAM on the
+    first write.
+    """
+
+    def __init__(
+        self,
+        persist: bool = False,
+        path: Path | None = None,
+        ivf_lists: int = 0,
+        ivf_probe: int = 8,
+    ) -> None:
+        if persist and path is None:
+            raise ValueError("`path` must be supplied if persist=True.")
+        self._path = path if persist else None
+        self._nlist = ivf_lists
+        self._nprobe = max(1, ivf_probe)
+        self._mat = np.zeros((0, 0), dtype=np.float32)
+        self._n = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._dead = 0
+        self._centroids: np.ndarray | None = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_at = 0
+        self._lists: List[np.ndarray] | None = None
+        if self._path is not None:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    # ------------------------------------------------------------------ #
+    def add(
+        self,
+        texts: List[str],
+        vectors: List[list[float]],
+        metadatas: Sequence[Mapping[str, Any]] | None = None,
+        ids: Sequence[str] | None = None,
+    ) -> List[str]:
+        if not texts:
+            return []
+        ids_ = self._resolve_ids(texts, metadatas, ids)
+        vecs = _normalise(np.asarray(vectors, dtype=np.float32))
+        self._writable(vecs.shape[1])
+        metas = [dict(m) for m in metadatas] if metadatas is not None else [{} for _ in texts]
+        rows = np.empty(len(ids_), dtype=np.int64)
+        for j, (id_, text, meta) in enumerate(zip(ids_, texts, metas)):
+            row = self._pos.get(id_)
+            if row is None:
+                row = self._append_row(id_)
+            self._texts[row] = text
+            self._metas[row] = meta
+            rows[j] = row
+        self._mat[rows] = vecs
+        if self._centroids is not None:
+            self._assign[rows] = np.argmax(vecs @ self._centroids.T, axis=1)
+            self._lists = None
+        return ids_
+
+    def delete(self, ids: Sequence[str]) -> None:
+        rows = [self._pos.pop(id_) for id_ in ids if id_ in self._pos]
+        if not rows:
+            return
+        self._writable(self._mat.shape[1])
+        self._alive[rows] = False
+        for row in rows:
+            self._texts[row] = ""
+            self._metas[row] = {}
+        self._dead += len(rows)
+        self._lists = None
+        if self._dead > max(1024, self._n // 4):
+            self._compact()
+
+    def delete_where(self, **where: Any) -> None:
+        if not where:
+            raise ValueError("delete_where() needs at least one metadata filter.")
+        items = where.items()
+        self.delete(
+            [
+                self._ids[row]
+                for row in self._pos.values()
+                if all(self._metas[row].get(k) == v for k, v in items)
+            ]
+        )
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Mapping[str, Any]]) -> None:
+        for id_, meta in zip(ids, metadatas):
+            row = self._pos.get(id_)
+            if row is not None:
+                self._metas[row] = dict(meta)
+
+    def search(self, vector: list[float], k: int = 4) -> List[Hit]:
+        return self.search_many([vector], k)[0]
+
+    def search_many(self, vectors: Sequence[list[float]], k: int = 4) -> List[List[Hit]]:
+        if not vectors:
+            return []
+        if not self._pos:
+            return [[] for _ in vectors]
+        queries = _normalise(np.asarray(vectors, dtype=np.float32))
+        self._maybe_train()
+        if self._centroids is not None:
+            return [self._search_ivf(q, k) for q in queries]
+        out: List[List[Hit]] = []
+        mat = self._mat[: self._n]
+        for lo in range(0, len(queries), _QUERY_BLOCK):
+            scores = queries[lo : lo + _QUERY_BLOCK] @ mat.T
+            if self._dead:
+                scores[:, ~self._alive[: self._n]] = -np.inf
+            out.extend(self._top(row_scores, None, k) for row_scores in scores)
+        return out
+
+    def flush(self) -> None:
+        """Write vectors and documents to ``persist_path`` (atomic renames)."""
+        if self._path is None:
+            return
+        if self._dead:
+            self._compact()
+        vec_tmp = self._path / (_VECTORS + ".tmp")
+        with open(vec_tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(self._mat[: self._n]))
+        doc_tmp = self._path / (_DOCS + ".tmp")
+        doc_tmp.write_text(
+            json.dumps({"ids": self._ids, "texts": self._texts, "metadatas": self._metas}),
+            encoding="utf-8",
+        )
+        os.replace(vec_tmp, self._path / _VECTORS)
+        os.replace(doc_tmp, self._path / _DOCS)
+
+    # Search helpers ---------------------------------------------------- #
+    def _top(self, scores: np.ndarray, rows: np.ndarray | None, k: int) -> List[Hit]:
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        part = np.argpartition(-scores, k - 1)[:k]
+        part = part[np.argsort(-scores[part])]
+        hits: List[Hit] = []
+        for i in part:
+            row = int(rows[i]) if rows is not None else int(i)
+            hits.append(Hit(self._ids[row], self._texts[row], float(scores[i]), self._metas[row]))
+        return hits
+
+    def _search_ivf(self, q: np.ndarray, k: int) -> List[Hit]:
+        assert self._centroids is not None
+        lists = self._inverted_lists()
+        nprobe = min(self._nprobe, len(lists))
+        probe = np.argpartition(-(self._centroids @ q), nprobe - 1)[:nprobe]
+        rows = np.concatenate([lists[c] for c in probe])
+        if rows.size < k:  # too sparse: fall back to an exact scan
+            rows = np.flatnonzero(self._alive[: self._n])
+        return self._top(self._mat[rows] @ q, rows, k)
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            live = np.flatnonzero(self._alive[: self._n])
+            order = live[np.argsort(self._assign[live], kind="stable")]
+            bounds = np.searchsorted(self._assign[order], np.arange(self._nlist + 1))
+            self._lists = [order[bounds[c] : bounds[c + 1]] for c in range(self._nlist)]
+        return self._lists
+
+    def _maybe_train(self) -> None:
+        """(Re)train the coarse quantiser when the corpus outgrew the last fit."""
+        if self._nlist <= 0:
+            return
+        live = len(self._pos)
+        if live < self._nlist * 39 or (self._centroids is not None and live < 2 * self._trained_at):
+            return
+        rows = np.flatnonzero(self._alive[: self._n])
+        rng = np.random.default_rng(0)
+        sample = self._mat[rng.choice(rows, size=min(rows.size, self._nlist * 256), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=self._nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalise(sums)
+        self._centroids = centroids
+        self._assign = np.zeros(self._mat.shape[0], dtype=np.int32)
+        for lo in range(0, self._n, 65_536):
+            block = self._mat[lo : min(lo + 65_536, self._n)]
+            self._assign[lo : lo + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+        self._trained_at = live
+        self._lists = None
+
+    # Storage helpers --------------------------------------------------- #
+    def _writable(self, dim: int) -> None:
+        """Ensure the matrix is an in‑RAM array of width *dim*."""
+        if self._mat.shape[1] == 0 and self._n == 0:
+            self._mat = np.zeros((0, dim), dtype=np.float32)
+        elif self._mat.shape[1] != dim:
+            raise ValueError(f"Vector dim {dim} != store dim {self._mat.shape[1]}.")
+        if isinstance(self._mat, np.memmap):
+            self._mat = np.array(self._mat)
+
+    def _append_row(self, id_: str) -> int:
+        row = self._n
+        if row >= self._mat.shape[0]:
+            cap = max(1024, self._mat.shape[0] * 2)
+            grown = np.zeros((cap, self._mat.shape[1]), dtype=np.float32)
+            grown[:row] = self._mat[:row]
+            self._mat = grown
+            self._alive = np.resize(self._alive, cap)
+            self._assign = np.resize(self._assign, cap)
+        self._alive[row] = True
+        self._ids.append(id_)
+        self._texts.append("")
+        self._metas.append({})
+        self._pos[id_] = row
+        self._n += 1
+        return row
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive[: self._n])
+        self._mat = np.ascontiguousarray(self._mat[keep])
+        self._assign = self._assign[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metas = [self._metas[i] for i in keep]
+        self._pos = {id_: i for i, id_ in enumerate(self._ids)}
+        self._n = len(self._ids)
+        self._alive = np.ones(self._n, dtype=bool)
+        self._dead = 0
+        self._lists = None
+
+    def _load(self) -> None:
+        assert self._path is not None
+        vec_path, doc_path = self._path / _VECTORS, self._path / _DOCS
+        if not (vec_path.exists() and doc_path.exists()):
+            return
+        docs = json.loads(doc_path.read_text(encoding="utf-8"))
+        self._mat = np.load(vec_path, mmap_mode="r")
+        self._ids, self._texts, self._metas = docs["ids"], docs["texts"], docs["metadatas"]
+        self._n = len(self._ids)
+        self._alive = np.ones(self._n, dtype=bool)
+        self._assign = np.zeros(self._n, dtype=np.int32)
+        self._pos = {id_: i for i, id_ in enumerate(self._ids)}
+
+
+def _normalise(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
@@ -0,0 +1,99 @@
+"""Coder patches: one all‑or‑nothing change set, dry‑run while streaming."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import List
+
+from agent.agents.coder import CoderAgent
+from agent.bench.fakes import ScriptedLLM
+from agent.config import AgentConfig, ExecutionConfig
+from agent.core.agent_base import Message
+from agent.core.changes import ChangeTracker
+from agent.core.executor import Executor
+from agent.core.tracing import Tracer, tracing
+
+
+def _fence(path: str, old: str, new: str) -> str:
+    return f"```diff\n--- a/{path}\n+++ b/{path}\n@@ -1 +1 @@\n-{old}\n+{new}\n```\n"
+
+
+def _coder(root: Path, replies: List[str]) -> tuple[CoderAgent, ChangeTracker]:
+    cfg = AgentConfig(
+        project_path=root,
+        model_providers={},
+        provider_configs={},
+        embedding_provider=("hash", "local"),
+    )
+    changes = ChangeTracker()
+    coder = CoderAgent(
+        ScriptedLLM(replies), cfg, Executor(ExecutionConfig(), root), changes=changes
+    )
+    return coder, changes
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(root.glob("*.py"))}
+
+
+def _patch_spans(tracer: Tracer) -> List[dict]:
+    return [s.attrs for s in tracer.spans if s.name == "patch"]
+
+
+def test_fences_for_several_files_apply_together(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("y = 1\n", encoding="utf-8")
+    reply = "Done.\n" + _fence("a.py", "x = 1", "x = 2") + _fence("b.py", "y = 1", "y = 2")
+    coder, changes = _coder(tmp_path, [reply])
+    tracer = Tracer()
+    with tracing(tracer):
+        message = asyncio.run(coder.areply([Message("User", "bump both")]))
+    assert message.content == reply
+    assert _tree(tmp_path) == {"a.py": "x = 2\n", "b.py": "y = 2\n"}
+    assert changes.all == {tmp_path / "a.py", tmp_path / "b.py"}
+    [attrs] = _patch_spans(tracer)
+    assert attrs["files"] == 2 and attrs["ok"] and attrs["reused"] == 2
+
+
+async def _draft_and_commit(coder: CoderAgent) -> str:
+    draft = await coder.adraft([Message("User", "go")])
+    return await coder.acommit(draft.text)
+
+
+def test_one_failing_file_leaves_every_file_untouched(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("y = 1\n", encoding="utf-8")
+    reply = _fence("a.py", "x = 1", "x = 2") + _fence("b.py", "nope = 0", "y = 2")
+    coder, changes = _coder(tmp_path, [reply])
+    summary = asyncio.run(_draft_and_commit(coder))
+    assert _tree(tmp_path) == {"a.py": "x = 1\n", "b.py": "y = 1\n"}
+    assert "b.py" in summary and changes.all == set()
+
+
+def test_file_changed_after_the_dry_run_is_planned_again(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\nz = 0\n", encoding="utf-8")
+    coder, _ = _coder(tmp_path, [_fence("a.py", "x = 1", "x = 2")])
+    tracer = Tracer()
+
+    async def main() -> None:
+        draft = await coder.adraft([Message("User", "bump x")])
+        await asyncio.gather(*coder._prepared[draft.text].plans.values())  # dry run done
+        path.write_text("x = 1\nz = 9\n", encoding="utf-8")  # another writer got in first
+        await coder.acommit(draft.text)
+
+    with tracing(tracer):
+        asyncio.run(main())
+    assert path.read_text(encoding="utf-8") == "x = 2\nz = 9\n"
+    [attrs] = _patch_spans(tracer)
+    assert attrs["ok"] and attrs["reused"] == 0
+
+
+def test_malformed_fence_is_rejected_without_writing(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    reply = "```diff\n--- a/../outside.py\n+++ b/../outside.py\n@@ -1 +1 @@\n-a\n+b\n```\n"
+    coder, changes = _coder(tmp_path, [reply])
+    assert asyncio.run(_draft_and_commit(coder)).startswith("patch rejected")
+    assert _tree(tmp_path) == {"a.py": "x = 1\n"} and changes.all == set()
+    assert not (tmp_path.parent / "outside.py").exists()
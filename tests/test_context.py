@@ -0,0 +1,77 @@
+"""Context assembly: stable retrieval prefix, history summary and the budget."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, List, Sequence
+
+from agent.bench.fakes import HashEmbedder
+from agent.config import ContextConfig
+from agent.core.agent_base import Message
+from agent.core.context import AssembledContext, ContextAssembler
+from agent.vectorstore.numpy_store import NumpyStore
+
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dim=32)
+        self.calls = 0
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        self.calls += 1
+        return await super().aembed(texts)
+
+
+def _assembler(cfg: ContextConfig, *docs: str) -> tuple[ContextAssembler, CountingEmbedder]:
+    embedder = CountingEmbedder()
+    store = NumpyStore()
+    if docs:
+        metas = [{"path": f"m{i}.py", "start": 1, "end": 2} for i in range(len(docs))]
+        store.add(list(docs), asyncio.run(embedder.aembed(docs)), metas)
+        embedder.calls = 0
+    return ContextAssembler(store, embedder, cfg), embedder
+
+
+def _assemble(asm: ContextAssembler, history: Sequence[Message]) -> AssembledContext:
+    return asyncio.run(asm.aassemble("You are the coder.", history, me="Coder"))
+
+
+def test_sections_keep_a_stable_prefix_across_turns():
+    cfg = ContextConfig(token_budget=2_000, recent_messages=2)
+    asm, embedder = _assembler(cfg, "def parse_config(path):\n    ...\n", "def unrelated(): ...\n")
+    history = [Message("User", "Fix parse_config")]
+    first = _assemble(asm, history)
+    history += [Message("Coder", "patch 1"), Message("Tester", "1 failed"), Message("Coder", "p2")]
+    later = _assemble(asm, history)
+
+    names = [s.name for s in later.sections]
+    assert names == ["system", "retrieval", "task", "summary", "history", "history"]
+    assert later.to_messages()[:3] == first.to_messages()[:3]
+    assert "m0.py:1-2" in later.sections[1].text
+    assert embedder.calls == 1  # the task's hits are reused
+    assert later.sections[3].text == "Earlier turns (summary):\n- Coder: patch 1"
+    assert [(s.role, s.text) for s in later.sections[4:]] == [
+        ("user", "Tester: 1 failed"),
+        ("assistant", "p2"),
+    ]
+    assert later.total <= cfg.token_budget
+    assert later.usage["history"] == sum(s.tokens for s in later.sections[4:])
+
+
+def test_retrieval_skips_hits_that_do_not_fit():
+    cfg = ContextConfig(token_budget=400, retrieval_share=0.5)
+    asm, _ = _assembler(cfg, "def big():\n" + "    x = 1\n" * 200, "def small(): ...\n")
+    ctx = _assemble(asm, [Message("User", "small")])
+    retrieval = next(s for s in ctx.sections if s.name == "retrieval")
+    assert "def small" in retrieval.text and "def big" not in retrieval.text
+
+
+def test_newest_message_is_kept_even_when_it_overflows():
+    cfg = ContextConfig(token_budget=300, max_message_tokens=10_000)
+    asm, _ = _assembler(cfg)
+    report = "FAILED test_parse\n" + "E   assert 1 == 2\n" * 400
+    ctx = _assemble(asm, [Message("User", "Fix it"), Message("Tester", report)])
+    [newest] = [s for s in ctx.sections if s.name == "history"]
+    assert newest.text.startswith("Tester: FAILED test_parse")
+    assert 0 < newest.tokens < len(report) // 4
+    assert ctx.total <= cfg.token_budget
@@ -0,0 +1,144 @@
+"""Embedding cache: LRU recycling, sharing one directory, and the async wrapper."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+import numpy as np
+import pytest
+
+from agent.embeddings.base import Embedder
+from agent.embeddings.cache import CachedEmbedder, EmbeddingCache, cache_key
+
+DIM = 4
+
+
+def _key(name: str) -> bytes:
+    return cache_key("m", name)
+
+
+def _vec(seed: int) -> list[float]:
+    return [float(seed + i) for i in range(DIM)]
+
+
+def test_roundtrip_and_reopen(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "m")
+    cache.put_many([_key("a"), _key("b")], [_vec(1), _vec(2)])
+    cache.close()
+    cache = EmbeddingCache(tmp_path, "m")
+    found = cache.get_many([_key("a"), _key("b"), _key("missing")])
+    assert set(found) == {_key("a"), _key("b")}
+    np.testing.assert_array_equal(found[_key("b")], np.asarray(_vec(2), dtype=np.float32))
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "m", max_entries=3)
+    for i, name in enumerate("abc"):
+        cache.put_many([_key(name)], [_vec(i)])
+    cache.get_many([_key("a")])  # b is now the oldest
+    cache.put_many([_key("d")], [_vec(9)])
+    assert set(cache.get_many([_key(n) for n in "abcd"])) == {_key("a"), _key("c"), _key("d")}
+    np.testing.assert_array_equal(cache.get_many([_key("d")])[_key("d")], _vec(9))
+    assert len(cache) == 3
+    cache.close()
+
+
+def test_eviction_spares_keys_of_the_current_batch(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "m", max_entries=3)
+    for i, name in enumerate("abc"):
+        cache.put_many([_key(name)], [_vec(i)])
+    # "a" is the LRU entry but is rewritten in this batch: "b" goes instead.
+    cache.put_many([_key("a"), _key("d")], [_vec(7), _vec(8)])
+    found = cache.get_many([_key(n) for n in "abcd"])
+    assert set(found) == {_key("a"), _key("c"), _key("d")}
+    np.testing.assert_array_equal(found[_key("a")], _vec(7))
+    cache.close()
+
+
+def test_batch_larger_than_the_cache_fails_cleanly(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "m", max_entries=2)
+    with pytest.raises(RuntimeError):
+        cache.put_many([_key(n) for n in "xyz"], [_vec(i) for i in range(3)])
+    assert len(cache) == 0  # rolled back
+    cache.put_many([_key("x"), _key("y")], [_vec(0), _vec(1)])
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_two_instances_share_slots(tmp_path: Path):
+    first = EmbeddingCache(tmp_path, "m")
+    second = EmbeddingCache(tmp_path, "m")
+    first.put_many([_key("a")], [_vec(1)])
+    second.put_many([_key("b")], [_vec(2)])  # must not reuse a's slot
+    assert set(first.get_many([_key("a"), _key("b")])) == {_key("a"), _key("b")}
+    np.testing.assert_array_equal(second.get_many([_key("a")])[_key("a")], _vec(1))
+    np.testing.assert_array_equal(first.get_many([_key("b")])[_key("b")], _vec(2))
+    first.close()
+    second.close()
+
+
+def test_instance_remaps_after_another_grew_the_file(tmp_path: Path):
+    first = EmbeddingCache(tmp_path, "m")
+    second = EmbeddingCache(tmp_path, "m")
+    first.put_many([_key("seed")], [_vec(0)])  # maps the initial capacity
+    assert first.get_many([_key("seed")])
+    names = [f"k{i}" for i in range(3000)]  # well past the initial mapping
+    second.put_many([_key(n) for n in names], [_vec(i) for i in range(len(names))])
+    found = first.get_many([_key("k2999"), _key("seed")])
+    np.testing.assert_array_equal(found[_key("k2999")], _vec(2999))
+    np.testing.assert_array_equal(found[_key("seed")], _vec(0))
+    assert len(first) == len(second) == 3001
+    first.close()
+    second.close()
+
+
+class CountingEmbedder(Embedder):
+    def __init__(self) -> None:
+        self.seen: List[str] = []
+
+    @property
+    def model(self) -> str:
+        return "m"
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        self.seen += items
+        return [_vec(len(t)) for t in items]
+
+
+def test_cached_embedder_only_embeds_misses(tmp_path: Path):
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(tmp_path, "m"))
+    first = asyncio.run(embedder.aembed(["a", "bb", "a"]))
+    second = asyncio.run(embedder.aembed(["bb", "ccc"]))
+    assert inner.seen == ["a", "bb", "ccc"]  # duplicates and hits never reach *inner*
+    assert first == [_vec(1), _vec(2), _vec(1)] and second == [_vec(2), _vec(3)]
+
+
+def test_cached_embedder_does_not_block_the_loop(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path, "m")
+    embedder = CachedEmbedder(CountingEmbedder(), cache)
+
+    async def main() -> int:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        # Stand‑in for another user of the cache holding it for a while.
+        cache._lock.acquire()
+        threading.Timer(0.3, cache._lock.release).start()
+        tick = asyncio.create_task(ticker())
+        await asyncio.wait_for(embedder.aembed(["a"]), 5)
+        tick.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 10
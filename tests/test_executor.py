@@ -0,0 +1,130 @@
+"""Executor: bounded output capture, timeouts and killing the process group."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from agent.config import ExecutionConfig
+from agent.core.executor import BoundedBuffer, Executor, run_process
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _is_zombie(pid: int) -> bool:
+    """An orphan reparented to an init that does not reap still shows up as a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as fh:
+            return fh.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return False
+
+
+# --------------------------------------------------------------------------- #
+# BoundedBuffer
+# --------------------------------------------------------------------------- #
+def test_buffer_keeps_everything_under_the_cap():
+    buf = BoundedBuffer(16)
+    for chunk in (b"abc", b"def", b"gh"):
+        buf.feed(chunk)
+    assert buf.text() == "abcdefgh"
+
+
+def test_buffer_keeps_head_and_tail_and_counts_the_middle():
+    buf = BoundedBuffer(10)
+    data = bytes(range(65, 91))  # A..Z
+    for i in range(len(data)):
+        buf.feed(data[i : i + 1])
+    assert buf.text() == "ABCDE\n… [16 bytes truncated] …\nVWXYZ"
+
+
+def test_buffer_truncates_one_large_feed():
+    buf = BoundedBuffer(1000)
+    buf.feed(b"h" * 500 + b"m" * 100_000 + b"t" * 500)
+    head, marker, tail = buf.text().split("\n")
+    assert head == "h" * 500 and tail == "t" * 500
+    assert marker == "… [100000 bytes truncated] …"
+
+
+# --------------------------------------------------------------------------- #
+# run_process
+# --------------------------------------------------------------------------- #
+def test_output_exit_code_and_line_callback(tmp_path: Path):
+    lines: List[Tuple[str, str]] = []
+    code = "import sys; print('one'); print('two'); print('err', file=sys.stderr); sys.exit(3)"
+    cmd = [sys.executable, "-c", code]
+    rc, out, err = asyncio.run(
+        run_process(cmd, tmp_path, 10, on_line=lambda stream, ln: lines.append((stream, ln)))
+    )
+    assert (rc, out, err) == (3, "one\ntwo\n", "err\n")
+    assert sorted(lines) == [("stderr", "err"), ("stdout", "one"), ("stdout", "two")]
+
+
+def test_output_is_capped_per_stream(tmp_path: Path):
+    cmd = [sys.executable, "-c", "import sys; sys.stdout.write('x' * 100_000)"]
+    rc, out, _ = asyncio.run(run_process(cmd, tmp_path, 10, max_output=1000))
+    assert rc == 0 and "bytes truncated" in out and len(out) < 1100
+
+
+@posix_only
+def test_timeout_kills_the_process_group(tmp_path: Path):
+    pidfile = tmp_path / "child.pid"
+    # The shell forks a grandchild that would outlive a plain kill of the shell.
+    cmd = ["sh", "-c", f"sleep 30 & echo $! > {pidfile}; wait"]
+    start = time.monotonic()
+    rc, _, err = asyncio.run(run_process(cmd, tmp_path, 0.5))
+    assert rc == 124 and err.endswith("TIMEOUT")
+    assert time.monotonic() - start < 10
+    grandchild = int(pidfile.read_text())
+    deadline = time.monotonic() + 5
+    while _alive(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(grandchild) or _is_zombie(grandchild)
+
+
+@posix_only
+def test_timeout_covers_a_child_that_closed_its_pipes(tmp_path: Path):
+    start = time.monotonic()
+    rc, _, _ = asyncio.run(run_process(["sh", "-c", "exec 1>&- 2>&-; sleep 30"], tmp_path, 0.5))
+    assert rc == 124 and time.monotonic() - start < 10
+
+
+@posix_only
+def test_cancel_kills_and_reaps_the_process(tmp_path: Path):
+    pidfile = tmp_path / "shell.pid"
+
+    async def main() -> int:
+        task = asyncio.create_task(
+            run_process(["sh", "-c", f"echo $$ > {pidfile}; exec sleep 30"], tmp_path, 60)
+        )
+        while not pidfile.exists() or not pidfile.read_text().strip():
+            await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return int(pidfile.read_text())
+
+    pid = asyncio.run(main())
+    assert not _alive(pid)  # killed and waited for: no zombie left behind
+
+
+def test_executor_runs_locally(tmp_path: Path):
+    (tmp_path / "marker.txt").write_text("here", encoding="utf-8")
+    executor = Executor(ExecutionConfig(use_docker=False, timeout=10), tmp_path)
+    code = "print(open('marker.txt').read())"
+    assert asyncio.run(executor.arun([sys.executable, "-c", code])) == (0, "here\n", "")
+
@@ -0,0 +1,169 @@
+"""Unified‑diff patcher: offsets, fuzz, EOL markers, new/deleted files, rollback."""
+
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from agent.util import files
+from agent.util.files import FileResult, apply_hunks, apply_patch, commit, parse_patch, write
+
+LINES = "".join(f"line {i}\n" for i in range(1, 21))
+
+
+def _hunks(diff: str):
+    return [h for p in parse_patch(diff) for h in p.hunks]
+
+
+def test_offset_is_found_and_reported():
+    diff = """--- a/f.py
++++ b/f.py
+@@ -5,3 +5,3 @@
+ line 10
+-line 11
++LINE 11
+ line 12
+"""
+    text, results = apply_hunks(LINES, _hunks(diff))
+    assert "LINE 11\n" in text and "line 11\n" not in text
+    (res,) = results
+    assert res.applied and res.line == 10 and res.offset == 5 and res.fuzz == 0
+
+
+def test_fuzz_drops_mismatched_context():
+    diff = """--- a/f.py
++++ b/f.py
+@@ -9,5 +9,5 @@
+ stale context
+ line 10
+-line 11
++LINE 11
+ line 12
+ stale context
+"""
+    assert not apply_hunks(LINES, _hunks(diff), fuzz=0)[1][0].applied
+    text, (res,) = apply_hunks(LINES, _hunks(diff), fuzz=1)
+    assert res.applied and res.fuzz == 1
+    assert text == LINES.replace("line 11\n", "LINE 11\n")
+
+
+def test_no_newline_at_end_of_file():
+    diff = """--- a/f.txt
++++ b/f.txt
+@@ -1,2 +1,2 @@
+ a
+-b
+\\ No newline at end of file
++c
+"""
+    assert apply_hunks("a\nb", _hunks(diff))[0] == "a\nc\n"
+    dropped = """--- a/f.txt
++++ b/f.txt
+@@ -1,2 +1,2 @@
+ a
+-b
++c
+\\ No newline at end of file
+"""
+    assert apply_hunks("a\nb\n", _hunks(dropped))[0] == "a\nc"
+
+
+def test_new_and_deleted_files(tmp_path: Path):
+    (tmp_path / "old.py").write_text("x = 1\n", encoding="utf-8")
+    diff = """--- /dev/null
++++ b/pkg/new.py
+@@ -0,0 +1,2 @@
++def f():
++    return 1
+--- a/old.py
++++ /dev/null
+"""
+    results = apply_patch(tmp_path, diff)
+    assert all(r.ok for r in results)
+    assert (tmp_path / "pkg" / "new.py").read_text(encoding="utf-8") == "def f():\n    return 1\n"
+    assert not (tmp_path / "old.py").exists()
+
+
+def test_new_file_refuses_to_overwrite(tmp_path: Path):
+    (tmp_path / "new.py").write_text("keep\n", encoding="utf-8")
+    diff = "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1 @@\n+clobber\n"
+    (res,) = apply_patch(tmp_path, diff)
+    assert not res.ok and res.error == "file already exists"
+    assert (tmp_path / "new.py").read_text(encoding="utf-8") == "keep\n"
+
+
+def test_all_or_nothing_when_a_hunk_fails(tmp_path: Path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("b = 1\n", encoding="utf-8")
+    diff = """--- a/a.py
++++ b/a.py
+@@ -1 +1 @@
+-a = 1
++a = 2
+--- a/b.py
++++ b/b.py
+@@ -1 +1 @@
+-b = 99
++b = 2
+"""
+    results = apply_patch(tmp_path, diff)
+    assert [r.ok for r in results] == [True, False]
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+
+
+def test_commit_rolls_back_earlier_writes(tmp_path: Path):
+    done = tmp_path / "done.py"
+    done.write_text("before\n", encoding="utf-8")
+    created = tmp_path / "created.py"
+    blocked = tmp_path / "blocked"
+    blocked.mkdir()  # replacing a directory with a file fails
+    results = [
+        FileResult(done, original="before\n", patched="after\n"),
+        FileResult(created, original=None, patched="new\n"),
+        FileResult(blocked, original="", patched="boom\n"),
+    ]
+    with pytest.raises(OSError):
+        commit(results)
+    assert done.read_text(encoding="utf-8") == "before\n"
+    assert not created.exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["blocked", "done.py"]
+
+
+def test_only_newlines_split_lines():
+    text = "a = 1\n# \x0c page\nb = '\u2028'\nc = 3\nd = 4\n"
+    diff = """--- a/f.py
++++ b/f.py
+@@ -4,2 +4,2 @@
+ c = 3
+-d = 4
++d = 5
+"""
+    patched, (res,) = apply_hunks(text, _hunks(diff))
+    assert patched == text.replace("d = 4", "d = 5")
+    assert res.line == 4 and res.offset == 0
+
+
+def test_crlf_lines_are_kept():
+    text = "a\r\nb\r\nc\r\n"
+    diff = "--- a/f\n+++ b/f\n@@ -1,3 +1,4 @@\n a\n-b\n+B\n+B2\n c\n"
+    assert apply_hunks(text, _hunks(diff))[0] == "a\r\nB\r\nB2\r\nc\r\n"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_write_gives_new_files_the_umask_mode(tmp_path: Path):
+    mask = os.umask(0o022)
+    try:
+        fresh = tmp_path / "new.py"
+        write(fresh, "x\n")
+        kept = tmp_path / "script.sh"
+        kept.write_text("#!/bin/sh\n", encoding="utf-8")
+        kept.chmod(0o750)
+        write(kept, "#!/bin/sh\necho\n")
+    finally:
+        os.umask(mask)
+    assert stat.S_IMODE(fresh.stat().st_mode) == files._NEW_FILE_MODE
+    assert files._NEW_FILE_MODE & 0o044  # readable by others, unlike mkstemp's 0600
+    assert stat.S_IMODE(kept.stat().st_mode) == 0o750
@@ -0,0 +1,58 @@
+"""Import graph: which tests a change can affect."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from agent.checks.impact import ImportGraph
+
+
+def _project(root: Path) -> ImportGraph:
+    files = {
+        "src/pkg/__init__.py": "",
+        "src/pkg/core.py": "def f():\n    return 1\n",
+        "src/pkg/api.py": "from .core import f\n",
+        "src/pkg/other.py": "X = 2\n",
+        "tests/conftest.py": "",
+        "tests/test_api.py": "from pkg.api import f\n",
+        "tests/test_other.py": "from pkg import other\n",
+        "tests/unit/conftest.py": "",
+        "tests/unit/test_leaf.py": "def test_leaf():\n    pass\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return ImportGraph(root, cache_path=root / ".agent" / "imports.json")
+
+
+def test_transitive_dependents(tmp_path: Path):
+    graph = _project(tmp_path)
+    assert graph.affected_tests([tmp_path / "src/pkg/core.py"]) == ["tests/test_api.py"]
+    assert graph.affected_tests([tmp_path / "src/pkg/other.py"]) == ["tests/test_other.py"]
+    leaf = ["tests/unit/test_leaf.py"]
+    assert graph.affected_tests([tmp_path / "tests/unit/conftest.py"]) == leaf
+    assert len(graph.test_files()) == 3
+
+
+def test_unbounded_changes_mean_the_full_suite(tmp_path: Path):
+    graph = _project(tmp_path)
+    assert graph.affected_tests([tmp_path / "setup.cfg"]) is None
+    assert graph.affected_tests([tmp_path.parent / "elsewhere.py"]) is None
+
+
+def test_deleted_module_means_the_full_suite(tmp_path: Path):
+    graph = _project(tmp_path)
+    assert graph.affected_tests([tmp_path / "src/pkg/core.py"]) == ["tests/test_api.py"]
+    (tmp_path / "src/pkg/core.py").unlink()
+    assert graph.affected_tests([tmp_path / "src/pkg/core.py"]) is None
+
+
+def test_cached_graph_picks_up_edits(tmp_path: Path):
+    _project(tmp_path).refresh()
+    (tmp_path / "tests/test_other.py").write_text("from pkg.api import f\n", encoding="utf-8")
+    graph = ImportGraph(tmp_path, cache_path=tmp_path / ".agent" / "imports.json")
+    assert graph.affected_tests([tmp_path / "src/pkg/core.py"]) == [
+        "tests/test_api.py",
+        "tests/test_other.py",
+    ]
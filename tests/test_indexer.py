@@ -0,0 +1,128 @@
+"""Incremental indexer: manifest reuse, touched files and undecodable files."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Iterable, List
+
+from agent.bench.fakes import HashEmbedder
+from agent.config import IndexConfig
+from agent.indexing.indexer import MANIFEST_NAME, IndexStats, Indexer, Manifest
+from agent.vectorstore.base import content_id
+from agent.vectorstore.numpy_store import NumpyStore
+
+SOURCE = '''import os
+
+
+def alpha():
+    return os.sep
+
+
+def beta():
+    return 2
+'''
+
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dim=32)
+        self.seen: List[str] = []
+
+    async def aembed(self, texts: Iterable[str]) -> List[list[float]]:
+        items = list(texts)
+        self.seen += items
+        return await super().aembed(items)
+
+
+def _index(root: Path, store: NumpyStore, model: str = "hash") -> tuple[IndexStats, List[str]]:
+    """One indexing run with a fresh embedder over the manifest kept in *root*/.agent."""
+    embedder = CountingEmbedder()
+    manifest = Manifest(root / ".agent" / MANIFEST_NAME, model)
+    stats = asyncio.run(Indexer(root, store, embedder, IndexConfig(), manifest).arun())
+    return stats, embedder.seen
+
+
+def _paths(store: NumpyStore) -> List[str]:
+    return sorted(store._metas[row]["path"] for row in store._pos.values())
+
+
+def test_unchanged_files_are_not_embedded_again(tmp_path: Path):
+    (tmp_path / "mod.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "README.md").write_text("Hello.\n", encoding="utf-8")
+    store = NumpyStore()
+    stats, seen = _index(tmp_path, store)
+    assert stats.files == 2 and stats.files_changed == 2
+    assert stats.chunks_embedded == len(seen) == len(store) > 0
+
+    stats, seen = _index(tmp_path, store)
+    assert seen == [] and stats.files_changed == 0 and stats.chunks_embedded == 0
+
+
+def test_touched_file_is_rehashed_but_not_embedded(tmp_path: Path):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    store = NumpyStore()
+    _index(tmp_path, store)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    stats, seen = _index(tmp_path, store)
+    assert seen == [] and stats.files_changed == 0
+
+
+def test_new_embedding_model_invalidates_the_manifest(tmp_path: Path):
+    (tmp_path / "mod.py").write_text(SOURCE, encoding="utf-8")
+    _index(tmp_path, NumpyStore())
+    stats, seen = _index(tmp_path, NumpyStore(), model="other")
+    assert stats.files_changed == 1 and seen
+
+
+def test_file_that_stops_decoding_is_purged(tmp_path: Path):
+    (tmp_path / "mod.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("Plain text.\n", encoding="utf-8")
+    store = NumpyStore()
+    _index(tmp_path, store)
+    assert "notes.txt" in _paths(store)
+
+    (tmp_path / "notes.txt").write_bytes(b"\xff\xfe not utf-8\n")
+    stats, seen = _index(tmp_path, store)
+    assert stats.files_removed == 1 and seen == []
+    assert set(_paths(store)) == {"mod.py"}
+    stats, _ = _index(tmp_path, store)  # remembered by hash, not re‑read
+    assert stats.files_removed == 0 and stats.files_changed == 0
+
+
+def test_edit_embeds_only_the_changed_chunk_and_respans_the_rest(tmp_path: Path):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    store = NumpyStore()
+    _index(tmp_path, store)
+    before = dict(store._pos)
+
+    edited = SOURCE.replace("    return os.sep", "    sep = os.sep\n    return sep")
+    path.write_text(edited, encoding="utf-8")
+    _, seen = _index(tmp_path, store)
+    assert len(seen) == 1 and "sep = os.sep" in seen[0]
+    assert len(store) == len(before)  # the old alpha chunk was replaced, not kept
+    beta = next(row for row in store._pos.values() if "def beta" in store._texts[row])
+    assert store._ids[beta] in before  # same content, same ID
+    assert (store._metas[beta]["start"], store._metas[beta]["end"]) == (9, 10)  # one line down
+
+
+def test_deleted_file_is_purged_from_the_store(tmp_path: Path):
+    (tmp_path / "mod.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "other.py").write_text("def gamma():\n    pass\n", encoding="utf-8")
+    store = NumpyStore()
+    _index(tmp_path, store)
+    (tmp_path / "other.py").unlink()
+    stats, _ = _index(tmp_path, store)
+    assert stats.files_removed == 1 and "other.py" not in _paths(store)
+
+
+def test_content_ids_are_stable_and_path_scoped():
+    meta = {"path": "a.py", "hash": "h", "ordinal": 0}
+    assert content_id("x", meta) == content_id("y", dict(meta))  # keyed on the hash
+    assert content_id("x", meta) != content_id("x", {**meta, "path": "b.py"})
+    assert content_id("x", meta) != content_id("x", {**meta, "ordinal": 1})
+    assert content_id("same") == content_id("same") != content_id("other")
@@ -0,0 +1,125 @@
+"""Completion cache: hits, replay, and sharing identical in‑flight requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import List, Sequence
+
+import pytest
+
+from agent.bench.fakes import ScriptedLLM
+from agent.models.cache import CachedLLM, CacheMissError
+from agent.models.llm_base import ChatMessage, Delta
+
+PROMPT: Sequence[ChatMessage] = [{"role": "user", "content": "hi"}]
+
+
+def test_second_request_is_served_from_disk(tmp_path: Path):
+    inner = ScriptedLLM(["hello there"])
+    first = asyncio.run(CachedLLM(inner, tmp_path / "llm.sqlite").achat(PROMPT))
+    again = asyncio.run(CachedLLM(inner, tmp_path / "llm.sqlite").achat(PROMPT))
+    assert first.text == again.text == "hello there"
+    assert inner.calls == 1
+    assert first.usage.completion_tokens > 0 and again.usage.completion_tokens == 0
+
+
+def test_replay_never_calls_the_model(tmp_path: Path):
+    path = tmp_path / "llm.sqlite"
+    asyncio.run(CachedLLM(ScriptedLLM(["recorded"]), path).achat(PROMPT))
+    inner = ScriptedLLM(["live"])
+    replay = CachedLLM(inner, path, replay=True)
+    assert asyncio.run(replay.achat(PROMPT)).text == "recorded"
+    with pytest.raises(CacheMissError):
+        asyncio.run(replay.achat([{"role": "user", "content": "new question"}]))
+    assert inner.calls == 0
+
+
+def test_streamed_miss_is_recorded(tmp_path: Path):
+    inner = ScriptedLLM(["one two three"])
+    llm = CachedLLM(inner, tmp_path / "llm.sqlite")
+
+    async def pieces() -> List[str]:
+        return [d.text async for d in llm.astream(PROMPT)]
+
+    assert len(asyncio.run(pieces())) > 2  # streamed through, not whole
+    assert asyncio.run(pieces()) == ["one two three"]  # a hit arrives whole
+    assert inner.calls == 1
+
+
+def test_identical_concurrent_requests_share_one_call(tmp_path: Path):
+    inner = ScriptedLLM(["shared"], ttft=0.05)
+    llm = CachedLLM(inner, tmp_path / "llm.sqlite")
+
+    async def main() -> List[str]:
+        return [c.text for c in await asyncio.gather(*(llm.achat(PROMPT) for _ in range(4)))]
+
+    assert asyncio.run(main()) == ["shared"] * 4
+    assert inner.calls == 1
+
+
+def test_waiter_retries_when_the_owner_is_cancelled(tmp_path: Path):
+    inner = ScriptedLLM(["answer"], ttft=0.1)
+    llm = CachedLLM(inner, tmp_path / "llm.sqlite")
+
+    async def main() -> str:
+        owner = asyncio.create_task(llm.achat(PROMPT))
+        await asyncio.sleep(0.02)
+        waiter = asyncio.create_task(llm.achat(PROMPT))
+        await asyncio.sleep(0.02)
+        owner.cancel()
+        return (await asyncio.wait_for(waiter, 5)).text
+
+    assert asyncio.run(main()) == "answer"
+    assert inner.calls == 2
+
+
+def test_waiter_retries_when_the_owner_closes_its_stream(tmp_path: Path):
+    inner = ScriptedLLM(["a b c d"], ttft=0.05, per_token=0.05)
+    llm = CachedLLM(inner, tmp_path / "llm.sqlite")
+
+    async def main() -> str:
+        stream = llm.astream(PROMPT)
+        first: Delta = await stream.__anext__()  # owner is mid‑stream
+        waiter = asyncio.create_task(llm.achat(PROMPT))
+        await asyncio.sleep(0.01)
+        await stream.aclose()
+        assert first.text
+        return (await asyncio.wait_for(waiter, 5)).text
+
+    assert asyncio.run(main()) == "a b c d"
+    assert inner.calls == 2
+
+
+def test_cancelled_waiter_is_still_cancelled(tmp_path: Path):
+    llm = CachedLLM(ScriptedLLM(["slow"], ttft=0.2), tmp_path / "llm.sqlite")
+
+    async def main() -> str:
+        owner = asyncio.create_task(llm.achat(PROMPT))
+        await asyncio.sleep(0.02)
+        waiter = asyncio.create_task(llm.achat(PROMPT))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return (await owner).text
+
+    assert asyncio.run(main()) == "slow"
+
+
+def test_lookups_do_not_block_the_loop(tmp_path: Path):
+    llm = CachedLLM(ScriptedLLM(["x"]), tmp_path / "llm.sqlite")
+
+    async def main() -> float:
+        loop = asyncio.get_running_loop()
+        llm._lock.acquire()  # another caller is inside SQLite
+        threading.Timer(0.3, llm._lock.release).start()
+        fetch = asyncio.create_task(llm.achat(PROMPT))
+        start = loop.time()
+        await asyncio.sleep(0.05)
+        late = loop.time() - start
+        await asyncio.wait_for(fetch, 5)
+        return late
+
+    assert asyncio.run(main()) < 0.2
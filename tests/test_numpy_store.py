@@ -0,0 +1,90 @@
+"""NumPy vector store: exact top‑k, upserts, deletes, IVF and persistence."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agent.vectorstore.numpy_store import NumpyStore
+
+
+def _corpus(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _fill(store: NumpyStore, vecs: np.ndarray) -> None:
+    store.add(
+        [f"doc {i}" for i in range(len(vecs))],
+        vecs.tolist(),
+        [{"path": f"f{i % 3}.py"} for i in range(len(vecs))],
+        [str(i) for i in range(len(vecs))],
+    )
+
+
+def test_exact_search_ranks_by_cosine():
+    vecs = _corpus(50)
+    store = NumpyStore()
+    _fill(store, vecs)
+    query = vecs[7] * 3  # scale does not matter
+    hits = store.search(query.tolist(), k=5)
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+    assert [h.id for h in hits] == [str(i) for i in expected]
+    assert hits[0].id == "7" and hits[0].score == pytest.approx(1.0, abs=1e-5)
+    assert hits[0].text == "doc 7" and hits[0].metadata == {"path": "f1.py"}
+    assert store.search_many([query.tolist(), vecs[3].tolist()], k=1)[1][0].id == "3"
+
+
+def test_upsert_delete_and_delete_where():
+    vecs = _corpus(9)
+    store = NumpyStore()
+    _fill(store, vecs)
+    store.add(["new 0"], [vecs[5].tolist()], [{"path": "f0.py"}], ["0"])  # same ID: replaced
+    assert len(store) == 9
+    twins = {h.id: h.text for h in store.search(vecs[5].tolist(), k=2)}
+    assert twins == {"0": "new 0", "5": "doc 5"}
+    store.delete(["1", "missing"])
+    store.delete_where(path="f2.py")
+    assert len(store) == 5
+    ids = {h.id for h in store.search(vecs[0].tolist(), k=9)}
+    assert ids == {"0", "3", "4", "6", "7"}
+    store.update_metadata(["3"], [{"path": "moved.py"}])
+    assert store.search(vecs[3].tolist(), k=1)[0].metadata == {"path": "moved.py"}
+    with pytest.raises(ValueError):
+        store.delete_where()
+
+
+def test_ivf_finds_the_same_nearest_neighbours():
+    vecs = _corpus(2000, dim=32)
+    exact, ivf = NumpyStore(), NumpyStore(ivf_lists=8, ivf_probe=8)
+    _fill(exact, vecs)
+    _fill(ivf, vecs)
+    queries = (vecs[:20] + 0.05 * _corpus(20, dim=32, seed=1)).tolist()
+    got = ivf.search_many(queries, k=3)
+    assert ivf._centroids is not None  # trained, and probing every list is exact
+    assert [[h.id for h in hits] for hits in got] == [
+        [h.id for h in hits] for hits in exact.search_many(queries, k=3)
+    ]
+    narrow = NumpyStore(ivf_lists=8, ivf_probe=1)
+    _fill(narrow, vecs)
+    top1 = [hits[0].id for hits in narrow.search_many(queries, k=1)]
+    assert sum(id_ == str(i) for i, id_ in enumerate(top1)) >= 15  # approximate, mostly right
+
+
+def test_persisted_store_reloads_and_stays_writable(tmp_path: Path):
+    vecs = _corpus(10)
+    store = NumpyStore(persist=True, path=tmp_path)
+    _fill(store, vecs)
+    store.delete(["2"])
+    store.flush()
+
+    reloaded = NumpyStore(persist=True, path=tmp_path)
+    assert len(reloaded) == 9
+    assert isinstance(reloaded._mat, np.memmap)
+    assert reloaded.search(vecs[4].tolist(), k=1)[0].id == "4"
+    reloaded.add(["extra"], [vecs[2].tolist()], ids=["extra"])  # copies out of the mapping
+    assert reloaded.search(vecs[2].tolist(), k=1)[0].id == "extra"
+    with pytest.raises(ValueError):
+        reloaded.add(["bad"], [[1.0, 2.0]])
@@ -0,0 +1,98 @@
+"""Rate limiter: priority order, cancelled waiters, and the traced queue depth."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from agent.config import RateLimit
+from agent.core.ratelimit import Priority, RateLimiter, priority
+from agent.core.tracing import Tracer, tracing
+
+
+def _drained(rpm: float = 1200) -> RateLimiter:
+    """A limiter whose ``p`` lane has just used up its burst (one grant per 60/rpm s)."""
+    limiter = RateLimiter({"p": RateLimit(rpm=rpm)})
+    lane = limiter._lane("p:model")
+    assert lane is not None and lane.rpm is not None
+    lane.rpm.take(rpm)
+    return limiter
+
+
+def test_unlimited_key_passes_straight_through():
+    limiter = RateLimiter({"p": RateLimit(rpm=1)})
+    asyncio.run(asyncio.wait_for(limiter.acquire("other:model"), 1))
+    assert limiter.metrics() == {}
+
+
+def test_waiters_are_granted_by_priority_then_arrival():
+    async def main() -> List[str]:
+        limiter = _drained()
+        order: List[str] = []
+
+        async def call(name: str, level: Priority) -> None:
+            await limiter.acquire("p:model", level=level)
+            order.append(name)
+
+        async def scoped() -> None:
+            with priority(Priority.INTERACTIVE):  # overrides the per‑call level
+                await call("scoped", Priority.BACKGROUND)
+
+        tasks = [
+            asyncio.create_task(call("background", Priority.BACKGROUND)),
+            asyncio.create_task(call("normal-1", Priority.NORMAL)),
+            asyncio.create_task(call("interactive", Priority.INTERACTIVE)),
+            asyncio.create_task(call("normal-2", Priority.NORMAL)),
+            asyncio.create_task(scoped()),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.metrics()["p"]["queued"] == 5
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        assert limiter.metrics()["p"]["granted"] == 5
+        return order
+
+    order = asyncio.run(main())
+    assert order == ["interactive", "scoped", "normal-1", "normal-2", "background"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main() -> None:
+        limiter = _drained()
+        head = asyncio.create_task(limiter.acquire("p:model", level=Priority.INTERACTIVE))
+        behind = asyncio.create_task(limiter.acquire("p:model", level=Priority.BACKGROUND))
+        await asyncio.sleep(0.01)
+        assert limiter.metrics()["p"]["queued"] == 2
+        head.cancel()
+        await asyncio.gather(head, return_exceptions=True)
+        assert head.cancelled()
+        assert limiter.metrics()["p"]["queued"] == 1
+        await asyncio.wait_for(behind, 2)  # not stuck behind the cancelled head
+        metrics = limiter.metrics()["p"]
+        assert metrics["queued"] == 0 and metrics["granted"] == 1
+
+    asyncio.run(main())
+
+
+def test_admissions_are_traced_with_queue_depth():
+    async def main() -> None:
+        limiter = _drained()
+        await asyncio.gather(
+            limiter.acquire("p:model", level=Priority.BACKGROUND),
+            limiter.acquire("p:model", level=Priority.BACKGROUND),
+            limiter.acquire("p:model", level=Priority.INTERACTIVE),
+        )
+
+    tracer = Tracer()
+    with tracing(tracer):
+        asyncio.run(main())
+    spans = [s for s in tracer.spans if s.name == "ratelimit.wait"]
+    # Depth ahead at arrival: the interactive call queued behind two others, yet went first.
+    assert sorted((s.attrs["queued"], s.attrs["priority"]) for s in spans) == [
+        (0, "background"),
+        (1, "background"),
+        (2, "interactive"),
+    ]
+    assert {s.attrs["lane"] for s in spans} == {"p"}
+    row = tracer.summary()["ratelimit.wait"]
+    assert row["count"] == 3 and row["queued_max"] == 2
+    assert "queued_max=2" in tracer.format_summary()
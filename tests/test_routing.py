@@ -0,0 +1,131 @@
+"""Fallback chains and hedged requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import AsyncIterator, Sequence
+
+import pytest
+from pydantic import ValidationError
+
+from agent import cli
+from agent.bench.fakes import ScriptedLLM
+from agent.config import AgentConfig, RoutingConfig
+from agent.models import factory
+from agent.models.llm_base import ChatMessage, Completion, Delta, LLMBase, collect
+from agent.models.routing import FallbackLLM, LatencyTracker
+
+PROMPT: Sequence[ChatMessage] = [{"role": "user", "content": "hi"}]
+
+
+class Failing(LLMBase):
+    """Raise after yielding *before* pieces of text."""
+
+    def __init__(self, model: str, before: int = 0) -> None:
+        self._model = model
+        self._before = before
+        self.calls = 0
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    async def achat(self, messages: Sequence[ChatMessage]) -> Completion:
+        return await collect(self.astream(messages))
+
+    async def astream(self, messages: Sequence[ChatMessage]) -> AsyncIterator[Delta]:
+        self.calls += 1
+        for i in range(self._before):
+            yield Delta(f"partial{i} ")
+        raise ConnectionError(f"{self._model} is down")
+
+
+def test_tracker_percentile():
+    tracker = LatencyTracker(window=3)
+    assert tracker.percentile("m", 0.5) is None
+    for s in (9.0, 1.0, 2.0, 3.0):  # the oldest sample falls out of the window
+        tracker.record("m", s)
+    assert tracker.count("m") == 3
+    assert tracker.percentile("m", 0.0) == 1.0 and tracker.percentile("m", 0.95) == 3.0
+
+
+def test_falls_back_when_the_primary_fails_before_its_first_token():
+    down = Failing("down")
+    backup = ScriptedLLM(["from backup"], model="backup")
+    llm = FallbackLLM([down, Failing("also-down"), backup])
+    completion = asyncio.run(llm.achat(PROMPT))
+    assert completion.text == "from backup"
+    assert completion.usage.completion_tokens > 0
+    assert llm.stats["fallbacks"] == 2 and down.calls == 1 and backup.calls == 1
+
+
+def test_last_failure_is_raised_when_the_chain_is_exhausted():
+    llm = FallbackLLM([Failing("a"), Failing("b")])
+    with pytest.raises(ConnectionError, match="b is down"):
+        asyncio.run(llm.achat(PROMPT))
+
+
+def test_failure_after_the_first_token_is_not_retried():
+    backup = ScriptedLLM(["from backup"], model="backup")
+    llm = FallbackLLM([Failing("flaky", before=1), backup])
+    with pytest.raises(ConnectionError):
+        asyncio.run(llm.achat(PROMPT))
+    assert backup.calls == 0
+
+
+def test_hedge_winner_is_streamed_and_the_loser_cancelled():
+    latency = LatencyTracker()
+    for _ in range(5):
+        latency.record("slow", 0.01)
+    slow = ScriptedLLM(["from slow"], model="slow", ttft=10)
+    fast = ScriptedLLM(["from fast"], model="fast", ttft=0.01)
+    llm = FallbackLLM(
+        [slow, fast], latency, hedge=True, hedge_min_samples=5, hedge_min_delay=0.05
+    )
+    start = time.perf_counter()
+    completion = asyncio.run(llm.achat(PROMPT))
+    assert completion.text == "from fast"
+    assert time.perf_counter() - start < 2  # the slow request did not hold us up
+    assert llm.stats == {"requests": 1, "fallbacks": 0, "hedged": 1, "hedge_won": 1}
+    # Only the winner's first‑token time is a real sample.
+    assert latency.count("slow") == 5 and latency.count("fast") == 1
+
+
+def test_no_hedge_without_enough_samples():
+    slow = ScriptedLLM(["from slow"], model="slow", ttft=0.2)
+    fast = ScriptedLLM(["from fast"], model="fast")
+    llm = FallbackLLM([slow, fast], hedge=True, hedge_min_samples=5, hedge_min_delay=0.01)
+    assert asyncio.run(llm.achat(PROMPT)).text == "from slow"
+    assert llm.stats["hedged"] == 0 and fast.calls == 0
+
+
+def _config(**models: tuple[str, str]) -> AgentConfig:
+    return AgentConfig(
+        project_path=".",
+        model_providers=models,
+        provider_configs={},
+        embedding_provider=("hash", "local"),  # embedders have their own registry
+    )
+
+
+def test_misspelled_provider_is_rejected_by_the_config():
+    with pytest.raises(ValidationError, match="Unknown LLM provider 'opena'"):
+        _config(coder=("opena", "gpt-4o"))
+    with pytest.raises(ValidationError, match="Unknown LLM provider 'antropic'"):
+        RoutingConfig(fallbacks={"coder": (("openai", "gpt-4o"), ("antropic", "claude"))})
+
+
+def test_registered_provider_is_accepted(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(factory.PROVIDERS, "local", lambda model, cfg, res: ScriptedLLM([]))
+    assert _config(coder=("local", "tiny")).model_providers == {"coder": ("local", "tiny")}
+    assert RoutingConfig(fallbacks={"coder": (("local", "tiny"),)}).fallbacks
+
+
+def test_hedge_without_fallback_is_rejected():
+    parser = cli.ArgumentParser()
+    cli._add_common(parser)
+    with pytest.raises(SystemExit):
+        cli._parse_args(parser, ["--hedge"])
+    ns = cli._parse_args(parser, ["--hedge", "--fallback", "coder:openai:gpt-4o-mini"])
+    assert ns.hedge and ns.fallback == ["coder:openai:gpt-4o-mini"]
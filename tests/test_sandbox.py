@@ -0,0 +1,115 @@
+"""Sandbox pool bookkeeping, driven by a fake ``docker`` CLI."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from agent.core import sandbox
+from agent.core.sandbox import SandboxPool
+
+
+class FakeDocker:
+    """Answer ``docker run/exec/rm`` like the real CLI; the first *failures* runs fail."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.started: List[str] = []
+        self.removed: List[str] = []
+        self.execs: List[Tuple[str, ...]] = []
+
+    async def __call__(
+        self, cmd: Sequence[str], cwd: Path, timeout: float, *args: object, **kwargs: object
+    ) -> Tuple[int, str, str]:
+        await asyncio.sleep(0.01)
+        verb = cmd[1]
+        if verb == "run":
+            if self.failures:
+                self.failures -= 1
+                return 125, "", "pull failed"
+            cid = f"c{len(self.started)}"
+            self.started.append(cid)
+            return 0, cid + "\n", ""
+        if verb == "rm":
+            self.removed.append(cmd[-1])
+            return 0, "", ""
+        assert verb == "exec"
+        self.execs.append(tuple(cmd))
+        if cmd[-1] == "hang":
+            await asyncio.sleep(30)
+        return 0, "ok\n", ""
+
+
+@pytest.fixture
+def docker(monkeypatch: pytest.MonkeyPatch) -> FakeDocker:
+    fake = FakeDocker()
+    monkeypatch.setattr(sandbox, "run_process", fake)
+    monkeypatch.setattr(sandbox.shutil, "which", lambda name: f"/usr/bin/{name}")
+    return fake
+
+
+def test_containers_are_reused(docker: FakeDocker, tmp_path: Path):
+    async def main() -> None:
+        pool = SandboxPool("img", tmp_path, size=1)
+        assert await pool.arun(["echo"], 10) == (0, "ok\n", "")
+        assert await pool.arun(["echo"], 10) == (0, "ok\n", "")
+        await pool.aclose()
+
+    asyncio.run(main())
+    assert docker.started == ["c0"] and docker.removed == ["c0"]
+
+
+def test_failed_start_wakes_a_waiter(docker: FakeDocker, tmp_path: Path):
+    docker.failures = 1
+
+    async def main() -> List[Tuple[int, str, str]]:
+        pool = SandboxPool("img", tmp_path, size=1)
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(pool.arun(["a"], 10), pool.arun(["b"], 10)), 5
+            )
+        finally:
+            await pool.aclose()
+
+    first, second = asyncio.run(main())
+    assert first[0] == 125 and "pull failed" in first[2]
+    assert second == (0, "ok\n", "")
+
+
+def test_cancelled_command_retires_its_container(docker: FakeDocker, tmp_path: Path):
+    async def main() -> SandboxPool:
+        pool = SandboxPool("img", tmp_path, size=1)
+        task = asyncio.create_task(pool.arun(["hang"], 60))
+        while not docker.execs:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert docker.removed == ["c0"]
+        assert await asyncio.wait_for(pool.arun(["echo"], 10), 5) == (0, "ok\n", "")
+        await pool.aclose()
+        return pool
+
+    pool = asyncio.run(main())
+    assert docker.started == ["c0", "c1"]
+    assert pool._live == 0
+
+
+def test_retire_after_close_keeps_the_count(docker: FakeDocker, tmp_path: Path):
+    async def main() -> SandboxPool:
+        pool = SandboxPool("img", tmp_path, size=2)
+        task = asyncio.create_task(pool.arun(["hang"], 60))
+        while not docker.execs:
+            await asyncio.sleep(0.01)
+        await pool.aclose()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool._live == 0
+    assert docker.removed.count("c0") >= 1
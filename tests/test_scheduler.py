@@ -0,0 +1,105 @@
+"""Turn scheduler: concurrent checkers and speculative coder drafts."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Sequence
+
+from agent.core.agent_base import AgentBase, Message
+from agent.core.scheduler import TurnScheduler
+from agent.models.llm_base import Completion
+
+
+class FakeCoder:
+    """Drafts ``patch <n>``; records what each draft saw and whether it was cancelled."""
+
+    name = "Coder"
+
+    def __init__(self, checkers: Sequence["Checker"] = (), delay: float = 0.05) -> None:
+        self.checkers = checkers
+        self._delay = delay
+        self.seen: List[List[str]] = []
+        self.cancelled = 0
+        self.commits: List[str] = []
+
+    async def adraft(self, history: Sequence[Message]) -> Completion:
+        self.seen.append([m.sender for m in history])
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return Completion(f"patch {len(self.seen)}")
+
+    def has_patch(self, text: str) -> bool:
+        return text.startswith("patch")
+
+    async def acommit(self, text: str) -> None:
+        assert all(c.prepared for c in self.checkers), "baselines come before the first patch"
+        self.commits.append(text)
+
+
+class Checker(AgentBase):
+    """Reply after *delay*; the verdict for each round comes from *verdicts*."""
+
+    def __init__(self, name: str, delay: float, verdicts: Sequence[bool]) -> None:
+        super().__init__(name)
+        self._delay = delay
+        self._verdicts = list(verdicts)
+        self.prepared = False
+
+    async def aprepare(self) -> None:
+        await asyncio.sleep(0.01)
+        self.prepared = True
+
+    async def areply(self, history: Sequence[Message]) -> Message:
+        await asyncio.sleep(self._delay)
+        ok = self._verdicts.pop(0)
+        return Message(self.name, "pass" if ok else "fail", ok=ok)
+
+
+def _run(coder: FakeCoder, checkers: Sequence[Checker]) -> tuple[TurnScheduler, List[Message]]:
+    scheduler = TurnScheduler(coder, checkers, max_iterations=5)  # type: ignore[arg-type]
+    return scheduler, asyncio.run(scheduler.arun("fix it"))
+
+
+def test_draft_is_discarded_when_a_later_check_fails():
+    checkers = [Checker("Fast", 0.0, [False, True]), Checker("Slow", 0.1, [False, True])]
+    coder = FakeCoder(checkers, delay=0.3)  # still drafting when the slow check fails
+    scheduler, history = _run(coder, checkers)
+
+    assert [(m.sender, m.ok) for m in history] == [
+        ("User", None),
+        ("Coder", None),
+        ("Fast", False),
+        ("Slow", False),
+        ("Coder", None),
+        ("Fast", True),
+        ("Slow", True),
+    ]
+    assert scheduler.speculated == 1 and scheduler.speculation_hits == 0
+    assert coder.cancelled == 1
+    # The speculative draft saw only the fast failure; the one used saw both.
+    assert coder.seen[1] == ["User", "Coder", "Fast"]
+    assert coder.seen[2] == ["User", "Coder", "Fast", "Slow"]
+    assert coder.commits == ["patch 1", "patch 3"]
+
+
+def test_draft_is_used_when_the_remaining_checks_pass():
+    checkers = [Checker("Fast", 0.0, [False, True]), Checker("Slow", 0.3, [True, True])]
+    coder = FakeCoder(checkers)
+    scheduler, history = _run(coder, checkers)
+
+    assert [m.sender for m in history] == ["User", "Coder", "Fast", "Slow", "Coder", "Fast", "Slow"]
+    assert scheduler.speculated == 1 and scheduler.speculation_hits == 1
+    assert coder.seen == [["User"], ["User", "Coder", "Fast"]]
+    assert coder.commits == ["patch 1", "patch 2"]
+
+
+def test_no_speculation_when_disabled():
+    checkers = [Checker("Fast", 0.0, [False, True]), Checker("Slow", 0.05, [False, True])]
+    coder = FakeCoder(checkers)
+    scheduler = TurnScheduler(coder, checkers, speculative=False)  # type: ignore[arg-type]
+    history = asyncio.run(scheduler.arun("fix it"))
+    assert scheduler.speculated == 0 and len(coder.seen) == 2
+    assert [m.ok for m in history[-2:]] == [True, True]
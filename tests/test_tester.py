@@ -0,0 +1,121 @@
+"""Tester: JUnit digests, sharding, and verdicts against the pre‑patch baseline."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+from agent import config
+from agent.agents import tester as tester_agent
+from agent.bench.fakes import ScriptedLLM
+from agent.checks.junit import digest, merge, parse_junit, shard
+from agent.core.changes import ChangeTracker
+from agent.core.executor import Executor
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+  <testcase classname="tests.test_a" name="test_ok" time="0.5"/>
+  <testcase classname="tests.test_a.TestGroup" name="test_bad" time="1.5">
+    <failure message="assert 1 == 2">def test_bad():
+&gt;       assert 1 == 2
+E       assert 1 == 2</failure>
+  </testcase>
+  <testcase classname="tests.test_b" name="test_skip" time="0"><skipped message="later"/></testcase>
+</testsuite></testsuites>
+"""
+
+
+def test_parse_junit_rebuilds_node_ids(tmp_path: Path):
+    xml = tmp_path / "junit.xml"
+    xml.write_text(JUNIT, encoding="utf-8")
+    cases = parse_junit(xml, ["tests/test_a.py", "tests/test_b.py"])
+    assert [(c.nodeid, c.outcome) for c in cases] == [
+        ("tests/test_a.py::test_ok", "passed"),
+        ("tests/test_a.py::TestGroup::test_bad", "failed"),
+        ("tests/test_b.py::test_skip", "skipped"),
+    ]
+    report = merge([cases, None], 2.0)
+    assert report.file_seconds() == {"tests/test_a.py": 2.0, "tests/test_b.py": 0.0}
+    text = digest(report, tb_lines=1)
+    assert text.splitlines() == [
+        "1 failed, 1 passed, 1 skipped in 2.0s",
+        "1 shard(s) produced no results (crash or collection error)",
+        "FAILED tests/test_a.py::TestGroup::test_bad",
+        "  assert 1 == 2",
+        "    E       assert 1 == 2",
+    ]
+
+
+def test_shard_balances_by_duration():
+    weights = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 1.0}
+    groups = shard(["a", "b", "c", "d"], 2, weights)
+    assert sorted(sum(weights[f] for f in g) for g in groups) == [11.0, 11.0]
+    assert shard(["a"], 8, weights) == [["a"]]
+
+
+# --------------------------------------------------------------------------- #
+# TesterAgent against real pytest runs
+# --------------------------------------------------------------------------- #
+def _tester(root: Path, workers: int = 1) -> tester_agent.TesterAgent:
+    # Imported via the modules: pytest would try to collect Test* names.
+    cfg = config.AgentConfig(
+        project_path=root,
+        model_providers={"tester": ("openai", "scripted")},
+        provider_configs={"openai": {}},
+        embedding_provider=("openai", "hash"),
+        execution=config.ExecutionConfig(use_docker=False),
+        testing=config.TestingConfig(
+            command=(sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider"),
+            workers=workers,
+        ),
+    )
+    executor = Executor(cfg.execution, root)
+    return tester_agent.TesterAgent(ScriptedLLM([""]), cfg, executor, ChangeTracker())
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_project_without_tests_passes(tmp_path: Path):
+    _write(tmp_path, "app.py", "x = 1\n")
+    tester = _tester(tmp_path)
+    msg = asyncio.run(tester.areply([]))
+    assert msg.ok is True and "no tests ran" in msg.content
+
+
+def test_sharded_run_reports_the_failure(tmp_path: Path):
+    _write(tmp_path, "tests/__init__.py", "")
+    _write(tmp_path, "tests/test_a.py", "def test_a():\n    assert True\n")
+    _write(tmp_path, "tests/test_b.py", "def test_b():\n    assert 1 == 2\n")
+    msg = asyncio.run(_tester(tmp_path, workers=2).areply([]))
+    assert msg.ok is False
+    assert "2 workers] exit=1" in msg.content
+    assert "FAILED tests/test_b.py::test_b" in msg.content
+
+
+def test_only_new_failures_fail_the_turn(tmp_path: Path):
+    _write(tmp_path, "tests/__init__.py", "")
+    _write(
+        tmp_path,
+        "tests/test_a.py",
+        "def test_ok():\n    assert True\n\n\ndef test_broken():\n    assert False\n",
+    )
+
+    async def main() -> None:
+        tester = _tester(tmp_path)
+        await tester.aprepare()
+        msg = await tester.areply([])
+        assert msg.ok is True
+        assert "1 pre‑existing failures not counted" in msg.content
+
+        _write(tmp_path, "tests/test_b.py", "def test_new():\n    assert False\n")
+        tester.request_full()
+        msg = await tester.areply([])
+        assert msg.ok is False
+        assert "FAILED tests/test_b.py::test_new" in msg.content
+
+    asyncio.run(main())